@@ -2,27 +2,36 @@ import pandas as pd
 import asyncio
 import aiohttp
 import backoff
-import os
 import sys
 
 from dotenv import load_dotenv
 from typing import List
 from aiolimiter import AsyncLimiter
+from lowe.keypool import KeyPool
 
 
 class FREDClient(object):
-    def __init__(self, key_env_name: str = "API_KEY_FRED"):
+    def __init__(self, key_env_name: str = "API_KEY_FRED", keys: KeyPool = None):
         """the FRED Client class provides methods for wrapping around the FRED client
 
         Parameters
         ----------
         key_env_name : str, optional
             name of the environment variable in your .env
-            file corresponding to your FRED API key, by default "FRED_KEY_FRED"
+            file corresponding to your FRED API key, by default "FRED_KEY_FRED".
+            Separate several keys with commas to spread requests across them
+        keys : KeyPool, optional
+            Pool of API keys to use instead of the ones in key_env_name. By default each key
+            makes at most 2 requests per second (FRED allows 120 per minute)
         """
         load_dotenv()
-        self.API_KEY = os.environ.get(key_env_name, None)
-        self.limiter = AsyncLimiter(120, 60)
+        self.keys = (
+            keys if keys is not None else KeyPool.from_env(key_env_name, rate=2.0)
+        )
+        self.API_KEY = self.keys.keys[0] if len(self.keys) > 0 else None
+        # FRED allows 120 requests per minute per key, so the pool's per-key rates are what
+        # limit us and more keys mean more throughput
+        self.limiter = AsyncLimiter(120 * max(1, len(self.keys)), 60)
         try:
             assert self.API_KEY is not None
         except AssertionError:
@@ -63,7 +72,7 @@ class FREDClient(object):
             )
 
         base_url = self._base_url()
-        api_key = self.API_KEY
+        api_key = await self.keys.acquire()
 
         params = {
             "series_id": seriesid,
@@ -197,7 +206,8 @@ async def main():
     return test_resp
 
 
-if sys.platform == "win32":
-    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-asyncio.run(main())
+    asyncio.run(main())
@@ -1,25 +1,61 @@
 import asyncio
 import aiohttp
 import backoff
-import json
-import os
 import pandas as pd
-import requests
 
 from dotenv import load_dotenv, find_dotenv
+from lowe.keypool import KeyPool
+from lowe.locations.geokey import GeoKey
 from lowe.locations.lookup import name2fips, fips2name
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Tuple, AsyncIterator
 
-try:
-    import importlib.resources as pkg_resources
-except ImportError:
-    import importlib_resources as pkg_resources
+from . import frames, harmonize, search
+from .cache import ResponseCache
+from .results import ACSResult
+from .limiter import AdaptiveLimiter, THROTTLE_STATUSES, parse_retry_after
+from .singleflight import SingleFlight
+from .store import ACSStore, GEO_HEADERS, response_fips, response_to_long
+from .variables import has_varfile, load_decoder, save_compact, varfile_for
 
-from . import tableids
+# Geography levels that the API lets us request several of at once
+BATCHABLE_LEVELS = {"state", "city", "county"}
+
+# Name of the column each geography level comes back under in API responses
+GEO_COLUMNS = {"us": "us", "state": "state", "city": "place", "county": "county"}
+
+# Longest comma-separated list of codes we put in one 'for' clause, to keep URLs short
+MAX_FOR_LENGTH = 1000
+
+# Most variables the API lets us ask for in one 'get' clause
+MAX_GET_VARIABLES = 50
+
+# Requests per second each API key makes, by default the top speed of AdaptiveLimiter, so a
+# single key is never slower than without a pool. The Census API doesn't publish a daily
+# quota for requests with a key, so keys have no quota by default (their use is still counted)
+KEY_RATE = 50.0
+
+# Seconds a key sits out after the API throttles it without saying for how long
+KEY_BENCH_SECONDS = 60.0
+
+# HTTP statuses the Census API sends back for keys that are invalid or revoked
+INVALID_KEY_STATUSES = {401, 403}
+
+
+def _count_retry(details: dict):
+    """backoff handler that counts retries on the client's rate limiter"""
+    details["args"][0].limiter.retried += 1
 
 
 class ACSClient(object):
-    def __init__(self, key_env_name: str = "API_KEY_ACS"):
+    def __init__(
+        self,
+        key_env_name: str = "API_KEY_ACS",
+        cache: Union[bool, ResponseCache] = True,
+        limiter: AdaptiveLimiter = None,
+        memo_ttl: float = 5 * 60,
+        warehouse: ACSStore = None,
+        keys: KeyPool = None,
+    ):
         """the ACS Client class provides methods for wrapping around the ACS client
 
         Parameters
@@ -27,16 +63,51 @@ class ACSClient(object):
         key_env_name : str, optional
             name of the environment variable in your .env
             file corresponding to your ACS API key, by default "API_KEY_ACS"
+        cache : Union[bool, ResponseCache], optional
+            Whether or not to cache API responses on disk, by default True.
+            Pass a ResponseCache object to configure the location, size, and TTL of the cache
+        limiter : AdaptiveLimiter, optional
+            Rate limiter that bounds the number of requests in flight and adapts the request rate
+            to the API, by default AdaptiveLimiter() (20 concurrent requests, starting at 10 per second)
+        memo_ttl : float, optional
+            Identical requests made at the same time share one API call, and their responses are kept
+            in memory for this many seconds so repeated requests don't hit the API (or the disk cache)
+            again, by default 5 minutes. Pass 0 to turn off the in-memory memo
+        warehouse : ACSStore, optional
+            Local store to build up incrementally, by default None. Batched requests are served from
+            the warehouse, and only the (table, year, geography) cells it doesn't have yet are requested
+            from the API -- as whole tables, so later requests for other variables don't need the API either
+        keys : KeyPool, optional
+            Pool of API keys to spread requests across, by default the keys in the key_env_name
+            environment variable (one key, or several separated by commas), each making at most
+            KEY_RATE requests per second. A key the API throttles sits out for as long as the API
+            asks, and a key it rejects is dropped while the others carry on
         """
         load_dotenv(find_dotenv())
-        self.API_KEY = os.environ.get(key_env_name, None)
+        self.keys = (
+            keys if keys is not None else KeyPool.from_env(key_env_name, rate=KEY_RATE)
+        )
+        self.API_KEY = self.keys.keys[0] if len(self.keys) > 0 else None
         try:
             assert self.API_KEY is not None
         except AssertionError:
             print(
-                f"Error: make sure you have your ACS API key loaded as an environment variable under the name {key_env_name}."
+                "Error: make sure you have your ACS API key loaded as an environment "
+                f"variable under the name {key_env_name}."
             )
 
+        self._setup(limiter=limiter, memo_ttl=memo_ttl)
+
+        if isinstance(cache, ResponseCache):
+            self.cache = cache
+        else:
+            self.cache = ResponseCache() if cache else None
+
+        self.warehouse = warehouse
+
+    def _setup(self, limiter: AdaptiveLimiter = None, memo_ttl: float = 5 * 60):
+        """Sets up everything the client needs whatever it gets its data from: the surveys and
+        table types, the rate limiter, and the in-memory memo (see __init__)"""
         self.surveys = {"1": "acs1", "3": "acs3", "5": "acs5"}
 
         self.tabletypes = {
@@ -50,6 +121,10 @@ class ACSClient(object):
             "cprofile": "/cprofile",
         }
 
+        self.limiter = limiter if limiter is not None else AdaptiveLimiter()
+        self.singleflight = SingleFlight(ttl=memo_ttl)
+        self.session = None
+
     async def initialize(self):
         self.session = aiohttp.ClientSession()
 
@@ -96,26 +171,121 @@ class ACSClient(object):
 
         return base + table
 
-    def _get_var_defs(
+    async def prefetch_variables(
         self,
-        fname: str,
+        years: List[Union[int, str]],
+        tabletypes: List[str],
+        estimate: Union[int, str] = "5",
+        debug: bool = False,
+    ) -> Dict[Tuple[int, str], str]:
+        """Downloads the variables.json file of every (year, table type) pair that isn't
+        packaged with lowe or downloaded already, concurrently on the client session.
+        Files are kept in compact form under [default_cache_dir()]/variables, so other
+        processes (and later runs) load them from disk instead of downloading them again
+
+        Parameters
+        ----------
+        years : List[Union[int, str]]
+            Years (vintages) to get the variables files of
+        tabletypes : List[str]
+            Table types to get the variables files of, e.g. ["subject", "dprofile"]
+        estimate : Union[int, str], optional
+            ACS estimate (1, 3, or 5-year), by default "5"
+        debug : bool, optional
+            If True, prints each file as it is downloaded
+
+        Returns
+        -------
+        Dict[Tuple[int, str], str]
+            Variables file name for each (year, table type), to pass to load_decoder
+        """
+        varfiles = {
+            (int(year), tabletype): self._infer_varfile(year, tabletype, estimate)
+            for year in years
+            for tabletype in tabletypes
+        }
+        missing = {
+            varfile: key
+            for key, varfile in varfiles.items()
+            if not has_varfile(varfile)
+        }
+        if len(missing) == 0:
+            return varfiles
+
+        # Without a session, the files can't be downloaded and nothing can be decoded
+        if self.session is None:
+            raise FileNotFoundError(
+                f"The variables files {', '.join(missing)} aren't packaged with lowe or "
+                "downloaded yet. Initialize the client session with `client.initialize()` "
+                "to download them, or pass varfile"
+            )
+
+        async def fetch(varfile, year, tabletype):
+            base = self._base_uri(year=year, tabletype=tabletype, estimate=estimate)
+            async with self.limiter:
+                async with self.session.get(base + "/variables.json") as resp:
+                    if debug:
+                        print(f"downloading {resp.url}")
+                    resp.raise_for_status()
+                    js = await resp.json()
+            # Writing a few MB of JSON shouldn't hold up the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, save_compact, varfile, js["variables"]
+            )
+
+        await asyncio.gather(
+            *[
+                self.singleflight.run(
+                    ("variables", varfile), lambda v=varfile, k=key: fetch(v, *k)
+                )
+                for varfile, key in missing.items()
+            ]
+        )
+        return varfiles
+
+    async def find_variables(
+        self,
+        query: str,
         year: Union[int, str] = "2019",
         tabletype: str = "detail",
         estimate: Union[int, str] = "5",
-    ):
-        """Checks to see if the variable decoding JSON is included in the tableids/ folder, and if not, downloads it"""
-        # First, get the base url
-        base = self._base_uri(
-            year=str(year), tabletype=tabletype, estimate=str(estimate)
-        )
-        req_uri = base + "/variables.json"
-        vars = requests.get(req_uri)
-        js = vars.json()
+        table: str = None,
+        limit: int = 25,
+        debug: bool = False,
+    ) -> pd.DataFrame:
+        """Searches the variables of a year and table type for the ones whose label has every
+        word of a query, e.g. "median household income". Words match as prefixes ("educ" matches
+        "education"), and small typos are forgiven when nothing else matches. The variables file
+        is downloaded first if needed (see prefetch_variables)
 
-        with open(fname, "w", encoding="utf-8") as f:
-            json.dump(js, f, ensure_ascii=False, indent=4)
+        Parameters
+        ----------
+        query : str
+            Words to look for
+        year : Union[int, str], optional
+            Year (vintage) of the variables, by default "2019"
+        tabletype : str, optional
+            Table type to search, by default "detail"
+        estimate : Union[int, str], optional
+            ACS estimate (1, 3, or 5-year), by default "5"
+        table : str, optional
+            Only return variables of this table, e.g. "S1901", by default every table
+        limit : int, optional
+            Maximum number of variables to return, by default 25. Pass None for all of them
+        debug : bool, optional
+            If True, prints out extra information useful for debugging
 
-        return js
+        Returns
+        -------
+        pd.DataFrame
+            Dataframe indexed by variable id with the label of each match, most specific first.
+            Pass the ids to get_acs(variables=...) or the labels to get_acs(label_filter=...)
+        """
+        varfiles = await self.prefetch_variables(
+            years=[year], tabletypes=[tabletype], estimate=estimate, debug=debug
+        )
+        index = search.get_index(varfiles[(int(year), tabletype)])
+        return index.search(query, table=table, limit=limit)
 
     def _infer_table_type(self, tableid: str):
         tableid = tableid.lower()
@@ -129,26 +299,122 @@ class ACSClient(object):
             return "cprofile"
         return None
 
-    def _infer_varfile(self, year: Union[int, str], tabletype: str):
-        if tabletype.lower() == "detail":
-            return f"detail_vars_{str(year)}.json"
-        elif tabletype.lower() == "subject":
-            return f"subject_vars_{str(year)}.json"
-        elif tabletype.lower() == "dprofile":
-            return f"dprofile_vars_{str(year)}.json"
+    def _infer_varfile(
+        self,
+        year: Union[int, str],
+        tabletype: str,
+        estimate: Union[int, str] = "5",
+    ) -> str:
+        """Name of the variables file for a year and table type, e.g. "subject_vars_2019.json".
+        Files of the 1- and 3-year estimates end with the survey, e.g. "subject_vars_2019_acs1.json"
+        """
+        prefixes = {"": "detail", "/subject": "subject", "/profile": "dprofile"}
+        path = self.tabletypes[tabletype.lower()]
+        prefix = prefixes.get(path, path.strip("/"))
+        survey = "" if str(estimate) == "5" else "_" + self.surveys[str(estimate)]
+        return f"{prefix}_vars_{str(year)}{survey}.json"
+
+    def _location_fips(self, row: Dict[str, str], level: str) -> str:
+        """FIPS code for a location in the same format as lowe.locations.lookup uses,
+        built from the geography columns of an API response (e.g. {"state": "06", "place": "55254"})
+        """
+        if level == "city":
+            return row["state"] + row["place"]
+        if level == "county":
+            return row["state"] + "_" + row["county"]
+        return row.get(GEO_COLUMNS.get(level, level), None)
+
+    def _plan_batches(self, locations: List[GeoKey]) -> List[List[Tuple[int, GeoKey]]]:
+        """Groups locations that can share a single API call: same state and same geography level.
+        Each batch is a list of (position in locations, location) pairs"""
+        batches = {}
+        for i, loc in enumerate(locations):
+            if loc.level in BATCHABLE_LEVELS and not loc.wildcard:
+                group = (loc.level, loc.state if loc.level != "state" else None)
+            else:
+                group = (i,)  # Can't be batched, so it gets its own call
+            batches.setdefault(group, []).append((i, loc))
+
+        # Split batches whose 'for' clause would make the URL too long
+        res = []
+        for batch in batches.values():
+            chunk, length = [], 0
+            for i, loc in batch:
+                code_length = len(loc.code) + 1
+                if len(chunk) > 0 and length + code_length > MAX_FOR_LENGTH:
+                    res.append(chunk)
+                    chunk, length = [], 0
+                chunk.append((i, loc))
+                length += code_length
+            res.append(chunk)
+        return res
+
+    def _request_params(
+        self,
+        tableid: str,
+        location: Union[GeoKey, List[GeoKey]],
+        tabletype: str = "detail",
+        variables: List[str] = None,
+    ) -> Dict[str, str]:
+        """Builds the query parameters for a request. If location is a list, every
+        location in it must share the same state and geography level (see _plan_batches).
+        If variables is passed, only those variables are requested instead of the whole
+        table"""
+        key_translations = {"msa": "geocomp", "city": "place", "county": "county"}
+
+        locations = location if isinstance(location, list) else [location]
+        level, state = locations[0].level, locations[0].state
+        codes = ",".join(loc.code for loc in locations)
+        if level == "us":
+            params = {"for": "us:1"}
+        elif level == "state":
+            params = {"for": f"state:{codes}"}
+        elif state is None:
+            params = {"for": f"{key_translations[level]}:{codes}"}
+        else:
+            params = {
+                "for": f"{key_translations[level]}:{codes}",
+                "in": f"state:{state}",
+            }
+
+        get = f"group({tableid})"
+        if tabletype == "detail" or tabletype == "":
+            get = tableid + ","
+        if variables is not None:
+            get = ",".join(variables)
+
+        return {"get": get, **params, "key": self.API_KEY}
+
+    def _cache_key(
+        self,
+        year: Union[int, str],
+        params: Dict[str, str],
+        tabletype: str = "detail",
+        estimate: Union[int, str] = "5",
+    ) -> Dict[str, str]:
+        geography = params["for"] + (f" in {params['in']}" if "in" in params else "")
+        return dict(
+            year=year,
+            survey=self.surveys[str(estimate)],
+            tabletype=tabletype,
+            tableid=params["get"],
+            geography=geography,
+        )
 
-    @backoff.on_exception(
-        backoff.expo, (aiohttp.ClientError, aiohttp.ClientResponseError), max_tries=5
-    )
     async def _collect_table(
         self,
         tableid: str,
         year: Union[int, str],
-        location: Dict[str, str],
+        location: Union[GeoKey, List[GeoKey]],
         tabletype: str = "detail",
         estimate: Union[int, str] = "5",
+        variables: List[str] = None,
         debug: bool = False,
     ):
+        """Makes one request to the API. Pass a list of locations that share a state and
+        geography level to get all of them in one call. Only single-location requests are
+        cached here -- batched requests are cached per location by _collect_batch.
+        Identical requests that are in flight at the same time are only made once"""
         # Check to see if the client session exists
         try:
             assert self.session is not None
@@ -159,61 +425,353 @@ class ACSClient(object):
             )
 
         base = self._base_uri(year=year, tabletype=tabletype, estimate=estimate)
+        params = self._request_params(
+            tableid=tableid, location=location, tabletype=tabletype, variables=variables
+        )
+        cache_key = self._cache_key(
+            year=year, params=params, tabletype=tabletype, estimate=estimate
+        )
 
-        key_translations = {"msa": "geocomp", "city": "place", "county": "county"}
+        return await self.singleflight.run(
+            tuple(str(v) for v in cache_key.values()),
+            lambda: self._fetch(
+                base=base,
+                params=params,
+                cache_key=cache_key,
+                use_cache=self.cache is not None and isinstance(location, GeoKey),
+                debug=debug,
+            ),
+        )
+
+    @backoff.on_exception(
+        backoff.expo,
+        (aiohttp.ClientError, aiohttp.ClientResponseError),
+        max_tries=5,
+        on_backoff=_count_retry,
+    )
+    async def _fetch(
+        self,
+        base: str,
+        params: Dict[str, str],
+        cache_key: Dict[str, str],
+        use_cache: bool = True,
+        debug: bool = False,
+    ):
+        """Serves a request from the on-disk cache, or sends it to the API"""
+        if use_cache:
+            cached = self.cache.get(**cache_key)
+            if cached is not None:
+                if debug:
+                    tableid, year = cache_key["tableid"], cache_key["year"]
+                    print(f"cache hit: {tableid} {year} {cache_key['geography']}")
+                return cached
+
+        # Waiting for a key mustn't hold up a slot of the limiter
+        key = await self.keys.acquire()
+        params = {**params, "key": key}
+        async with self.limiter:
+            async with self.session.get(base, params=params) as resp:
+                if debug:
+                    print(resp.url)
+                    print(resp.status)
+                # Slow down (and wait as long as the API asks us to) if we're being throttled
+                if resp.status in THROTTLE_STATUSES:
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    self.limiter.throttled(retry_after=retry_after)
+                    if resp.status == 429 and key is not None:
+                        if retry_after is None:
+                            retry_after = KEY_BENCH_SECONDS
+                        self.keys.bench(key, retry_after)
+                # The retry goes to another key, or raises if the API rejected every key
+                if resp.status in INVALID_KEY_STATUSES and key is not None:
+                    print(f"Warning: the API rejected the key ...{key[-4:]}")
+                    self.keys.reject(key)
+                resp.raise_for_status()
+                js = await resp.json()
+            self.limiter.succeeded()
+
+        if use_cache:
+            self.cache.put(payload=js, **cache_key)
+
+        return js
+
+    async def _collect_batch(
+        self,
+        tableid: str,
+        year: Union[int, str],
+        locations: List[GeoKey],
+        tabletype: str = "detail",
+        estimate: Union[int, str] = "5",
+        variables: List[str] = None,
+        debug: bool = False,
+    ) -> List[list]:
+        """Collects a batch of locations that share a state and geography level (see _plan_batches)
+        with a single API call, and splits the response back into one [header, row] response per location.
+        Locations that are already in the cache are not requested again."""
+        if self.warehouse is not None and locations[0].level in GEO_HEADERS:
+            return await self._collect_warehouse(
+                tableid=tableid,
+                year=year,
+                locations=locations,
+                tabletype=tabletype,
+                estimate=estimate,
+                variables=variables,
+                debug=debug,
+            )
 
-        # The 'for' part is a little more tricky. We need to append
-        # MSA, county, and city in that order, with %20 in between
-        place = ""
-        for k, v in location.items():
-            if v is not None and k.lower() != "state":
-                place += (
-                    f"%20{key_translations[k]}:{v}"
-                    if len(place) > 0
-                    else f"{key_translations[k]}:{v}"
+        if locations[0].wildcard:
+            resp = await self._collect_wildcard(
+                tableid=tableid,
+                year=year,
+                location=locations[0],
+                tabletype=tabletype,
+                estimate=estimate,
+                variables=variables,
+                debug=debug,
+            )
+            return [resp]
+
+        level = locations[0].level
+        res = [None] * len(locations)
+
+        missing = []
+        for i, loc in enumerate(locations):
+            if self.cache is not None:
+                params = self._request_params(tableid, [loc], tabletype, variables)
+                res[i] = self.cache.get(
+                    **self._cache_key(year, params, tabletype, estimate)
                 )
+            if res[i] is None:
+                missing.append(i)
 
-        keyz = list(location.keys())
+        if len(missing) == 0:
+            if debug:
+                print(f"cache hit: {tableid} {year} ({len(locations)} locations)")
+            return res
 
-        if len(keyz) == 1 and "state" in keyz:
-            params = {
-                "get": f"group({tableid})",
-                "for": f"state:{location['state']}",
-                "key": self.API_KEY,
-            }
-        elif len(keyz) > 1:
-            params = {
-                "get": f"group({tableid})",
-                "for": place,
-                "in": f"state:{location['state']}",
-                "key": self.API_KEY,
-            }
+        resp = await self._collect_columns(
+            tableid=tableid,
+            year=year,
+            locations=[locations[i] for i in missing],
+            tabletype=tabletype,
+            estimate=estimate,
+            variables=variables,
+            debug=debug,
+        )
+        header, rows = resp[0], resp[1:]
+
+        # Match each row to its location using the geography columns at the end of the response
+        geo_col = GEO_COLUMNS.get(level, None)
+        if geo_col in header:
+            idx = header.index(geo_col)
+            rows_by_code = {row[idx]: row for row in rows}
         else:
-            params = {
-                "get": f"group({tableid})",
-                "for": "us:1",
-                "key": self.API_KEY,
-            }
+            rows_by_code = {}
+
+        for i in missing:
+            row = rows_by_code.get(locations[i].code, None)
+            if row is None and len(missing) == 1 and len(rows) == 1:
+                row = rows[0]
+            if row is None:
+                raise KeyError(
+                    f"No data returned for {tableid} ({year}) at location {locations[i]}"
+                )
+            res[i] = [header, row]
 
-        if tabletype == "detail" or tabletype == "":
-            params["get"] = tableid + ","
+            if self.cache is not None:
+                params = self._request_params(
+                    tableid, [locations[i]], tabletype, variables
+                )
+                self.cache.put(
+                    payload=res[i], **self._cache_key(year, params, tabletype, estimate)
+                )
 
-        async with self.session.get(base, params=params, raise_for_status=True) as resp:
-            if debug:
-                print(resp.url)
-                print(resp.status)
-            return await resp.json()
+        return res
+
+    async def _collect_warehouse(
+        self,
+        tableid: str,
+        year: Union[int, str],
+        locations: List[GeoKey],
+        tabletype: str = "detail",
+        estimate: Union[int, str] = "5",
+        variables: List[str] = None,
+        debug: bool = False,
+    ) -> List[list]:
+        """Same as _collect_batch, but backed by the warehouse: the whole table is requested for the
+        locations the warehouse doesn't have yet and written to it, then every location is served
+        from the warehouse. State-wide batches are requested once per state and level.
+        """
+        level = locations[0].level
+        wildcard = locations[0].wildcard
+        if wildcard:
+            state = locations[0].state
+            # Cities stored by earlier requests don't make a whole state, so the state is
+            # requested unless a state-wide request has already been stored
+            complete = self.warehouse.is_complete(tableid, year, level, state, estimate)
+            missing = [] if complete else [0]
+            fips = self.warehouse.geographies_in_state(
+                tableid, year, level, state, estimate
+            )
+        else:
+            fips = [loc.fips for loc in locations]
+            absent = set(self.warehouse.missing(tableid, year, fips, estimate))
+            missing = [i for i, code in enumerate(fips) if code in absent]
+
+        if len(missing) > 0:
+            resp = await self._collect_columns(
+                tableid=tableid,
+                year=year,
+                locations=[locations[i] for i in missing],
+                tabletype=tabletype,
+                estimate=estimate,
+                variables=None,
+                debug=debug,
+            )
+            self.warehouse.write(
+                tableid, year, response_to_long(resp, level), estimate=estimate
+            )
+            if wildcard:
+                self.warehouse.mark_complete(tableid, year, level, state, estimate)
+                fips = self.warehouse.geographies_in_state(
+                    tableid, year, level, state, estimate
+                )
+        elif debug:
+            print(f"warehouse hit: {tableid} {year} ({len(locations)} locations)")
+
+        resp = self.warehouse.response(
+            tableid, year, fips, level, variables=variables, estimate=estimate
+        )
+        if wildcard:
+            return [resp]
+
+        # Split the response back into one [header, row] response per location
+        header, rows = resp[0], resp[1:]
+        rows_by_fips = dict(zip(response_fips(resp, level), rows))
+        res = []
+        for loc, code in zip(locations, fips):
+            if code not in rows_by_fips:
+                raise KeyError(
+                    f"No data returned for {tableid} ({year}) at location {loc}"
+                )
+            res.append([header, rows_by_fips[code]])
+        return res
+
+    async def _collect_columns(
+        self,
+        tableid: str,
+        year: Union[int, str],
+        locations: List[GeoKey],
+        tabletype: str = "detail",
+        estimate: Union[int, str] = "5",
+        variables: List[str] = None,
+        debug: bool = False,
+    ) -> list:
+        """Wraps _collect_table to split long variable lists into several requests,
+        since the API only lets us 'get' MAX_GET_VARIABLES variables at a time"""
+        if variables is None or len(variables) <= MAX_GET_VARIABLES:
+            return await self._collect_table(
+                tableid=tableid,
+                year=year,
+                location=locations,
+                tabletype=tabletype,
+                estimate=estimate,
+                variables=variables,
+                debug=debug,
+            )
+
+        chunks = [
+            variables[i : i + MAX_GET_VARIABLES]
+            for i in range(0, len(variables), MAX_GET_VARIABLES)
+        ]
+        resps = await asyncio.gather(
+            *[
+                self._collect_table(
+                    tableid=tableid,
+                    year=year,
+                    location=locations,
+                    tabletype=tabletype,
+                    estimate=estimate,
+                    variables=chunk,
+                    debug=debug,
+                )
+                for chunk in chunks
+            ]
+        )
+
+        # The API sends back the variables we asked for followed by the geography columns,
+        # so rows from different chunks can be lined up on their geography columns
+        rows = {}
+        for resp, chunk in zip(resps, chunks):
+            for row in resp[1:]:
+                rows.setdefault(tuple(row[len(chunk) :]), []).extend(row[: len(chunk)])
+        geo_header = resps[0][0][len(chunks[0]) :]
+
+        return [variables + geo_header] + [
+            values + list(geo) for geo, values in rows.items()
+        ]
+
+    async def _collect_wildcard(
+        self,
+        tableid: str,
+        year: Union[int, str],
+        location: GeoKey,
+        tabletype: str = "detail",
+        estimate: Union[int, str] = "5",
+        variables: List[str] = None,
+        debug: bool = False,
+    ) -> list:
+        """Collects every place or county in a state with one call (for=place:*).
+        Besides the full-state response, each row is cached as its own location, so
+        later queries for single locations in the state are served from the cache."""
+        params = self._request_params(tableid, [location], tabletype, variables)
+        cache_key = self._cache_key(year, params, tabletype, estimate)
+        if self.cache is not None:
+            cached = self.cache.get(**cache_key)
+            if cached is not None:
+                if debug:
+                    print(f"cache hit: {tableid} {year} {cache_key['geography']}")
+                return cached
+
+        resp = await self._collect_columns(
+            tableid=tableid,
+            year=year,
+            locations=[location],
+            tabletype=tabletype,
+            estimate=estimate,
+            variables=variables,
+            debug=debug,
+        )
+
+        if self.cache is not None:
+            self.cache.put(payload=resp, **cache_key)
+
+            level = location.level
+            header, rows = resp[0], resp[1:]
+            for row in rows:
+                geo = dict(zip(header, row))
+                loc = GeoKey(level, geo["state"], geo[GEO_COLUMNS[level]])
+                loc_params = self._request_params(tableid, [loc], tabletype, variables)
+                self.cache.put(
+                    payload=[header, row],
+                    **self._cache_key(year, loc_params, tabletype, estimate),
+                )
+
+        return resp
 
     async def _process_request(
         self,
         tableid: str,
         year: Union[int, str],
-        location: Dict[str, str],
+        location: GeoKey,
         tabletype: str = "detail",
         estimate: Union[int, str] = "5",
         varfile: str = "subject_vars_2019.json",
+        variables: List[str] = None,
         debug: bool = False,
     ):
+        varfile = varfile_for(varfile, year)
+
         # Pulls data from ACS
         if debug:
             print("making request...")
@@ -223,156 +781,311 @@ class ACSClient(object):
             location=location,
             tabletype=tabletype,
             estimate=estimate,
+            variables=variables,
             debug=debug,
         )
 
-        if debug:
-            print("opening JSON...")
-        # Opens the JSON file with subject tables info
+        return self._process_response(
+            resp=resp, year=year, location=location, varfile=varfile, debug=debug
+        )
 
-        with pkg_resources.open_text(tableids, varfile) as f:
-            subjectDict = json.load(f)
+    async def _process_batch(
+        self,
+        tableid: str,
+        year: Union[int, str],
+        locations: List[GeoKey],
+        tabletype: str = "detail",
+        estimate: Union[int, str] = "5",
+        varfile: str = "subject_vars_2019.json",
+        variables: List[str] = None,
+        layout: str = "wide",
+        debug: bool = False,
+    ) -> pd.DataFrame:
+        """Batched version of _process_request: one API call for every location in the batch.
+        Returns a dataframe with a row for each location (or, for the long layout, a row for
+        each variable of each location), in the same order as locations.
+        Frames decoded with per-year variables files are harmonized across the years (see _harmonize)
+        """
+        df = await self._decode_batch(
+            tableid=tableid,
+            year=year,
+            locations=locations,
+            tabletype=tabletype,
+            estimate=estimate,
+            varfile=varfile_for(varfile, year),
+            variables=variables,
+            layout=layout,
+            debug=debug,
+        )
+        return self._harmonize(df, year=year, varfile=varfile, layout=layout)
 
-        # ids: list of subject ids
-        # vals: list of corresponding values
+    def _harmonize(
+        self,
+        df: pd.DataFrame,
+        year: Union[int, str],
+        varfile: Union[str, Dict[int, str]],
+        layout: str = "wide",
+    ) -> pd.DataFrame:
+        """Renames the columns (or, for the long layout, the variable codes) of a year's frame
+        to the canonical ones of a multi-year pull, so every year lines up on the same columns.
+        Only needed when the years are decoded with different variables files"""
+        if not isinstance(varfile, dict) or len(set(varfile.values())) <= 1:
+            return df
+        index = harmonize.get_index(tuple(sorted(varfile.items())))
+        return index.apply(df, year=year, layout=layout)
+
+    async def _decode_batch(
+        self,
+        tableid: str,
+        year: Union[int, str],
+        locations: List[GeoKey],
+        tabletype: str = "detail",
+        estimate: Union[int, str] = "5",
+        varfile: str = "subject_vars_2019.json",
+        variables: List[str] = None,
+        layout: str = "wide",
+        debug: bool = False,
+    ) -> pd.DataFrame:
+        """Collects a batch and decodes it with a single variables file (see _process_batch)"""
         if debug:
-            print("post-processing....")
-        ids, vals = resp[0], resp[1]
-        concept_label = []
-        values = []
-
-        # state_decoding = bidict({k.fips: k.abbr for k in us.states.STATES})
-        location_names = fips2name(location)
-
-        subjectDict = subjectDict["variables"]
+            print(f"making batched request for {len(locations)} locations...")
+        resps = await self._collect_batch(
+            tableid=tableid,
+            year=year,
+            locations=locations,
+            tabletype=tabletype,
+            estimate=estimate,
+            variables=variables,
+            debug=debug,
+        )
 
-        for idx, id in enumerate(ids):
-            subject = id
-            # Search for the subject ids in our JSON file
-            # try/catch so we only query query-able fields in the JSON
-            try:
-                concept_label.append(
-                    (
-                        subjectDict[subject]["concept"]
-                        + " "
-                        + subjectDict[subject]["label"]
-                    ).replace("!!", " ")
+        if locations[0].wildcard:
+            level = locations[0].level
+            if layout == "long":
+                response_layout = frames.get_layout(tuple(resps[0][0]), varfile)
+                rows = resps[0][1:]
+                return response_layout.long(
+                    rows, year=year, fips=response_layout.fips(rows, level)
                 )
-                values.append(vals[idx])
-            except KeyError:
-                continue
+            return self._process_wildcard(
+                resp=resps[0], year=year, level=level, varfile=varfile
+            )
 
-        # Intermediate output DF
-        subject_df = pd.DataFrame(
-            {"concept_label": concept_label, "values": values, "year": year}
+        # Every response in a batch comes from the same request, so they share a header
+        # and all the rows can be decoded together
+        header = resps[0][0]
+        if layout == "long":
+            return frames.get_layout(tuple(header), varfile).long(
+                [resp[1] for resp in resps],
+                year=year,
+                fips=[loc.fips for loc in locations],
+            )
+        df = self._process_rows(
+            resp=[header, *[resp[1] for resp in resps]],
+            year=year,
+            locations=locations,
+            varfile=varfile,
+            debug=debug,
         )
+        return df
 
-        # Drop duplicates
-        subject_df.drop_duplicates(inplace=True, subset=["concept_label"])
+    def _process_wildcard(
+        self,
+        resp: list,
+        year: Union[int, str],
+        level: str,
+        varfile: str = "subject_vars_2019.json",
+    ) -> pd.DataFrame:
+        """Turns a state-wide response into a compact dataframe indexed by FIPS code,
+        with one row per location and a 'year' column"""
+        layout = frames.get_layout(tuple(resp[0]), varfile)
+        rows = resp[1:]
 
-        # Final DF that can be merged
-        acs_subject_pivoted = subject_df.pivot(
-            index="year", columns="concept_label", values="values"
-        )
+        df = layout.frame(rows, index=pd.Index(layout.fips(rows, level), name="fips"))
+        df["year"] = year
 
-        acs_subject_pivoted.drop(acs_subject_pivoted.columns[0], axis=1, inplace=True)
+        return df
 
-        location_str = ""
+    def _process_rows(
+        self,
+        resp: list,
+        year: Union[int, str],
+        locations: List[GeoKey],
+        varfile: str = "subject_vars_2019.json",
+        debug: bool = False,
+    ) -> pd.DataFrame:
+        """Turns a [header, row, row, ...] response into a dataframe with one row per location
+        (in the order of locations), indexed by year, with the location name columns added
+        """
+        if debug:
+            print("decoding variables...")
+        # Column layouts are cached per header, so the variables are only decoded once
+        df = frames.build_frame(resp, year, varfile)
 
-        if not location:  # If the location is empty
-            location_str = "us"
+        if debug:
+            print("post-processing....")
+        locations = [loc.as_dict() for loc in locations]
+        names = [fips2name(loc) for loc in locations]
+        for col, values in frames.location_columns(locations, names).items():
+            df[col] = values
 
-        for key, value in location_names.items():
-            if key.lower() != "state":
-                value = value.split(",")[0]
-            acs_subject_pivoted[key.lower()] = value.lower()
-            location_str += (
-                value.lower() if len(location_str) == 0 else " " + value.lower()
-            )
+        return df
 
-        acs_subject_pivoted["location_key"] = location_str
+    def _process_response(
+        self,
+        resp: list,
+        year: Union[int, str],
+        location: GeoKey,
+        varfile: str = "subject_vars_2019.json",
+        debug: bool = False,
+    ) -> pd.DataFrame:
+        """Turns a [header, row] response from the API into a one-row dataframe"""
+        return self._process_rows(
+            resp=resp[:2], year=year, locations=[location], varfile=varfile, debug=debug
+        )
+
+    def _resolve_variables(
+        self,
+        tableid: str,
+        varfile: str,
+        variables: List[str] = None,
+        label_filter: Union[str, List[str]] = None,
+    ) -> List[str]:
+        """Works out which variables of a table get_acs should request.
+        Returns None if we want the whole table"""
+        if variables is None and label_filter is None:
+            return None
+
+        selected = []
+        if variables is not None:
+            prefix = tableid.upper() + "_"
+            selected += [v for v in variables if v.upper().startswith(prefix)]
+        if label_filter is not None:
+            matches = load_decoder(varfile).select(tableid, label_filter)
+            selected += [v for v in matches if v not in selected]
+
+        if len(selected) == 0:
+            raise ValueError(
+                f"None of the requested variables are in table {tableid}. Check variables and label_filter"
+            )
+        return selected
+
+    def _clean_locations(
+        self, location: Union[Dict[str, str], List[Dict[str, str]]]
+    ) -> List[GeoKey]:
+        """Parses every location into a GeoKey, which has the state split off of 7-digit city codes
+        and [state]_[county] county codes. The locations passed in are left as they are, so the same
+        list can be reused across calls. Returns a list of GeoKeys"""
+        # If there is only one location passed
+        if isinstance(location, (dict, str, GeoKey)):
+            location = [location]
+        return [GeoKey.parse(loc) for loc in location]
+
+    async def _plan_tables(
+        self,
+        vars: List[str],
+        years: range,
+        tabletype: Union[str, List[str]] = None,
+        infer_type: bool = True,
+        varfile: Union[str, List[str]] = None,
+        estimate: Union[int, str] = "5",
+        variables: List[str] = None,
+        label_filter: Union[str, List[str]] = None,
+        debug: bool = False,
+    ) -> List[Tuple[str, str, Union[str, Dict[int, str]], List[str]]]:
+        """Works out the table type, variables file, and variables to request for each table.
+        Returns a list of (tableid, tabletype, varfile, variables). Inferred variables files
+        are {year: file} dictionaries, so each year is decoded with its own variables, and any
+        that aren't available yet are downloaded (see prefetch_variables). Variables picked with
+        label_filter are looked up in the variables of the last year"""
+        # Split the vars into equal partitions
+        if infer_type:
+            tabletypes = [self._infer_table_type(var) for var in vars]
+            if debug:
+                print(tabletypes)
+        else:
+            tabletypes = (
+                tabletype if isinstance(tabletype, list) else [tabletype] * len(vars)
+            )
 
-        return acs_subject_pivoted
+        if varfile is None:  # We want to infer which file to use
+            inferred = await self.prefetch_variables(
+                years=years,
+                tabletypes=sorted(set(tabletypes)),
+                estimate=estimate,
+                debug=debug,
+            )
+            varfiles = [
+                {year: inferred[(year, tabletype)] for year in years}
+                for tabletype in tabletypes
+            ]
+        elif isinstance(varfile, str):
+            varfiles = [varfile] * len(vars)
+        else:
+            varfiles = varfile
+
+        # Work out which variables to request for each table
+        return [
+            (
+                table,
+                tabletypes[i],
+                varfiles[i],
+                self._resolve_variables(
+                    tableid=table,
+                    varfile=varfile_for(varfiles[i]),
+                    variables=variables,
+                    label_filter=label_filter,
+                ),
+            )
+            for i, table in enumerate(vars)
+        ]
 
     async def _tables_range(
         self,
         tableid: str,
-        location: Dict[str, str],
+        location: Union[Dict[str, str], List[Dict[str, str]]],
         start_year: Union[int, str] = "2015",
         end_year: Union[int, str] = "2019",
         tabletype: str = "detail",
         varfile: str = "subject_vars_2019.json",
         estimate: Union[int, str] = "5",
+        variables: List[str] = None,
+        layout: str = "wide",
         debug: bool = False,
     ):
         """Helper function to get multiple years of ACS data for a single subject and return them as a single dataframe"""
         year_range = range(int(start_year), int(end_year) + 1)
+        location = self._clean_locations(location)
+
+        # Locations in the same state and at the same geography level
+        # are collected together with a single call per year
+        batches = self._plan_batches(location)
+        jobs = [(year, batch) for year in year_range for batch in batches]
+
+        batch_results = await asyncio.gather(
+            *[
+                self._process_batch(
+                    tableid=tableid,
+                    year=year,
+                    locations=[loc for _, loc in batch],
+                    tabletype=tabletype,
+                    estimate=estimate,
+                    varfile=varfile,
+                    variables=variables,
+                    layout=layout,
+                    debug=debug,
+                )
+                for year, batch in jobs
+            ]
+        )
 
-        if isinstance(location, dict):  # If there is only one location passed
-            # Clean location
-            if "city" in location.keys():
-                if len(location["city"]) == 7:
-                    if "state" not in location.keys():
-                        location["state"] = location["city"][
-                            0:2
-                        ]  # Add the state code to the state key
-                    location["city"] = location["city"][2:]  # shave off the state code
-            if "county" in location.keys():  # Clean the county
-                if "_" in location["county"]:
-                    splt = location["county"].split("_")
-                    location["county"] = splt[-1]
-                    if "state" not in location.keys():
-                        location["state"] = splt[0]
-
-            results = await asyncio.gather(
-                *[
-                    self._process_request(
-                        tableid=tableid,
-                        year=year,
-                        location=location,
-                        tabletype=tabletype,
-                        estimate=estimate,
-                        varfile=varfile,
-                        debug=debug,
-                    )
-                    for year in year_range
-                ]
-            )
-        elif isinstance(location, list):  # If there is more than one location passed in
-            for loc in location:
-                if "city" in loc.keys():
-                    if len(loc["city"]) == 7:
-                        if "state" not in loc.keys():
-                            loc["state"] = loc["city"][
-                                0:2
-                            ]  # Add the state code to the state key
-                        loc["city"] = loc["city"][2:]  # shave off the state code
-                if "county" in loc.keys():  # Clean the county
-                    if "_" in loc["county"]:
-                        splt = loc["county"].split("_")
-                        loc["county"] = splt[-1]
-                        if "state" not in loc.keys():
-                            loc["state"] = splt[0]
-
-            results = await asyncio.gather(
-                *[
-                    self._process_request(
-                        tableid=tableid,
-                        year=year,
-                        location=loc,
-                        tabletype=tabletype,
-                        estimate=estimate,
-                        varfile=varfile,
-                        debug=debug,
-                    )
-                    for year in year_range
-                    for loc in location
-                ]
-            )
-
-        res = pd.concat(results)
-
-        return res
+        return frames.assemble(
+            [(year, batch, df) for (year, batch), df in zip(jobs, batch_results)],
+            n_locations=len(location),
+            start_year=year_range.start,
+            layout=layout,
+            varfile=varfile,
+        )
 
     async def get_acs(
         self,
@@ -386,6 +1099,9 @@ class ACSClient(object):
         varfile: Union[str, List[str]] = None,
         estimate: Union[int, str] = "5",
         join: bool = False,
+        variables: List[str] = None,
+        label_filter: Union[str, List[str]] = None,
+        layout: str = "wide",
         debug: bool = False,
     ):
         """get_acs queries the ACS API and gathers data for any subject or data table into pandas dataframes
@@ -407,6 +1123,10 @@ class ACSClient(object):
                 "city": str, FIPS code for the city of interest
             }
             NOTE: You may also pass a list of location dictionaries -- this is the preferred method, since it will parallelize easily
+            NOTE: Pass "*" as the city or county to get every city or county in a state with one call,
+            e.g. {"state": "06", "city": "*"}. These return a compact dataframe indexed by FIPS code with a "year" column
+            NOTE: FIPS codes in the lowe.locations.lookup format ("0636448", "06_065", "06") and
+            lowe.locations.geokey.GeoKey objects work too. The location dictionaries are never modified
         translate_location: bool
             Whether or not we want to convert the location dictionary to FIPS codes. This essentially does
                 location = lowe.locations.lookups.name2fips(location)
@@ -423,11 +1143,27 @@ class ACSClient(object):
             Whether or not we want to infer table types
         varfile: Union[str, List[str]]
             File (or list of files) that should be used to translate variable names
-            NOTE: Pass None (default) if you want to infer the varfile.
+            NOTE: Pass None (default) if you want to infer the varfile. Inferred varfiles are picked per year,
+            and the ones that don't ship with lowe are downloaded once (see prefetch_variables)
         estimate: Union[int,str]
             ACS estimates to gather (1, 3, or 5-year)
         join: bool, optional
             Whether or not to join all the results together into one large table, by default True
+        variables: List[str], optional
+            Variable codes to collect, e.g. ["S1901_C01_012E", "S1901_C01_013E"]. Only these variables
+            are requested from the API instead of the whole table, which is much faster.
+            Each table in vars gets the variables that start with its table id.
+            By default None (collect every variable in the tables)
+        label_filter: Union[str, List[str]], optional
+            Only collect the variables whose column name (concept and label) matches this regular expression.
+            Pass a list to collect the variables with exactly those column names.
+            Can be combined with variables, by default None
+        layout: str, optional
+            "wide" (default) for one row per year and location with a column for each variable, or "long"
+            for one row per variable, year, and location with the columns
+            variable_code, year, geo_fips, estimate, and moe. variable_code and geo_fips are categorical,
+            and the labels of the variable codes are in the frame's attrs["variables"] dataframe.
+            With the long layout and join=True, the tables are stacked into one long frame
         debug: bool, optional
             If True, prints out extra information useful for debugging
 
@@ -436,57 +1172,44 @@ class ACSClient(object):
         pd.DataFrame, List[pd.DataFrame]
             If only one table is called, then returns the dataframe. Else, return a list of dataframes
         """
-        # Split the vars into equal partitions
-        if infer_type:
-            tabletypes = [self._infer_table_type(var) for var in vars]
-            if debug:
-                print(tabletypes)
+        tables = await self._plan_tables(
+            vars=vars,
+            years=range(int(start_year), int(end_year) + 1),
+            tabletype=tabletype,
+            infer_type=infer_type,
+            varfile=varfile,
+            estimate=estimate,
+            variables=variables,
+            label_filter=label_filter,
+            debug=debug,
+        )
 
         # Translate the dictionary to FIPS values if necessary
         if translate_location:
             location = name2fips(location)
 
-        if varfile is None:  # We want to infer which file to use
-            varfile = [
-                self._infer_varfile(
-                    tabletype=tabletype, year="2019"
-                )  # NOTE: This may not work in later years
-                for tabletype in tabletypes
+        dfs = await asyncio.gather(
+            *[
+                self._tables_range(
+                    tableid=table,
+                    start_year=start_year,
+                    end_year=end_year,
+                    location=location,
+                    tabletype=table_type,
+                    varfile=table_varfile,
+                    estimate=estimate,
+                    variables=table_vars,
+                    layout=layout,
+                    debug=debug,
+                )
+                for table, table_type, table_varfile, table_vars in tables
             ]
-            varfile = varfile[0] if len(varfile) == 1 else varfile
-
-        if isinstance(varfile, str):
-            dfs = await asyncio.gather(
-                *[
-                    self._tables_range(
-                        tableid=table,
-                        start_year=start_year,
-                        end_year=end_year,
-                        location=location,
-                        tabletype=tabletypes[0],
-                        estimate=estimate,
-                        varfile=varfile,
-                        debug=debug,
-                    )
-                    for table in vars
-                ]
-            )
-        elif isinstance(varfile, list):
-            dfs = await asyncio.gather(
-                *[
-                    self._tables_range(
-                        tableid=table,
-                        start_year=start_year,
-                        end_year=end_year,
-                        location=location,
-                        tabletype=tabletypes[i],
-                        varfile=varfile[i],
-                        estimate=estimate,
-                        debug=debug,
-                    )
-                    for i, table in enumerate(vars)
-                ]
-            )
+        )
+
+        if join and layout == "long":
+            res = frames.concat_long(dfs)
+            res.attrs["variables"] = pd.concat([df.attrs["variables"] for df in dfs])
+            return res
 
         if join:
             # Iterate through the dfs and join them together on 'year'
@@ -498,6 +1221,243 @@ class ACSClient(object):
         else:
             return dfs[0] if len(dfs) == 1 else dfs
 
+    async def get_acs_resilient(
+        self,
+        vars: List[str],
+        start_year: Union[int, str],
+        end_year: Union[int, str],
+        location: Union[Dict[str, str], List[Dict[str, str]]],
+        translate_location: bool = False,
+        tabletype: Union[str, List[str]] = None,
+        infer_type: bool = True,
+        varfile: Union[str, List[str]] = None,
+        estimate: Union[int, str] = "5",
+        variables: List[str] = None,
+        label_filter: Union[str, List[str]] = None,
+        layout: str = "wide",
+        retries: int = 2,
+        retry_concurrency: int = 4,
+        retry_delay: float = 1.0,
+        debug: bool = False,
+    ) -> ACSResult:
+        """get_acs_resilient is the fault tolerant version of get_acs for large pulls. A failing request
+        (a geography that doesn't exist for a year, an empty response, or a server error that outlasted
+        the usual retries) doesn't throw away everything else: the results that came back are kept, and
+        the failed requests go into a retry queue, split into one request per location, that runs with
+        its own (smaller) concurrency budget. Whatever still fails after that ends up in the failure manifest.
+        Takes the same parameters as get_acs (besides join), plus:
+
+        Parameters
+        ----------
+        retries : int, optional
+            Number of times failed requests are re-driven through the retry queue, by default 2
+        retry_concurrency : int, optional
+            Maximum number of retries in flight at once, by default 4
+        retry_delay : float, optional
+            Seconds to wait before each round of retries, by default 1
+
+        Returns
+        -------
+        ACSResult
+            result.frames has the dataframe of each table (result["S1901"] for one table), and
+            result.failures is a dataframe with the table, year, location, and reason of each failure
+        """
+        tables = await self._plan_tables(
+            vars=vars,
+            years=range(int(start_year), int(end_year) + 1),
+            tabletype=tabletype,
+            infer_type=infer_type,
+            varfile=varfile,
+            estimate=estimate,
+            variables=variables,
+            label_filter=label_filter,
+            debug=debug,
+        )
+
+        if translate_location:
+            location = name2fips(location)
+        location = self._clean_locations(location)
+        year_range = range(int(start_year), int(end_year) + 1)
+
+        result = ACSResult(
+            tables,
+            n_locations=len(location),
+            start_year=year_range.start,
+            layout=layout,
+        )
+
+        async def fetch(job):
+            (table, table_type, table_varfile, table_vars), year, batch = job
+            return await self._process_batch(
+                tableid=table,
+                year=year,
+                locations=[loc for _, loc in batch],
+                tabletype=table_type,
+                estimate=estimate,
+                varfile=table_varfile,
+                variables=table_vars,
+                layout=layout,
+                debug=debug,
+            )
+
+        async def collect(job, semaphore=None):
+            """Collects a job, returning the job and the exception if it failed"""
+            (table, _, _, _), year, batch = job
+            try:
+                if semaphore is None:
+                    df = await fetch(job)
+                else:
+                    async with semaphore:
+                        df = await fetch(job)
+            except Exception as e:
+                if debug:
+                    print(f"request failed: {table} {year} {batch}: {e}")
+                return job, e
+            result.add(table, year, batch, df)
+            return job, None
+
+        jobs = [
+            (table, year, batch)
+            for table in tables
+            for year in year_range
+            for batch in self._plan_batches(location)
+        ]
+        done = await asyncio.gather(*[collect(job) for job in jobs])
+        failed = [(job, error) for job, error in done if error is not None]
+
+        # Retry queue: failed batches are split up so one bad location can't sink the others
+        semaphore = asyncio.Semaphore(retry_concurrency)
+        for attempt in range(retries):
+            if len(failed) == 0:
+                break
+            await asyncio.sleep(retry_delay)
+            queue = [
+                (table, year, [pair])
+                for (table, year, batch), _ in failed
+                for pair in batch
+            ]
+            if debug:
+                print(f"retrying {len(queue)} failed requests (attempt {attempt + 1})")
+            done = await asyncio.gather(*[collect(job, semaphore) for job in queue])
+            failed = [(job, error) for job, error in done if error is not None]
+
+        for (table, year, batch), error in failed:
+            for _, loc in batch:
+                result.fail(table[0], year, loc.as_dict(), error, attempts=retries + 1)
+
+        return result
+
+    async def iter_acs(
+        self,
+        vars: List[str],
+        start_year: Union[int, str],
+        end_year: Union[int, str],
+        location: Union[Dict[str, str], List[Dict[str, str]]],
+        translate_location: bool = False,
+        tabletype: Union[str, List[str]] = None,
+        infer_type: bool = True,
+        varfile: Union[str, List[str]] = None,
+        estimate: Union[int, str] = "5",
+        variables: List[str] = None,
+        label_filter: Union[str, List[str]] = None,
+        layout: str = "wide",
+        debug: bool = False,
+        max_pending: int = None,
+    ) -> AsyncIterator[Tuple[str, int, Dict[str, str], pd.DataFrame]]:
+        """iter_acs is the streaming version of get_acs: instead of waiting for every request to finish,
+        it yields the dataframe for each table, year, and location as soon as it comes back from the API,
+        so results can be written out (or looked at) while the rest of the pull is still running.
+        Takes the same parameters as get_acs (besides join), plus
+
+        max_pending : int, optional
+            Most requests started but not yielded yet, by default the limiter's max_concurrency.
+            A new request only starts once an earlier result has been yielded, so a consumer that
+            is slower than the API doesn't pile up results in memory
+
+        Yields
+        -------
+        Tuple[str, int, Dict[str, str], pd.DataFrame]
+            (tableid, year, location, dataframe), in the order the requests complete.
+            State-wide locations like {"state": "06", "city": "*"} yield a single dataframe with every location
+        """
+        tables = await self._plan_tables(
+            vars=vars,
+            years=range(int(start_year), int(end_year) + 1),
+            tabletype=tabletype,
+            infer_type=infer_type,
+            varfile=varfile,
+            estimate=estimate,
+            variables=variables,
+            label_filter=label_filter,
+            debug=debug,
+        )
+
+        if translate_location:
+            location = name2fips(location)
+        location = self._clean_locations(location)
+        batches = self._plan_batches(location)
+        year_range = range(int(start_year), int(end_year) + 1)
+
+        async def collect(table, table_type, table_varfile, table_vars, year, batch):
+            df = await self._process_batch(
+                tableid=table,
+                year=year,
+                locations=[loc for _, loc in batch],
+                tabletype=table_type,
+                estimate=estimate,
+                varfile=table_varfile,
+                variables=table_vars,
+                layout=layout,
+                debug=debug,
+            )
+            return table, table_varfile, year, batch, df
+
+        if max_pending is None:
+            max_pending = self.limiter.max_concurrency
+        jobs = (
+            (table, year, batch)
+            for table in tables
+            for year in year_range
+            for batch in batches
+        )
+        pending = set()
+
+        def top_up():
+            """Starts requests until max_pending are started but not yielded"""
+            while len(pending) < max(1, max_pending):
+                job = next(jobs, None)
+                if job is None:
+                    return
+                table, year, batch = job
+                pending.add(asyncio.ensure_future(collect(*table, year, batch)))
+
+        try:
+            top_up()
+            while len(pending) > 0:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    table, table_varfile, year, batch, df = task.result()
+
+                    # Each location has the same number of rows in a batch frame
+                    n = len(df) // len(batch)
+                    for j, (_, loc) in enumerate(batch):
+                        part = df.iloc[j * n : (j + 1) * n]
+                        if layout == "long":
+                            part = part.reset_index(drop=True)
+                            part.attrs["variables"] = frames.variable_metadata(
+                                varfile_for(table_varfile, year),
+                                part["variable_code"].cat.categories,
+                            )
+                        yield table, year, loc.as_dict(), part
+                    pending.discard(task)
+                    top_up()
+        finally:
+            # Don't leave requests running if the caller stops iterating early
+            for task in pending:
+                task.cancel()
+
 
 """
 async def main():
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from typing import Dict, List, Tuple
+
+
+def _pivot(df: pd.DataFrame) -> Tuple[pd.Index, pd.Index, np.ndarray, np.ndarray]:
+    """Lays a long frame out as (geography x (year, variable)) arrays of estimates and MOEs
+
+    Returns
+    -------
+    Tuple[pd.Index, pd.Index, np.ndarray, np.ndarray]
+        Geographies, (year, variable_code) pairs, estimates, and margins of error
+    """
+    geo_codes, geos = pd.factorize(df["geo_fips"].astype(object))
+    col_codes, cols = pd.factorize(
+        pd.MultiIndex.from_arrays([df["year"], df["variable_code"].astype(object)])
+    )
+    estimates = np.full((len(geos), len(cols)), np.nan)
+    moes = np.full((len(geos), len(cols)), np.nan)
+    estimates[geo_codes, col_codes] = df["estimate"].to_numpy(dtype=np.float64)
+    moes[geo_codes, col_codes] = df["moe"].to_numpy(dtype=np.float64)
+    return pd.Index(geos), cols, estimates, moes
+
+
+def _frame(
+    names: List[str], cols: pd.Index, estimates: np.ndarray, moes: np.ndarray
+) -> pd.DataFrame:
+    """Long frame with one row per (group, year, variable) from (group x column) arrays"""
+    years, codes = cols.get_level_values(0), cols.get_level_values(1)
+    return pd.DataFrame(
+        {
+            "variable_code": pd.Categorical(np.tile(codes, len(names))),
+            "year": np.tile(years.to_numpy(), len(names)),
+            "group": pd.Categorical(
+                np.repeat(np.asarray(names, dtype=object), len(cols))
+            ),
+            "estimate": estimates.ravel(),
+            "moe": moes.ravel(),
+        }
+    )
+
+
+def aggregate(df: pd.DataFrame, groups: Dict[str, List[str]]) -> pd.DataFrame:
+    """Sums the estimates of a long frame (see get_acs(layout="long")) over groups of geographies,
+    e.g. {"Coachella Valley": ["0606434", "0614260", ...]}. The margin of error of each sum is the
+    root sum of squares of the members' margins of error, the Census Bureau's approximation for
+    derived estimates. Every group is computed in one matrix product, and groups can overlap.
+
+    Only sum count estimates: percentages, medians, and means can't be added up.
+    A sum is missing if any member's estimate is missing; missing margins of error (e.g. for
+    controlled estimates) count as 0.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long frame with the columns variable_code, year, geo_fips, estimate, and moe
+    groups : Dict[str, List[str]]
+        Name of each group -> FIPS codes of its members (as in the geo_fips column)
+
+    Returns
+    -------
+    pd.DataFrame
+        Long frame with one row per (group, year, variable) and the columns
+        variable_code, year, group, estimate, and moe
+    """
+    geos, cols, estimates, moes = _pivot(df)
+    names = list(groups.keys())
+
+    # membership[i, j] is 1 if geography j is in group i
+    membership = np.zeros((len(names), len(geos)))
+    for i, members in enumerate(groups.values()):
+        positions = geos.get_indexer(list(members))
+        if (positions < 0).any():
+            missing = [m for m, p in zip(members, positions) if p < 0]
+            raise KeyError(
+                f"{names[i]} has members that aren't in the frame: {missing}"
+            )
+        membership[i, positions] = 1
+
+    sums = membership @ np.nan_to_num(estimates)
+    sums[(membership @ np.isnan(estimates)) > 0] = np.nan
+    errors = np.sqrt(membership @ np.nan_to_num(moes) ** 2)
+    return _frame(names, cols, sums, errors)
+
+
+def aggregate_except(df: pd.DataFrame, members: List[str] = None) -> pd.DataFrame:
+    """For every member X of a region, sums the estimates of every other member ("rest of the
+    region except X"), with margins of error propagated like in aggregate. All of them come
+    out of one pass: the region total minus each member.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long frame with the columns variable_code, year, geo_fips, estimate, and moe
+    members : List[str], optional
+        FIPS codes of the members of the region, by default every geography in the frame
+
+    Returns
+    -------
+    pd.DataFrame
+        Long frame with the columns variable_code, year, group, estimate, and moe, where
+        group X holds the sum over every member except X
+    """
+    geos, cols, estimates, moes = _pivot(df)
+    if members is not None:
+        positions = geos.get_indexer(list(members))
+        if (positions < 0).any():
+            missing = [m for m, p in zip(members, positions) if p < 0]
+            raise KeyError(f"members that aren't in the frame: {missing}")
+        geos, estimates, moes = geos[positions], estimates[positions], moes[positions]
+
+    values = np.nan_to_num(estimates)
+    sums = values.sum(axis=0) - values
+    nans = np.isnan(estimates)
+    sums[(nans.sum(axis=0) - nans) > 0] = np.nan
+
+    squares = np.nan_to_num(moes) ** 2
+    errors = np.sqrt(np.clip(squares.sum(axis=0) - squares, 0, None))
+    return _frame(list(geos), cols, sums, errors)
@@ -0,0 +1,198 @@
+import datetime
+import hashlib
+import json
+import os
+import time
+
+from typing import Union, List, Dict, Any
+
+# -------------------------------
+# Utility Functions
+# -------------------------------
+
+
+def default_cache_dir() -> str:
+    """Directory where the lowe package keeps its on-disk caches.
+    Set the LOWE_CACHE_DIR environment variable to move it somewhere else"""
+    return os.environ.get(
+        "LOWE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "lowe")
+    )
+
+
+# -------------------------------
+# Response Cache
+# -------------------------------
+
+
+class ResponseCache(object):
+    def __init__(
+        self,
+        cache_dir: str = None,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl: float = 7 * 24 * 60 * 60,
+        ttl_from_year: Union[int, str] = None,
+    ):
+        """ResponseCache is a content-addressed on-disk cache for raw ACS API responses.
+        Published ACS vintages never change, so a response only has to be downloaded once.
+
+        Parameters
+        ----------
+        cache_dir : str, optional
+            Directory to store the responses in, by default [default_cache_dir()]/acs
+        max_bytes : int, optional
+            Maximum size of the cache on disk. Least recently used entries are evicted
+            once the cache grows past this, by default 512 MB
+        ttl : float, optional
+            Time to live (in seconds) for entries of the most recent vintages, by default one week
+        ttl_from_year : Union[int, str], optional
+            Entries for this year and later expire after ttl seconds. Older vintages never expire.
+            By default, last year (the vintage that is still being released)
+        """
+        self.cache_dir = (
+            cache_dir
+            if cache_dir is not None
+            else os.path.join(default_cache_dir(), "acs")
+        )
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.ttl_from_year = (
+            int(ttl_from_year)
+            if ttl_from_year is not None
+            else datetime.date.today().year - 1
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._size = None  # Lazily computed the first time we write
+
+    def _key(
+        self,
+        year: Union[int, str],
+        survey: str,
+        tabletype: str,
+        tableid: str,
+        geography: str,
+    ) -> str:
+        """Hashes the request parameters into the key used for the file name"""
+        parts = [str(year), str(survey), str(tabletype), str(tableid), str(geography)]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        # Shard by the first two characters so no directory gets too large
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _expired(self, year: Union[int, str], created: float) -> bool:
+        try:
+            volatile = int(year) >= self.ttl_from_year
+        except ValueError:
+            volatile = True
+        return volatile and time.time() - created > self.ttl
+
+    def _entries(self) -> List[os.DirEntry]:
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for shard in os.scandir(self.cache_dir):
+            if shard.is_dir():
+                entries.extend(e for e in os.scandir(shard.path) if e.is_file())
+        return entries
+
+    def get(
+        self,
+        year: Union[int, str],
+        survey: str,
+        tabletype: str,
+        tableid: str,
+        geography: str,
+    ) -> Any:
+        """Returns the cached response for the request, or None if it is missing or expired"""
+        path = self._path(self._key(year, survey, tabletype, tableid, geography))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        if self._expired(year, entry["created"]):
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        # Touch the file so eviction treats it as recently used
+        os.utime(path, None)
+        self.hits += 1
+        return entry["payload"]
+
+    def put(
+        self,
+        year: Union[int, str],
+        survey: str,
+        tabletype: str,
+        tableid: str,
+        geography: str,
+        payload: Any,
+    ):
+        """Stores a response in the cache, evicting old entries if the cache is full"""
+        path = self._path(self._key(year, survey, tabletype, tableid, geography))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        entry = {
+            "request": [str(year), survey, tabletype, tableid, geography],
+            "created": time.time(),
+            "payload": payload,
+        }
+
+        # Write to a temporary file first so readers never see half-written entries
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp, path)
+
+        if self._size is None:
+            self._size = sum(e.stat().st_size for e in self._entries())
+        else:
+            self._size += os.path.getsize(path) - old_size
+
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _remove(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        if self._size is not None:
+            self._size -= size
+
+    def _evict(self):
+        """Removes least recently used entries until the cache is at 90% of max_bytes"""
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        target = int(self.max_bytes * 0.9)
+        for entry in entries:
+            if self._size <= target:
+                break
+            self._remove(entry.path)
+            self.evictions += 1
+
+    def clear(self):
+        """Deletes every entry in the cache"""
+        for entry in self._entries():
+            self._remove(entry.path)
+        self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the cache hit/miss counters and the current size of the cache"""
+        if self._size is None:
+            self._size = sum(e.stat().st_size for e in self._entries())
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries()),
+            "bytes": self._size,
+        }
@@ -0,0 +1,300 @@
+import functools
+import numpy as np
+import pandas as pd
+
+from pandas.api.types import union_categoricals
+from typing import Dict, List, Tuple, Union
+
+from .variables import load_decoder, varfile_for
+
+# Geography columns the API appends to every response, in the order it appends them
+GEO_HEADERS = ("us", "state", "county", "place")
+
+# Columns of the long layout that are stored as categoricals
+CATEGORICAL_COLUMNS = ("variable_code", "geo_fips")
+
+# Values the Census Bureau puts in place of estimates and margins of error that can't be
+# computed or shown (e.g. -666666666 when there are too few sample observations)
+SENTINELS = np.array(
+    [-999999999, -888888888, -666666666, -555555555, -333333333, -222222222],
+    dtype=np.float64,
+)
+
+
+def to_numeric(values: np.ndarray) -> np.ndarray:
+    """Converts a 2D object array of API values to float64, with NaN for nulls,
+    unparseable values, and Census sentinel values"""
+    try:
+        numbers = values.astype(np.float64)
+    except (TypeError, ValueError):
+        # Slow path for the odd non-numeric value (e.g. "N" or "(X)")
+        numbers = np.column_stack(
+            [pd.to_numeric(col, errors="coerce") for col in values.T]
+        ).reshape(values.shape)
+    numbers[np.isin(numbers, SENTINELS)] = np.nan
+    return numbers
+
+
+class ResponseLayout(object):
+    def __init__(self, header: Tuple[str, ...], varfile: str):
+        """ResponseLayout describes how the columns of an API response map onto the columns
+        of our dataframes: which ids are data (known, not duplicated, and not GEO_ID), what their
+        concept labels are, and where the geography columns are. The layout only depends on the
+        header, which is the same for every response for a (year, table) pair, so it is worked
+        out once and reused for every row and every location.
+
+        Parameters
+        ----------
+        header : Tuple[str, ...]
+            First row of an API response
+        varfile : str
+            Variables file used to translate the ids into labels
+        """
+        self.header = header
+
+        labels = load_decoder(varfile).decode(header)
+        mask = pd.notna(labels) & (np.asarray(header, dtype=object) != "GEO_ID")
+        mask &= ~pd.Index(labels).duplicated()  # Keep the first of any duplicate labels
+
+        self.keep = np.flatnonzero(mask)
+        self.labels = pd.Index(labels[mask], name="concept_label")
+
+        # Positions (within the kept columns) of the numeric variables
+        types = load_decoder(varfile).dtypes(header)[mask]
+        self.ints = np.flatnonzero(types == "int")
+        self.numeric = np.flatnonzero((types == "int") | (types == "float"))
+
+        self.geo = {col: header.index(col) for col in GEO_HEADERS if col in header}
+
+        # Positions of the estimate and margin of error of each variable code,
+        # worked out the first time a long frame is built
+        self.varfile = varfile
+        self._long = None
+
+    def values(self, rows: List[list]) -> np.ndarray:
+        """Returns the data columns of the rows as a 2D object array"""
+        data = np.asarray(rows, dtype=object).reshape(len(rows), len(self.header))
+        return data[:, self.keep]
+
+    def frame(self, rows: List[list], index: pd.Index) -> pd.DataFrame:
+        """Builds a dataframe of the data columns for every row in one go. Numeric variables
+        are decoded straight to Int64 or float64 columns, with sentinel values as missing
+        """
+        values = self.values(rows)
+        numbers = to_numeric(values[:, self.numeric])
+
+        columns = dict(enumerate(values.T))
+        ints = set(self.ints)
+        for i, col in zip(self.numeric, numbers.T):
+            columns[i] = pd.array(col, dtype="Int64") if i in ints else col
+
+        df = pd.DataFrame(columns, index=index)
+        df.columns = self.labels
+        return df
+
+    def long_columns(self) -> Tuple[pd.Index, np.ndarray, np.ndarray]:
+        """Pairs up the estimate and margin of error ids in the header (e.g. "DP05_0001E"
+        and "DP05_0001M") under their variable code ("DP05_0001")
+
+        Returns
+        -------
+        Tuple[pd.Index, np.ndarray, np.ndarray]
+            Variable codes, and the header positions of their estimates and margins of
+            error (-1 where the response doesn't have one)
+        """
+        if self._long is None:
+            decoder = load_decoder(self.varfile)
+            positions = {}
+            for pos, id in enumerate(self.header):
+                if id == "GEO_ID" or id not in decoder or id[-1] not in ("E", "M"):
+                    continue
+                pair = positions.setdefault(id[:-1], [-1, -1])
+                pair[0 if id[-1] == "E" else 1] = pos
+
+            pairs = np.array(list(positions.values()), dtype=np.intp).reshape(-1, 2)
+            self._long = (pd.Index(positions.keys()), pairs[:, 0], pairs[:, 1])
+        return self._long
+
+    def long(
+        self, rows: List[list], year: Union[int, str], fips: List[str]
+    ) -> pd.DataFrame:
+        """Builds a long frame with one row per (variable code, location) and the columns
+        variable_code, year, geo_fips, estimate, and moe"""
+        codes, estimates, moes = self.long_columns()
+        data = np.asarray(rows, dtype=object).reshape(len(rows), len(self.header))
+
+        columns = []
+        for pos in (estimates, moes):
+            values = np.full((len(rows), len(codes)), np.nan)
+            found = pos >= 0
+            values[:, found] = to_numeric(data[:, pos[found]])
+            columns.append(values.ravel())
+
+        return pd.DataFrame(
+            {
+                "variable_code": pd.Categorical.from_codes(
+                    np.tile(np.arange(len(codes)), len(rows)), categories=codes
+                ),
+                "year": np.full(len(rows) * len(codes), int(year)),
+                "geo_fips": pd.Categorical(np.repeat(np.asarray(fips), len(codes))),
+                "estimate": columns[0],
+                "moe": columns[1],
+            }
+        )
+
+    def fips(self, rows: List[list], level: str) -> np.ndarray:
+        """Returns the lowe.locations FIPS code of each row, e.g. "0636448" for a city
+        or "06_065" for a county"""
+        geo = np.asarray(rows, dtype=object)[:, list(self.geo.values())]
+        cols = dict(zip(self.geo.keys(), geo.T))
+        if level == "city":
+            return cols["state"] + cols["place"]
+        if level == "county":
+            return cols["state"] + "_" + cols["county"]
+        return cols["us"] if level == "us" else cols["state"]
+
+
+@functools.lru_cache(maxsize=256)
+def get_layout(header: Tuple[str, ...], varfile: str) -> ResponseLayout:
+    """Returns the (cached) layout for a response header"""
+    return ResponseLayout(header, varfile)
+
+
+def build_frame(
+    resp: List[list],
+    year: Union[int, str],
+    varfile: str,
+) -> pd.DataFrame:
+    """Turns a raw [[header], [row], ...] response into a dataframe with one row per
+    geography in the response, indexed by year
+
+    Parameters
+    ----------
+    resp : List[list]
+        JSON response from the API (or the cache)
+    year : Union[int, str]
+        Year of the response
+    varfile : str
+        Variables file used to translate the ids into labels
+
+    Returns
+    -------
+    pd.DataFrame
+        Dataframe with a column for each concept label in the response
+    """
+    layout = get_layout(tuple(resp[0]), varfile)
+    rows = resp[1:]
+    return layout.frame(rows, index=pd.Index([year] * len(rows), name="year"))
+
+
+def location_columns(locations: List[Dict[str, str]], names: List[Dict[str, str]]):
+    """Works out the name columns (e.g. 'city' and 'state') and the 'location_key' column
+    for a list of locations, given their fips2name translations
+
+    Returns
+    -------
+    Dict[str, List[str]]
+        Column name -> value for each location
+    """
+    columns = {}
+    for key in names[0].keys() if names else []:
+        values = pd.Series([n[key] for n in names], dtype=object)
+        if key.lower() != "state":
+            values = values.str.split(",").str[0]
+        columns[key.lower()] = values.str.lower().tolist()
+
+    keys = [" ".join(parts) for parts in zip(*columns.values())] or [""] * len(
+        locations
+    )
+    # Empty location dictionaries are the whole country
+    columns["location_key"] = [
+        ("us" + (" " + key if key else "")) if not loc else key
+        for loc, key in zip(locations, keys)
+    ]
+    return columns
+
+
+def concat_long(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenates long frames, keeping variable_code and geo_fips categorical
+    (pd.concat falls back to object columns when the categories differ)"""
+    categories = {
+        col: union_categoricals([df[col] for df in frames]).categories
+        for col in CATEGORICAL_COLUMNS
+    }
+    dtypes = {col: pd.CategoricalDtype(cats) for col, cats in categories.items()}
+    return pd.concat([df.astype(dtypes) for df in frames], ignore_index=True)
+
+
+def variable_metadata(
+    varfile: Union[str, Dict[int, str]], codes: List[str]
+) -> pd.DataFrame:
+    """Metadata for the variable codes of a long frame: the concept label (the column
+    name in the wide layout), the label of the margin of error, and the predicate type
+
+    Parameters
+    ----------
+    varfile : Union[str, Dict[int, str]]
+        Variables file the codes come from (the latest one, for {year: file} dictionaries)
+    codes : List[str]
+        Variable codes, e.g. ["DP05_0001", "DP05_0002P"]
+
+    Returns
+    -------
+    pd.DataFrame
+        Dataframe indexed by variable_code with columns label, moe_label, and predicate_type
+    """
+    decoder = load_decoder(varfile_for(varfile))
+    codes = pd.Index(codes, name="variable_code")
+    estimates = codes + "E"
+    return pd.DataFrame(
+        {
+            "label": decoder.decode(estimates),
+            "moe_label": decoder.decode(codes + "M"),
+            "predicate_type": decoder.dtypes(estimates),
+        },
+        index=codes,
+    )
+
+
+def assemble(
+    parts: List[Tuple[int, List[Tuple[int, dict]], pd.DataFrame]],
+    n_locations: int,
+    start_year: int,
+    layout: str = "wide",
+    varfile: str = None,
+) -> pd.DataFrame:
+    """Concatenates the frames of several batches of one table, with the rows in (year, location) order
+
+    Parameters
+    ----------
+    parts : List[Tuple[int, List[Tuple[int, dict]], pd.DataFrame]]
+        (year, batch, frame) for each batch, where batch is a list of (position, location)
+        pairs as planned by ACSClient._plan_batches
+    n_locations : int
+        Number of locations that were requested
+    start_year : int
+        First year that was requested
+    layout : str, optional
+        "wide" or "long", by default "wide"
+    varfile : str, optional
+        Variables file of the table, used for the variable labels of long frames
+    """
+    # Each batch frame has the same number of rows for every location in it: one row in the wide
+    # layout (except state-wide batches, which have many rows for one location) or one row per
+    # variable in the long layout
+    positions = []
+    for year, batch, df in parts:
+        offset = (year - start_year) * n_locations
+        slots = [offset + i for i, _ in batch]
+        positions.append(np.repeat(slots, len(df) // len(slots)))
+
+    order = np.argsort(np.concatenate(positions), kind="stable")
+    if layout == "long":
+        res = concat_long([df for _, _, df in parts]).iloc[order]
+        res = res.reset_index(drop=True)
+        res.attrs["variables"] = variable_metadata(
+            varfile, res["variable_code"].cat.categories
+        )
+        return res
+
+    return pd.concat([df for _, _, df in parts]).iloc[order]
@@ -0,0 +1,111 @@
+import functools
+import numpy as np
+import pandas as pd
+
+from typing import Dict, List, Tuple, Union
+
+from .variables import load_decoder
+
+# Parts of a label that change between vintages without changing what the variable is
+INFLATION_YEAR = r"\b(?:19|20)\d{2}\s+inflation-adjusted"
+
+
+def normalize_labels(labels: pd.Series) -> pd.Series:
+    """Normalizes concept labels so the same variable matches across vintages: case, colons
+    (newer vintages write "Total:" where older ones write "Total"), whitespace, and the dollar
+    year of inflation-adjusted variables ("IN 2019 INFLATION-ADJUSTED DOLLARS") are ignored
+    """
+    return (
+        labels.str.casefold()
+        .str.replace(INFLATION_YEAR, "inflation-adjusted", regex=True)
+        .str.replace(":", "", regex=False)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+
+class HarmonizationIndex(object):
+    def __init__(self, varfiles: Dict[int, str]):
+        """HarmonizationIndex maps each (year, variable id) of a multi-year pull to a canonical key,
+        so frames of different vintages line up on the same columns instead of being widened into
+        a sparse union of every vintage's labels when they are concatenated.
+
+        Variables are matched across vintages on their normalized concept label (see normalize_labels).
+        The canonical key of a variable is its id in the latest vintage it appears in, and its canonical
+        label is the label it has there. Variables whose latest id is taken by a different variable in a
+        newer vintage get a "[year]:[id]" key so keys never collide.
+
+        Parameters
+        ----------
+        varfiles : Dict[int, str]
+            Variables file of each year, e.g. {2018: "subject_vars_2018.json", 2019: "subject_vars_2019.json"}
+        """
+        self.varfiles = varfiles
+
+        # Latest vintage first, so the first occurrence of a label is the reference
+        parts = []
+        for year in sorted(varfiles, reverse=True):
+            labels = load_decoder(varfiles[year]).labels
+            parts.append(
+                pd.DataFrame(
+                    {
+                        "year": int(year),
+                        "id": labels.index.to_numpy(),
+                        "label": labels.to_numpy(),
+                    }
+                )
+            )
+        df = pd.concat(parts, ignore_index=True)
+        df["normalized"] = normalize_labels(df["label"])
+
+        ref = df.drop_duplicates("normalized")
+        keys = ref["id"].where(
+            ~ref["id"].duplicated(), ref["year"].astype(str) + ":" + ref["id"]
+        )
+        canonical = pd.DataFrame(
+            {"key": keys.to_numpy(), "canonical_label": ref["label"].to_numpy()},
+            index=ref["normalized"].to_numpy(),
+        )
+        df = df.join(canonical, on="normalized")
+
+        # Labels that are repeated within a vintage keep their own id (wide frames drop them anyway)
+        repeated = df.duplicated(["year", "normalized"]).to_numpy()
+        df.loc[repeated, "key"] = df["year"].astype(str) + ":" + df["id"]
+        df.loc[repeated, "canonical_label"] = np.nan
+
+        self.frame = df.set_index(["year", "id"])[["key", "label", "canonical_label"]]
+
+    def keys(self, year: Union[int, str], ids: List[str]) -> np.ndarray:
+        """Canonical keys of variable ids of a year. Ids that aren't in the year's variables file
+        (e.g. GEO_ID or annotations) are their own key"""
+        keys = self.frame.loc[int(year), "key"].reindex(pd.Index(ids)).to_numpy()
+        missing = pd.isna(keys)
+        keys[missing] = np.asarray(ids, dtype=object)[missing]
+        return keys
+
+    def labels(self, year: Union[int, str]) -> Dict[str, str]:
+        """Concept label -> canonical label, for the labels of a year that change"""
+        frame = self.frame.loc[int(year)].dropna(subset=["canonical_label"])
+        changed = frame[frame["label"] != frame["canonical_label"]]
+        return dict(zip(changed["label"], changed["canonical_label"]))
+
+    def apply(
+        self, df: pd.DataFrame, year: Union[int, str], layout: str = "wide"
+    ) -> pd.DataFrame:
+        """Renames the columns of a wide frame (or the variable codes of a long frame) of a year
+        to their canonical labels (or keys)"""
+        if layout == "long":
+            codes = df["variable_code"].cat.categories
+            keys = self.keys(year, codes + "E")
+            # Long frames use the id without the trailing E, and so do their keys
+            df["variable_code"] = df["variable_code"].cat.rename_categories(
+                [key[:-1] for key in keys]
+            )
+            return df
+        return df.rename(columns=self.labels(year))
+
+
+@functools.lru_cache(maxsize=32)
+def get_index(varfiles: Tuple[Tuple[int, str], ...]) -> HarmonizationIndex:
+    """Returns the (cached) harmonization index for a tuple of (year, varfile) pairs"""
+    return HarmonizationIndex(dict(varfiles))
@@ -0,0 +1,140 @@
+import asyncio
+import email.utils
+import time
+
+from typing import Dict, Union
+
+# HTTP statuses the Census API sends back when we are going too fast
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: Union[str, None]) -> float:
+    """Parses a Retry-After header (either a number of seconds or an HTTP date)
+    into the number of seconds we should wait. Returns None if it can't be parsed"""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class AdaptiveLimiter(object):
+    def __init__(
+        self,
+        max_concurrency: int = 20,
+        rate: float = 10.0,
+        min_rate: float = 0.5,
+        max_rate: float = 50.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+    ):
+        """AdaptiveLimiter bounds the number of requests in flight with a semaphore and spaces
+        them out with a token bucket. Like aiolimiter's AsyncLimiter, it is used as
+        `async with limiter:` around each request.
+
+        The rate adapts to the API: every successful request raises it a little (up to max_rate),
+        and every 429/503 response cuts it (down to min_rate) and pauses everybody for the
+        duration of the Retry-After header, so retries don't all hit the API at once.
+
+        Parameters
+        ----------
+        max_concurrency : int, optional
+            Maximum number of requests in flight at once, by default 20
+        rate : float, optional
+            Starting number of requests per second, by default 10
+        min_rate : float, optional
+            Lowest rate we will throttle down to, by default 0.5 requests per second
+        max_rate : float, optional
+            Highest rate we will speed up to, by default 50 requests per second
+        increase : float, optional
+            Requests per second added to the rate after each successful request, by default 0.1
+        decrease : float, optional
+            Factor the rate is multiplied by when the API throttles us, by default 0.5
+        """
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+
+        self.in_flight = 0
+        self.queued = 0
+        self.retried = 0
+        self.throttles = 0
+
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._semaphore = None  # Created lazily so it binds to the running event loop
+
+    async def __aenter__(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+            try:
+                await self._take_token()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.in_flight -= 1
+        self._semaphore.release()
+        return False
+
+    async def _take_token(self):
+        while True:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+
+            # Refill the bucket. Allow a burst of at most one second's worth of requests
+            self._tokens = min(
+                max(self.rate, 1.0), self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def succeeded(self):
+        """Call after a successful request to (slowly) raise the rate"""
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def throttled(self, retry_after: float = None):
+        """Call after a 429/503 response to cut the rate and pause until retry_after seconds have passed"""
+        self.throttles += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self._tokens = 0.0
+        if retry_after is not None:
+            self._blocked_until = max(
+                self._blocked_until, time.monotonic() + retry_after
+            )
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Returns the current rate along with in-flight, queued, retried, and throttled counts"""
+        return {
+            "rate": self.rate,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "retried": self.retried,
+            "throttles": self.throttles,
+        }
@@ -0,0 +1,114 @@
+import aiohttp
+import json
+import pandas as pd
+
+from typing import Dict, List, Tuple
+
+from . import frames
+
+
+def failure_reason(error: BaseException) -> str:
+    """Short, human readable reason a request failed"""
+    if isinstance(error, aiohttp.ContentTypeError) or isinstance(
+        error, json.JSONDecodeError
+    ):
+        return (
+            "empty or non-JSON response "
+            "(the table may not exist for this year or geography)"
+        )
+    if isinstance(error, aiohttp.ClientResponseError):
+        return f"HTTP {error.status}: {error.message}"
+    if isinstance(error, KeyError):
+        return f"missing geography: {error.args[0] if error.args else error}"
+    return f"{type(error).__name__}: {error}"
+
+
+class ACSResult(object):
+    def __init__(
+        self,
+        tables: List[Tuple[str, str, str, List[str]]],
+        n_locations: int,
+        start_year: int,
+        layout: str = "wide",
+    ):
+        """ACSResult holds everything a resilient pull (ACSClient.get_acs_resilient) collected:
+        the dataframes for the requests that succeeded, and a manifest of the ones that didn't.
+
+        Parameters
+        ----------
+        tables : List[Tuple[str, str, str, List[str]]]
+            (tableid, tabletype, varfile, variables) for each table in the pull
+        n_locations : int
+            Number of locations in the pull
+        start_year : int
+            First year of the pull
+        layout : str, optional
+            "wide" or "long", by default "wide"
+        """
+        self.tables = [table for table, _, _, _ in tables]
+        self.varfiles = {table: varfile for table, _, varfile, _ in tables}
+        self.n_locations = n_locations
+        self.start_year = start_year
+        self.layout = layout
+
+        self._parts = {table: [] for table in self.tables}
+        self._failures = []
+
+    def add(self, table: str, year: int, batch: list, df: pd.DataFrame):
+        """Records the frame for a batch that was collected"""
+        self._parts[table].append((year, batch, df))
+
+    def fail(
+        self,
+        table: str,
+        year: int,
+        location: Dict[str, str],
+        error: BaseException,
+        attempts: int,
+    ):
+        """Records a location that couldn't be collected"""
+        self._failures.append(
+            {
+                "table": table,
+                "year": year,
+                "location": location,
+                "reason": failure_reason(error),
+                "error": error,
+                "attempts": attempts,
+            }
+        )
+
+    @property
+    def ok(self) -> bool:
+        """True if every request succeeded"""
+        return len(self._failures) == 0
+
+    @property
+    def frames(self) -> Dict[str, pd.DataFrame]:
+        """Dataframe of each table (in the same format get_acs returns), for everything that was collected"""
+        return {table: self[table] for table in self.tables}
+
+    @property
+    def failures(self) -> pd.DataFrame:
+        """Failure manifest: one row per (table, year, location) that couldn't be collected,
+        with the reason and number of attempts"""
+        return pd.DataFrame(
+            self._failures,
+            columns=["table", "year", "location", "reason", "error", "attempts"],
+        )
+
+    def __getitem__(self, table: str) -> pd.DataFrame:
+        parts = self._parts[table]
+        if len(parts) == 0:
+            return pd.DataFrame()
+        return frames.assemble(
+            parts,
+            n_locations=self.n_locations,
+            start_year=self.start_year,
+            layout=self.layout,
+            varfile=self.varfiles[table],
+        )
+
+    def __repr__(self):
+        collected = sum(len(parts) for parts in self._parts.values())
+        return f"ACSResult({len(self.tables)} tables, {collected} batches collected, {len(self._failures)} failures)"
@@ -0,0 +1,172 @@
+import functools
+import numpy as np
+import pandas as pd
+import re
+
+from typing import Dict, List
+
+from .variables import load_decoder
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits a query or label into lowercase alphanumeric tokens"""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def trigrams(token: str) -> set:
+    """Trigrams of a token, padded so short tokens and word boundaries count too"""
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class VariableIndex(object):
+    def __init__(self, labels: pd.Series):
+        """VariableIndex is an inverted keyword index over the concept labels of a variables file,
+        so finding the variables that mention a few words is a couple of binary searches instead
+        of a regular expression over every label.
+
+        Each variable is indexed under the tokens of its id and label. Tokens are kept sorted, so
+        every token that starts with a query term sits in one contiguous range, and the variables
+        of each token are stored back to back (like a CSR matrix) so a whole range of tokens is a
+        single slice.
+
+        Parameters
+        ----------
+        labels : pd.Series
+            Concept label of each variable, indexed by variable id (see VariableDecoder.labels)
+        """
+        self.ids = labels.index.to_numpy(dtype=object)
+        self.labels = labels.to_numpy(dtype=object)
+
+        tokens = (pd.Series(self.ids, dtype=object) + " " + self.labels).map(tokenize)
+        self.lengths = tokens.map(len).to_numpy()
+
+        # One (token, variable) pair per occurrence, sorted by token then variable
+        pairs = pd.DataFrame(
+            {
+                "token": np.concatenate(tokens.to_numpy()) if len(tokens) else [],
+                "variable": np.repeat(np.arange(len(tokens)), self.lengths),
+            }
+        ).drop_duplicates()
+        pairs = pairs.sort_values(["token", "variable"], kind="stable")
+
+        self.tokens, starts = np.unique(
+            pairs["token"].to_numpy(dtype=str), return_index=True
+        )
+        self.offsets = np.append(starts, len(pairs)).astype(np.int64)
+        self.postings = pairs["variable"].to_numpy(dtype=np.int32)
+
+        self._trigrams = None
+        self._trigram_sizes = None
+
+    def _trigram_index(self) -> Dict[str, np.ndarray]:
+        """trigram -> positions of the tokens that have it, built the first time it's needed"""
+        if self._trigrams is None:
+            index = {}
+            sizes = np.empty(len(self.tokens), dtype=np.int64)
+            for i, token in enumerate(self.tokens):
+                grams = trigrams(token)
+                sizes[i] = len(grams)
+                for gram in grams:
+                    index.setdefault(gram, []).append(i)
+            self._trigrams = {
+                k: np.asarray(v, dtype=np.int64) for k, v in index.items()
+            }
+            self._trigram_sizes = sizes
+        return self._trigrams
+
+    def _postings(self, lo: int, hi: int) -> np.ndarray:
+        """Variables of the tokens in positions [lo, hi)"""
+        return np.unique(self.postings[self.offsets[lo] : self.offsets[hi]])
+
+    def lookup(self, term: str, prefix: bool = True, fuzzy: bool = True) -> np.ndarray:
+        """Positions of the variables that have a token matching a (tokenized) query term
+
+        Parameters
+        ----------
+        term : str
+            Lowercase query token
+        prefix : bool, optional
+            Also match tokens that start with the term, by default True
+        fuzzy : bool, optional
+            If nothing matches, match tokens that share most of their trigrams with the term
+            (e.g. typos like "populaton"), by default True
+        """
+        lo = np.searchsorted(self.tokens, term, side="left")
+        if prefix:
+            hi = np.searchsorted(self.tokens, term + "\uffff", side="left")
+        else:
+            hi = lo + int(lo < len(self.tokens) and self.tokens[lo] == term)
+        if hi > lo or not fuzzy:
+            return self._postings(lo, hi)
+
+        grams = trigrams(term)
+        index = self._trigram_index()
+        candidates = [index[g] for g in grams if g in index]
+        if len(candidates) == 0:
+            return np.empty(0, dtype=np.int32)
+        positions, shared = np.unique(np.concatenate(candidates), return_counts=True)
+        sizes = self._trigram_sizes[positions]
+        similarity = shared / (len(grams) + sizes - shared)  # Jaccard similarity
+        matches = positions[similarity >= 0.5]
+        return np.unique(
+            np.concatenate(
+                [self._postings(i, i + 1) for i in matches] or [np.empty(0, np.int32)]
+            )
+        )
+
+    def search(
+        self,
+        query: str,
+        table: str = None,
+        limit: int = None,
+        prefix: bool = True,
+        fuzzy: bool = True,
+    ) -> pd.DataFrame:
+        """Finds the variables whose id or label has every word of a query
+
+        Parameters
+        ----------
+        query : str
+            Words to look for, e.g. "median household income"
+        table : str, optional
+            Only return variables of this table, e.g. "S1901", by default every table
+        limit : int, optional
+            Maximum number of variables to return, by default all of them
+        prefix : bool, optional
+            Match words that start with each query word ("educ" matches "education"), by default True
+        fuzzy : bool, optional
+            Match words that are spelled a little differently when nothing else matches, by default True
+
+        Returns
+        -------
+        pd.DataFrame
+            Dataframe indexed by variable id with the label of each match. The most specific
+            matches (the shortest labels) come first
+        """
+        hits = None
+        for term in tokenize(query):
+            found = self.lookup(term, prefix=prefix, fuzzy=fuzzy)
+            hits = found if hits is None else np.intersect1d(hits, found)
+        if hits is None:
+            hits = np.arange(len(self.ids))
+
+        if table is not None:
+            hits = hits[
+                pd.Series(self.ids[hits], dtype=object)
+                .str.startswith(table.upper() + "_")
+                .to_numpy(dtype=bool)
+            ]
+        hits = hits[np.lexsort((hits, self.lengths[hits]))][:limit]
+        return pd.DataFrame(
+            {"label": self.labels[hits]},
+            index=pd.Index(self.ids[hits], name="variable"),
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_index(varfile: str) -> VariableIndex:
+    """Returns the (cached) index of a variables file"""
+    return VariableIndex(load_decoder(varfile).labels)
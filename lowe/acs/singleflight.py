@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight(object):
+    def __init__(self, ttl: float = 5 * 60, max_entries: int = 1024):
+        """SingleFlight makes sure identical requests are only made once. Callers that ask for a
+        key while a request for it is in flight await the same future instead of making their own
+        request, and completed results are memoized in memory for ttl seconds so requests repeated
+        back to back (e.g. several figures in one report build) are served without a round trip.
+
+        Parameters
+        ----------
+        ttl : float, optional
+            Number of seconds completed results are kept around, by default 5 minutes.
+            Pass 0 to only coalesce requests that are in flight at the same time
+        max_entries : int, optional
+            Maximum number of results kept in memory, by default 1024.
+            The least recently used results are dropped first
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self.coalesced = 0
+        self.memo_hits = 0
+
+        self._inflight = {}
+        self._waiters = {}
+        self._memo = OrderedDict()
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable]) -> Any:
+        """Returns the result of fn() for key, sharing it with every other caller of the same key
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifies the request, e.g. a tuple of its parameters
+        fn : Callable[[], Awaitable]
+            Makes the request. Only called if there is no result in flight or memoized for key
+        """
+        memo = self._memo.get(key, None)
+        if memo is not None:
+            created, result = memo
+            if time.monotonic() - created <= self.ttl:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return result
+            del self._memo[key]
+
+        fut = self._inflight.get(key, None)
+        if fut is None:
+            fut = asyncio.ensure_future(fn())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f: self._done(key, f))
+        else:
+            self.coalesced += 1
+
+        # Shield the shared request so one caller being cancelled doesn't cancel it for everybody.
+        # It is only cancelled once nobody is waiting on it anymore
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1 and not fut.done():
+                fut.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if self._waiters[key] == 0:
+                del self._waiters[key]
+
+    def _done(self, key: Hashable, fut: asyncio.Future):
+        self._inflight.pop(key, None)
+        if fut.cancelled() or fut.exception() is not None or self.ttl <= 0:
+            return
+        self._memo[key] = (time.monotonic(), fut.result())
+        while len(self._memo) > self.max_entries:
+            self._memo.popitem(last=False)
+
+    def clear(self):
+        """Forgets every memoized result"""
+        self._memo.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of coalesced requests, memo hits, requests in flight, and memoized results"""
+        return {
+            "coalesced": self.coalesced,
+            "memo_hits": self.memo_hits,
+            "in_flight": len(self._inflight),
+            "memoized": len(self._memo),
+        }
@@ -0,0 +1,362 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from typing import Dict, List, Union
+
+from .cache import default_cache_dir
+from .frames import to_numeric
+
+# Columns of every partition in the store (the long layout, without the year)
+STORE_COLUMNS = ["geo_fips", "variable_code", "estimate", "moe"]
+
+# Geography columns at the end of each row of an API response, for each geography level
+GEO_HEADERS = {
+    "us": ["us"],
+    "state": ["state"],
+    "city": ["state", "place"],
+    "county": ["state", "county"],
+}
+
+
+def split_fips(fips: str, level: str) -> List[str]:
+    """Splits a lowe.locations FIPS code into the geography columns of an API response,
+    e.g. "0636448" -> ["06", "36448"] for a city"""
+    if level == "us":
+        return ["1"]
+    if level == "city":
+        return [fips[:2], fips[2:]]
+    if level == "county":
+        return fips.split("_")
+    return [fips]
+
+
+def join_fips(geo: Dict[str, str], level: str) -> str:
+    """Inverse of split_fips: builds the FIPS code from the geography columns of a response row"""
+    if level == "us":
+        return "us"
+    if level == "city":
+        return geo["state"] + geo["place"]
+    if level == "county":
+        return geo["state"] + "_" + geo["county"]
+    return geo[level]
+
+
+def response_fips(resp: List[list], level: str) -> List[str]:
+    """FIPS code of each row of a raw [[header], [row], ...] API response"""
+    header, rows = resp[0], resp[1:]
+    geo_idx = {col: header.index(col) for col in GEO_HEADERS[level]}
+    return [join_fips({c: row[i] for c, i in geo_idx.items()}, level) for row in rows]
+
+
+def response_to_long(resp: List[list], level: str) -> pd.DataFrame:
+    """Converts a raw [[header], [row], ...] API response into long rows for the store.
+    Estimates and margins of error (ids ending in E and M) are paired on their variable code,
+    and everything else (GEO_ID, NAME, annotations, geography columns) is left out"""
+    header, rows = resp[0], resp[1:]
+    positions = {}
+    for pos, id in enumerate(header):
+        if "_" not in id or id == "GEO_ID" or id[-1] not in ("E", "M"):
+            continue
+        pair = positions.setdefault(id[:-1], [-1, -1])
+        pair[0 if id[-1] == "E" else 1] = pos
+    codes = list(positions.keys())
+    pairs = np.array(list(positions.values()), dtype=np.intp).reshape(-1, 2)
+
+    data = np.asarray(rows, dtype=object).reshape(len(rows), len(header))
+    columns = []
+    for pos in (pairs[:, 0], pairs[:, 1]):
+        values = np.full((len(rows), len(codes)), np.nan)
+        found = pos >= 0
+        values[:, found] = to_numeric(data[:, pos[found]])
+        columns.append(values.ravel())
+
+    fips = response_fips(resp, level)
+    return pd.DataFrame(
+        {
+            "geo_fips": np.repeat(np.asarray(fips, dtype=object), len(codes)),
+            "variable_code": np.tile(np.asarray(codes, dtype=object), len(rows)),
+            "estimate": columns[0],
+            "moe": columns[1],
+        }
+    )
+
+
+class ACSStore(object):
+    def __init__(self, root: str = None):
+        """ACSStore is a local columnar store of ACS data in the long layout (see get_acs(layout="long")).
+        Data is partitioned by survey, table, and year into Parquet files under
+
+            [root]/acs5/table=B01001/year=2019/part-*.parquet
+
+        with one row per (geo_fips, variable_code), sorted by geo_fips so reads for a handful of
+        geographies only touch the row groups they need. New data is written as new part files;
+        when a (geo_fips, variable_code) cell is written twice, the newest value wins.
+
+        Parameters
+        ----------
+        root : str, optional
+            Directory to keep the store in, by default [default_cache_dir()]/store
+        """
+        self.root = (
+            root if root is not None else os.path.join(default_cache_dir(), "store")
+        )
+
+    def _partition(
+        self, table: str, year: Union[int, str], estimate: Union[int, str] = "5"
+    ) -> str:
+        return os.path.join(
+            self.root, f"acs{estimate}", f"table={table.upper()}", f"year={int(year)}"
+        )
+
+    def _parts(
+        self, table: str, year: Union[int, str], estimate: Union[int, str] = "5"
+    ) -> List[str]:
+        """Part files of a partition, oldest first"""
+        path = self._partition(table, year, estimate)
+        if not os.path.isdir(path):
+            return []
+        return [
+            os.path.join(path, f)
+            for f in sorted(os.listdir(path))
+            if f.startswith("part-") and f.endswith(".parquet")
+        ]
+
+    def write(
+        self,
+        table: str,
+        year: Union[int, str],
+        df: pd.DataFrame,
+        estimate: Union[int, str] = "5",
+    ):
+        """Writes long-layout rows (geo_fips, variable_code, estimate, moe) into the
+        partition for a table and year"""
+        if len(df) == 0:
+            return
+        path = self._partition(table, year, estimate)
+        os.makedirs(path, exist_ok=True)
+
+        part = pd.DataFrame(
+            {
+                "geo_fips": df["geo_fips"].astype(str).to_numpy(),
+                "variable_code": df["variable_code"].astype(str).to_numpy(),
+                "estimate": df["estimate"].astype("float64").to_numpy(),
+                "moe": df["moe"].astype("float64").to_numpy(),
+            }
+        ).sort_values(["geo_fips", "variable_code"], kind="stable")
+
+        # Part names sort in the order they were written, which is what reads rely on
+        name = f"part-{time.time_ns():020d}-{os.getpid()}.parquet"
+        tmp = os.path.join(path, f".{name}.tmp")
+        part.to_parquet(tmp, index=False, row_group_size=64 * 1024)
+        os.replace(tmp, os.path.join(path, name))
+
+    def read(
+        self,
+        table: str,
+        year: Union[int, str],
+        geo_fips: List[str] = None,
+        variables: List[str] = None,
+        estimate: Union[int, str] = "5",
+    ) -> pd.DataFrame:
+        """Reads the rows of a table and year, optionally only for some geographies and variable codes
+
+        Parameters
+        ----------
+        table : str
+            Table id, e.g. "B01001"
+        year : Union[int, str]
+            Year (vintage) of the data
+        geo_fips : List[str], optional
+            FIPS codes to read, in lowe.locations format (e.g. "0636448"), by default every geography
+        variables : List[str], optional
+            Variable codes to read (e.g. "B01001_001"), by default every variable
+        estimate : Union[int, str], optional
+            ACS estimate (1, 3, or 5-year), by default "5"
+
+        Returns
+        -------
+        pd.DataFrame
+            Long dataframe with the columns geo_fips, variable_code, estimate, and moe
+        """
+        filters = []
+        if geo_fips is not None:
+            filters.append(("geo_fips", "in", list(geo_fips)))
+        if variables is not None:
+            filters.append(("variable_code", "in", list(variables)))
+
+        parts = [
+            pd.read_parquet(path, columns=STORE_COLUMNS, filters=filters or None)
+            for path in self._parts(table, year, estimate)
+        ]
+        if len(parts) == 0:
+            return pd.DataFrame({col: [] for col in STORE_COLUMNS}).astype(
+                {
+                    "geo_fips": object,
+                    "variable_code": object,
+                    "estimate": float,
+                    "moe": float,
+                }
+            )
+
+        df = pd.concat(parts, ignore_index=True)
+        if len(parts) > 1:  # Newer parts overwrite older ones
+            df = df.drop_duplicates(["geo_fips", "variable_code"], keep="last")
+        return df.reset_index(drop=True)
+
+    def geographies(
+        self,
+        table: str,
+        year: Union[int, str],
+        geo_fips: List[str] = None,
+        estimate: Union[int, str] = "5",
+    ) -> pd.Index:
+        """FIPS codes of the geographies stored for a table and year. Pass geo_fips to
+        only check for those geographies"""
+        filters = [("geo_fips", "in", list(geo_fips))] if geo_fips is not None else None
+        codes = [
+            pd.read_parquet(path, columns=["geo_fips"], filters=filters)["geo_fips"]
+            for path in self._parts(table, year, estimate)
+        ]
+        if len(codes) == 0:
+            return pd.Index([], dtype=object)
+        return pd.Index(pd.concat(codes).unique())
+
+    def missing(
+        self,
+        table: str,
+        year: Union[int, str],
+        geo_fips: List[str],
+        estimate: Union[int, str] = "5",
+    ) -> List[str]:
+        """FIPS codes among geo_fips that aren't stored for a table and year yet"""
+        stored = set(
+            self.geographies(table, year, geo_fips=geo_fips, estimate=estimate)
+        )
+        return [code for code in geo_fips if code not in stored]
+
+    def geographies_in_state(
+        self,
+        table: str,
+        year: Union[int, str],
+        level: str,
+        state: str,
+        estimate: Union[int, str] = "5",
+    ) -> List[str]:
+        """FIPS codes of every city or county in a state that is stored for a table and year"""
+        stored = self.geographies(table, year, estimate=estimate)
+        if level == "city":
+            mask = stored.str.startswith(state) & (stored.str.len() == 7)
+        else:
+            mask = stored.str.startswith(state + "_")
+        return list(stored[mask])
+
+    def _marker(
+        self,
+        table: str,
+        year: Union[int, str],
+        level: str,
+        state: str,
+        estimate: Union[int, str] = "5",
+    ) -> str:
+        return os.path.join(
+            self._partition(table, year, estimate), f"_complete-{level}-{state}"
+        )
+
+    def mark_complete(
+        self,
+        table: str,
+        year: Union[int, str],
+        level: str,
+        state: str,
+        estimate: Union[int, str] = "5",
+    ):
+        """Records that every city or county of a state has been written for a table and year
+        (a state-wide request finished), so later ones can be served from the store"""
+        path = self._marker(table, year, level, state, estimate)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w"):
+            pass
+
+    def is_complete(
+        self,
+        table: str,
+        year: Union[int, str],
+        level: str,
+        state: str,
+        estimate: Union[int, str] = "5",
+    ) -> bool:
+        """True if every city or county of a state has been written for a table and year
+        (see mark_complete). Geographies written one at a time don't count"""
+        return os.path.exists(self._marker(table, year, level, state, estimate))
+
+    def response(
+        self,
+        table: str,
+        year: Union[int, str],
+        geo_fips: List[str],
+        level: str,
+        variables: List[str] = None,
+        estimate: Union[int, str] = "5",
+    ) -> List[list]:
+        """Builds a [header, row, row, ...] response in the same format the API sends back,
+        for the stored geographies among geo_fips (all of them at the same geography level)
+
+        Parameters
+        ----------
+        table : str
+            Table id, e.g. "B01001"
+        year : Union[int, str]
+            Year (vintage) of the data
+        geo_fips : List[str]
+            FIPS codes of the geographies, in lowe.locations format
+        level : str
+            Geography level of the codes: "us", "state", "city", or "county"
+        variables : List[str], optional
+            API variable ids to include (e.g. "B01001_001E"), by default every stored variable
+        estimate : Union[int, str], optional
+            ACS estimate (1, 3, or 5-year), by default "5"
+        """
+        codes = None
+        if variables is not None:
+            codes = sorted({v[:-1] for v in variables if v[-1] in ("E", "M")})
+        df = self.read(
+            table, year, geo_fips=geo_fips, variables=codes, estimate=estimate
+        )
+
+        geo = df["geo_fips"].unique()
+        all_codes = pd.Index(df["variable_code"].unique()).sort_values()
+        est = df.pivot(index="geo_fips", columns="variable_code", values="estimate")
+        moe = df.pivot(index="geo_fips", columns="variable_code", values="moe")
+
+        # Interleave estimates and margins of error like the API does
+        ids = [id for code in all_codes for id in (code + "E", code + "M")]
+        values = np.empty((len(geo), len(ids)), dtype=object)
+        values[:, 0::2] = est.reindex(index=geo, columns=all_codes).to_numpy()
+        values[:, 1::2] = moe.reindex(index=geo, columns=all_codes).to_numpy()
+        values[pd.isna(values)] = None
+
+        keep = [i for i, id in enumerate(ids) if variables is None or id in variables]
+        header = [ids[i] for i in keep] + GEO_HEADERS.get(level, [level])
+        rows = [
+            [*row[keep], *split_fips(code, level)] for code, row in zip(geo, values)
+        ]
+        return [header, *rows]
+
+    def contains(
+        self, table: str, year: Union[int, str], estimate: Union[int, str] = "5"
+    ) -> bool:
+        """True if anything is stored for a table and year"""
+        return len(self._parts(table, year, estimate)) > 0
+
+    def compact(
+        self, table: str, year: Union[int, str], estimate: Union[int, str] = "5"
+    ):
+        """Rewrites a partition as a single part file, dropping overwritten rows"""
+        parts = self._parts(table, year, estimate)
+        if len(parts) <= 1:
+            return
+        self.write(table, year, self.read(table, year, estimate=estimate), estimate)
+        for path in parts:
+            os.remove(path)
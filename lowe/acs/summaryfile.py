@@ -0,0 +1,239 @@
+import glob
+import os
+import re
+import numpy as np
+import pandas as pd
+
+from typing import List, Tuple, Union
+
+from . import frames
+from lowe.keypool import KeyPool
+from lowe.locations.geokey import GeoKey
+
+from .ACSClient import ACSClient
+from .store import ACSStore
+
+# Table-based Summary File names, e.g. acsdt5y2022-b01001.dat
+SUMMARY_FILE_PATTERN = re.compile(
+    r"^acs(?:dt|st|dp|cp)?(?P<estimate>\d)y(?P<year>\d{4})-(?P<table>[a-z0-9]+)\.dat$",
+    re.IGNORECASE,
+)
+
+# Summary File columns are named [table]_E[line] and [table]_M[line], e.g. B01001_E001
+COLUMN_PATTERN = re.compile(r"^(?P<table>.+)_(?P<kind>[EM])(?P<line>\d+)$")
+
+# Summary levels at the start of a GEO_ID, and the lowe.locations geography they correspond to
+SUMMARY_LEVELS = {
+    "010": "us",
+    "040": "state",
+    "050": "county",
+    "160": "city",
+    "310": "msa",
+}
+
+
+def geoid_to_fips(geo_ids: pd.Series) -> pd.Series:
+    """Converts Census GEO_IDs (e.g. "1600000US0636448") into lowe.locations FIPS codes
+    (e.g. "0636448"). GEO_IDs of other summary levels are kept as they are"""
+    geo_ids = geo_ids.astype(str)
+    level = geo_ids.str[:3].map(SUMMARY_LEVELS)
+    code = geo_ids.str.split("US", n=1).str[-1]
+
+    fips = geo_ids.copy()
+    fips[level == "us"] = "us"
+    simple = level.isin(["state", "city", "msa"])
+    fips[simple] = code[simple]
+    county = level == "county"
+    fips[county] = code[county].str[:2] + "_" + code[county].str[2:]
+    return fips
+
+
+def read_summary_file(
+    path: str, chunksize: int = 50_000
+) -> Tuple[str, int, str, pd.DataFrame]:
+    """Streams a table-based Summary File in chunks, yielding (table, year, estimate, chunk)
+    where each chunk is a long dataframe with the columns geo_fips, variable_code, estimate, and moe
+    """
+    match = SUMMARY_FILE_PATTERN.match(os.path.basename(path))
+    if match is None:
+        raise ValueError(f"{path} is not a table-based ACS Summary File")
+    table = match["table"].upper()
+    year = int(match["year"])
+    estimate = match["estimate"]
+
+    for chunk in pd.read_csv(path, sep="|", dtype=str, chunksize=chunksize):
+        chunk.columns = [col.upper() for col in chunk.columns]
+
+        # Pair up the estimate and margin of error columns under their variable code
+        positions = {}
+        for col in chunk.columns:
+            col_match = COLUMN_PATTERN.match(col)
+            if col_match is None:
+                continue
+            code = f"{col_match['table']}_{col_match['line']}"
+            pair = positions.setdefault(code, [None, None])
+            pair[0 if col_match["kind"] == "E" else 1] = col
+        codes = list(positions.keys())
+
+        columns = []
+        for kind in (0, 1):
+            values = np.full((len(chunk), len(codes)), np.nan)
+            cols = [positions[code][kind] for code in codes]
+            found = np.array([col is not None for col in cols], dtype=bool)
+            if found.any():
+                values[:, found] = frames.to_numeric(
+                    chunk[[col for col in cols if col is not None]].to_numpy(
+                        dtype=object
+                    )
+                )
+            columns.append(values.ravel())
+
+        fips = geoid_to_fips(chunk["GEO_ID"]).to_numpy()
+        yield table, year, estimate, pd.DataFrame(
+            {
+                "geo_fips": np.repeat(fips, len(codes)),
+                "variable_code": np.tile(np.asarray(codes, dtype=object), len(chunk)),
+                "estimate": columns[0],
+                "moe": columns[1],
+            }
+        )
+
+
+def ingest(
+    directory: str,
+    store: ACSStore = None,
+    year: Union[int, str] = None,
+    tables: List[str] = None,
+    chunksize: int = 50_000,
+    debug: bool = False,
+) -> List[Tuple[str, int]]:
+    """Ingests the table-based ACS Summary Files in a directory into a local ACSStore,
+    reading each file in chunks so memory stays bounded no matter how big the files are.
+    Download the files from https://www2.census.gov/programs-surveys/acs/summary_file/
+
+    Parameters
+    ----------
+    directory : str
+        Directory with the Summary Files (e.g. acsdt5y2022-b01001.dat)
+    store : ACSStore, optional
+        Store to write to, by default ACSStore()
+    year : Union[int, str], optional
+        Only ingest files for this year, by default every year
+    tables : List[str], optional
+        Only ingest these tables, by default every table
+    chunksize : int, optional
+        Number of geographies to read at a time, by default 50,000
+    debug : bool, optional
+        If True, prints each file as it is ingested
+
+    Returns
+    -------
+    List[Tuple[str, int]]
+        (table, year) of every file that was ingested
+    """
+    store = store if store is not None else ACSStore()
+    tables = {t.upper() for t in tables} if tables is not None else None
+
+    ingested = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.dat"))):
+        match = SUMMARY_FILE_PATTERN.match(os.path.basename(path))
+        if match is None:
+            continue
+        if year is not None and int(match["year"]) != int(year):
+            continue
+        if tables is not None and match["table"].upper() not in tables:
+            continue
+
+        if debug:
+            print(f"ingesting {path}...")
+        for table, file_year, estimate, chunk in read_summary_file(path, chunksize):
+            store.write(table, file_year, chunk, estimate=estimate)
+        store.compact(table, file_year, estimate=estimate)
+        ingested.append((table, file_year))
+
+    return ingested
+
+
+class SummaryFileClient(ACSClient):
+    def __init__(
+        self,
+        store: ACSStore = None,
+        memo_ttl: float = 5 * 60,
+    ):
+        """SummaryFileClient serves get_acs (and iter_acs and get_acs_resilient) from a local ACSStore
+        built with lowe.acs.summaryfile.ingest instead of the Census API, so big pulls are limited
+        by disk speed instead of rate limits and reports can run without an API key or a connection.
+
+        Parameters
+        ----------
+        store : ACSStore, optional
+            Store to read from, by default ACSStore()
+        memo_ttl : float, optional
+            Seconds to keep responses in memory, by default 5 minutes (see ACSClient)
+        """
+        # Everything the ACSClient methods need, minus the API key and the response cache
+        self._setup(memo_ttl=memo_ttl)
+        self.API_KEY = None
+        self.keys = KeyPool([])
+        self.cache = None
+        self.warehouse = None  # The store already has everything we can serve
+
+        self.store = store if store is not None else ACSStore()
+
+    async def initialize(self):
+        pass  # Nothing to connect to
+
+    async def close(self):
+        pass
+
+    async def _collect_columns(
+        self,
+        tableid: str,
+        year: Union[int, str],
+        locations: List[GeoKey],
+        tabletype: str = "detail",
+        estimate: Union[int, str] = "5",
+        variables: List[str] = None,
+        debug: bool = False,
+    ) -> list:
+        """Builds a [header, row, row, ...] response for a batch of locations from the store,
+        in the same format the API would send it back"""
+        if not self.store.contains(tableid, year, estimate):
+            raise KeyError(
+                f"{tableid} ({year}) is not in the store at {self.store.root}"
+            )
+
+        level = locations[0].level
+        if locations[0].wildcard:
+            fips = self.store.geographies_in_state(
+                tableid, year, level, locations[0].state, estimate
+            )
+        else:
+            fips = [loc.fips for loc in locations]
+
+        if debug:
+            print(f"reading {tableid} ({year}) from the store...")
+        return self.store.response(
+            tableid, year, fips, level, variables=variables, estimate=estimate
+        )
+
+    async def _collect_table(
+        self,
+        tableid: str,
+        year: Union[int, str],
+        location: Union[GeoKey, List[GeoKey]],
+        tabletype: str = "detail",
+        estimate: Union[int, str] = "5",
+        variables: List[str] = None,
+        debug: bool = False,
+    ):
+        """Single-location requests (see ACSClient._process_request) are served from the store too"""
+        return await self._collect_columns(
+            tableid=tableid,
+            year=year,
+            locations=location if isinstance(location, list) else [location],
+            tabletype=tabletype,
+            estimate=estimate,
+            variables=variables,
+            debug=debug,
+        )
@@ -0,0 +1,166 @@
+import functools
+import gzip
+import json
+import numpy as np
+import os
+import pandas as pd
+
+from typing import Dict, List, Union
+
+try:
+    import importlib.resources as pkg_resources
+except ImportError:
+    import importlib_resources as pkg_resources
+
+from . import tableids
+from .cache import default_cache_dir
+
+
+class VariableDecoder(object):
+    def __init__(self, variables: Dict[str, dict]):
+        """VariableDecoder translates ACS variable ids (e.g. "S1901_C01_001E") into the
+        "concept label" strings we use as column names. The labels for every variable
+        are computed once up front so decoding a response is a single lookup.
+
+        Parameters
+        ----------
+        variables : Dict[str, dict]
+            The "variables" entry of an ACS variables.json file
+        """
+        self.variables = variables
+        self.labels = pd.Series(
+            {
+                id: (var["concept"] + " " + var["label"]).replace("!!", " ")
+                for id, var in variables.items()
+                if "concept" in var and "label" in var
+            },
+            dtype=object,
+        )
+        # "int", "float", or "string" for each variable, used to decode the values
+        self.types = pd.Series(
+            {id: var.get("predicateType", "string") for id, var in variables.items()},
+            dtype=object,
+        )
+
+    @classmethod
+    def from_compact(cls, payload: Dict[str, list]) -> "VariableDecoder":
+        """Builds a decoder from the compact form written by VariableDecoder.compact"""
+        decoder = cls.__new__(cls)
+        labels = pd.Series(payload["labels"], index=payload["ids"], dtype=object)
+        decoder.variables = None
+        decoder.labels = labels[labels.notna()]
+        decoder.types = pd.Series(payload["types"], index=payload["ids"], dtype=object)
+        return decoder
+
+    def compact(self) -> Dict[str, list]:
+        """Compact form of the decoder: the sorted variable ids and their labels and predicate
+        types, without the rest of the variables.json metadata"""
+        ids = self.types.index.sort_values()
+        return {
+            "ids": list(ids),
+            "labels": [None if pd.isna(v) else v for v in self.labels.reindex(ids)],
+            "types": list(self.types.reindex(ids)),
+        }
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, id: str):
+        return id in self.labels.index
+
+    def decode(self, ids: Union[List[str], pd.Index]) -> np.ndarray:
+        """Translates a list of variable ids into their concept labels
+
+        Parameters
+        ----------
+        ids : Union[List[str], pd.Index]
+            Variable ids, usually the header row of an API response
+
+        Returns
+        -------
+        np.ndarray
+            Object array of labels, with NaN for ids that aren't in the variables file
+        """
+        return self.labels.reindex(pd.Index(ids)).to_numpy()
+
+    def dtypes(self, ids: Union[List[str], pd.Index]) -> np.ndarray:
+        """Translates a list of variable ids into their predicate types ("int", "float", "string").
+        Ids that aren't in the variables file are treated as strings"""
+        return self.types.reindex(pd.Index(ids)).fillna("string").to_numpy()
+
+    def select(self, tableid: str, label_filter: Union[str, List[str]]) -> List[str]:
+        """Finds the variables in a table whose concept label matches a filter
+
+        Parameters
+        ----------
+        tableid : str
+            Table to look in, e.g. "S1901"
+        label_filter : Union[str, List[str]]
+            Regular expression to search the labels with, or a list of exact labels
+
+        Returns
+        -------
+        List[str]
+            Ids of the matching variables
+        """
+        labels = self.labels[self.labels.index.str.startswith(tableid.upper() + "_")]
+        if isinstance(label_filter, str):
+            mask = labels.str.contains(label_filter, regex=True)
+        else:
+            mask = labels.isin(label_filter)
+        return list(labels.index[mask])
+
+
+def variables_dir() -> str:
+    """Directory where variables files downloaded from the API are kept, in compact form"""
+    return os.path.join(default_cache_dir(), "variables")
+
+
+def compact_path(varfile: str) -> str:
+    """Path of the compact form of a downloaded variables file"""
+    return os.path.join(variables_dir(), varfile + ".gz")
+
+
+def has_varfile(varfile: str) -> bool:
+    """True if a variables file ships with the package or has been downloaded"""
+    return pkg_resources.is_resource(tableids, varfile) or os.path.exists(
+        compact_path(varfile)
+    )
+
+
+def save_compact(varfile: str, variables: Dict[str, dict]):
+    """Saves the "variables" entry of a variables.json file in compact form, so every process
+    on the machine can load it without downloading it again"""
+    path = compact_path(varfile)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(VariableDecoder(variables).compact(), f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def varfile_for(
+    varfile: Union[str, Dict[int, str]], year: Union[int, str] = None
+) -> str:
+    """Variables file to decode a year with. varfile is either one file for every year or
+    a {year: file} dictionary (see ACSClient._plan_tables). Without a year, the file of
+    the latest year is used"""
+    if not isinstance(varfile, dict):
+        return varfile
+    return varfile[int(year) if year is not None else max(varfile)]
+
+
+@functools.lru_cache(maxsize=None)
+def load_decoder(varfile: str) -> VariableDecoder:
+    """Loads a variables file from lowe.acs.tableids (or one downloaded by
+    ACSClient.prefetch_variables) into a VariableDecoder.
+    Decoders are cached, so each file is only parsed once per process"""
+    if not pkg_resources.is_resource(tableids, varfile) and os.path.exists(
+        compact_path(varfile)
+    ):
+        with gzip.open(compact_path(varfile), "rt", encoding="utf-8") as f:
+            return VariableDecoder.from_compact(json.load(f))
+
+    with pkg_resources.open_text(tableids, varfile) as f:
+        variables = json.load(f)["variables"]
+    return VariableDecoder(variables)
@@ -1,24 +1,39 @@
 import json
-import os
 import pandas as pd
 import requests
 
 from dotenv import load_dotenv, find_dotenv
+from lowe.keypool import KeyPool
 from typing import Union, List
 
+# Queries a registered key can make per day, and per second, on version 2 of the BLS API
+DAILY_QUOTA = 500
+RATE = 5.0
+
 
 class BLSClient(object):
-    def __init__(self, key_env_name: str = "API_KEY_BLS"):
+    def __init__(self, key_env_name: str = "API_KEY_BLS", keys: KeyPool = None):
         """the BLS Client class provides methods for wrapping around the BLS client
 
         Parameters
         ----------
         key_env_name : str, optional
             name of the environment variable in your .env
-            file corresponding to your BLS API key, by default "API_KEY_BLS"
+            file corresponding to your BLS API key, by default "API_KEY_BLS".
+            Separate several keys with commas to spread requests across them
+        keys : KeyPool, optional
+            Pool of API keys to use instead of the ones in key_env_name. By default each key
+            makes at most 500 queries a day; keys that hit the BLS daily threshold sit out until
+            their day is up and the query is retried with the next key. When every key is out,
+            queries raise a RuntimeError saying when the next key frees up instead of waiting
         """
         load_dotenv(find_dotenv())
-        self.API_KEY = os.environ.get(key_env_name, None)
+        self.keys = (
+            keys
+            if keys is not None
+            else KeyPool.from_env(key_env_name, rate=RATE, daily_quota=DAILY_QUOTA)
+        )
+        self.API_KEY = self.keys.keys[0] if len(self.keys) > 0 else None
         try:
             assert self.API_KEY is not None
         except AssertionError:
@@ -84,11 +99,20 @@ class BLSClient(object):
             if v is not None and k in valid_args and v != "false":
                 payload[k] = v
 
-        payload["registrationkey"] = self.API_KEY
-        data = json.dumps(payload)
+        # Keys that have hit their daily threshold are benched and the query goes to the next one.
+        # Once every key is benched, acquire_blocking raises with when the next one frees up
+        while True:
+            key = self.keys.acquire_blocking()
+            payload["registrationkey"] = key
+            data = json.dumps(payload)
+
+            r = requests.post(url=self.BASE_URL, data=data, headers=self.header)
+            data_json = json.loads(r.text)
 
-        r = requests.post(url=self.BASE_URL, data=data, headers=self.header)
-        data_json = json.loads(r.text)
+            messages = " ".join(data_json.get("message", []))
+            if key is None or "daily threshold" not in messages.lower():
+                break
+            self.keys.bench(key)
 
         # Process Result
 
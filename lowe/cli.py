@@ -2,7 +2,9 @@
 # This file creates command line utilities for the Lowe
 # WORK IN PROGRESS
 
+import asyncio
 import click
+from lowe.acs.ACSClient import ACSClient
 from lowe.edd.autoedd import news_release_numbers
 from lowe.locations.lookup import search as location_search
 
@@ -54,12 +56,58 @@ edd.add_command(news)
 @click.argument("locationtype", type=str, nargs=1)
 @click.argument("query", type=str, nargs=1)
 # @click.option("searchon", "-s", default=None, type=str)
-def search(locationtype, query):
-    res = location_search(query=query, codetype=locationtype, search_on=None)
+@click.option("--num_results", "-n", type=int, default=25)
+def search(locationtype, query, num_results):
+    res = location_search(
+        query=query, codetype=locationtype, search_on=None, limit=num_results
+    )
     click.echo(res)
     return None
 
 
+# ----------------------------
+# ACS Command Group
+# ----------------------------
+
+
+@cli.group()
+def acs():
+    """Command group for ACS data-related utilities"""
+    pass
+
+
+@acs.command()
+@click.argument("query", type=str, nargs=-1, required=True)
+@click.option("--year", "-y", type=str, default="2019")
+@click.option("--tabletype", "-t", type=str, default="detail")
+@click.option("--table", type=str, default=None)
+@click.option("--num_results", "-n", type=int, default=25)
+def variables(query, year, tabletype, table, num_results):
+    """Finds the ACS variables whose label has every word of QUERY"""
+
+    async def find():
+        client = ACSClient(cache=False)
+        await client.initialize()
+        try:
+            return await client.find_variables(
+                " ".join(query),
+                year=year,
+                tabletype=tabletype,
+                table=table,
+                limit=num_results,
+            )
+        finally:
+            await client.close()
+
+    res = asyncio.run(find())
+    for id, label in res["label"].items():
+        click.echo(f"{id}\t{label}")
+
+
+cli.add_command(acs)
+acs.add_command(variables)
+
+
 def main():
     cli(obj={})
 
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import time
+
+from typing import Dict, List, Tuple, Union
+
+
+class KeyState(object):
+    __slots__ = ("key", "tokens", "last", "used", "window_start", "benched_until")
+
+    def __init__(self, key: str, now: float):
+        """Token bucket and quota bookkeeping for a single API key"""
+        self.key = key
+        self.tokens = 1.0
+        self.last = now
+        self.used = 0
+        self.window_start = now
+        self.benched_until = 0.0
+
+
+class KeyPool(object):
+    def __init__(
+        self,
+        keys: List[str],
+        rate: float = None,
+        daily_quota: int = None,
+        window: float = 24 * 60 * 60,
+        max_wait: float = 5 * 60,
+    ):
+        """KeyPool spreads requests across several API keys. Each key gets its own token bucket
+        (rate requests per second) and its own quota (daily_quota requests per window), and requests
+        go to the next key in turn that has both to spare. A key that runs out of quota -- or that the
+        API says is exhausted, see bench -- sits out until its window resets, so sustained throughput
+        grows with the number of keys. When every key is out for longer than max_wait (or rejected,
+        see reject), asking for a key raises a RuntimeError instead of waiting for hours.
+
+        Parameters
+        ----------
+        keys : List[str]
+            API keys. An empty pool hands out None, for APIs that work without a key
+        rate : float, optional
+            Requests per second allowed for each key, by default no limit
+        daily_quota : int, optional
+            Requests allowed for each key per window, by default no limit
+        window : float, optional
+            Length of the quota window in seconds, starting with the key's first request
+            of the window, by default one day
+        max_wait : float, optional
+            Longest time in seconds to wait for a key to free up before raising, by default 5 minutes
+        """
+        self.rate = rate
+        self.daily_quota = daily_quota
+        self.window = window
+        self.max_wait = max_wait
+
+        now = time.monotonic()
+        self._keys = [KeyState(key, now) for key in dict.fromkeys(keys)]
+        self._next = 0
+
+    @classmethod
+    def from_env(cls, key_env_name: str, **kwargs) -> "KeyPool":
+        """Builds a pool from an environment variable holding one key or a comma-separated
+        list of keys, e.g. API_KEY_BLS="key1,key2". Takes the same keyword arguments as KeyPool
+        """
+        value = os.environ.get(key_env_name, None) or ""
+        return cls([key.strip() for key in value.split(",") if key.strip()], **kwargs)
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def keys(self) -> List[str]:
+        return [state.key for state in self._keys]
+
+    def _refresh(self, state: KeyState, now: float):
+        if now - state.window_start >= self.window:
+            state.used = 0
+            state.window_start = now
+        if self.rate is not None:
+            state.tokens = min(
+                max(self.rate, 1.0), state.tokens + (now - state.last) * self.rate
+            )
+        state.last = now
+
+    def _take(self) -> Tuple[Union[str, None], float]:
+        """Takes a request from the next key that can make one. Returns (key, 0), or
+        (None, seconds until a key frees up) if every key is rate limited or benched"""
+        now = time.monotonic()
+        wait = float("inf")
+        for i in range(len(self._keys)):
+            state = self._keys[(self._next + i) % len(self._keys)]
+            self._refresh(state, now)
+
+            if self.daily_quota is not None and state.used >= self.daily_quota:
+                state.benched_until = max(
+                    state.benched_until, state.window_start + self.window
+                )
+            if state.benched_until > now:
+                wait = min(wait, state.benched_until - now)
+                continue
+            if self.rate is not None and state.tokens < 1:
+                wait = min(wait, (1 - state.tokens) / self.rate)
+                continue
+
+            if self.rate is not None:
+                state.tokens -= 1
+            state.used += 1
+            self._next = (self._next + i + 1) % len(self._keys)
+            return state.key, 0.0
+        return None, wait
+
+    def _check_wait(self, wait: float):
+        """Raises if no key frees up within max_wait seconds"""
+        if wait == float("inf"):
+            raise RuntimeError(f"The API rejected every API key ({len(self)} keys)")
+        if self.max_wait is not None and wait > self.max_wait:
+            raise RuntimeError(
+                f"Every API key ({len(self)} keys) is out of requests. "
+                f"The next one frees up in {wait / 60:.0f} minutes"
+            )
+
+    async def acquire(self) -> Union[str, None]:
+        """Waits for a key that can make a request and returns it (None for an empty pool).
+        Raises a RuntimeError if no key frees up within max_wait seconds"""
+        if len(self._keys) == 0:
+            return None
+        while True:
+            key, wait = self._take()
+            if key is not None:
+                return key
+            self._check_wait(wait)
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self) -> Union[str, None]:
+        """Same as acquire, for clients that make blocking requests"""
+        if len(self._keys) == 0:
+            return None
+        while True:
+            key, wait = self._take()
+            if key is not None:
+                return key
+            self._check_wait(wait)
+            time.sleep(wait)
+
+    def bench(self, key: str, seconds: float = None):
+        """Takes a key out of rotation for a number of seconds, by default until its quota
+        window resets. Call it when the API says a key has run out of requests"""
+        now = time.monotonic()
+        for state in self._keys:
+            if state.key != key:
+                continue
+            if seconds is None:
+                until = state.window_start + self.window
+            else:
+                until = now + seconds
+            state.benched_until = max(state.benched_until, until)
+
+    def reject(self, key: str):
+        """Takes a key out of rotation for good. Call it when the API says a key is invalid"""
+        self.bench(key, float("inf"))
+
+    def stats(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """Requests made in the current window, and seconds until the key is back in
+        rotation (0 if it isn't benched), for each key (by its last four characters)"""
+        now = time.monotonic()
+        return {
+            f"...{state.key[-4:]}": {
+                "used": state.used,
+                "benched_for": max(0.0, state.benched_until - now),
+            }
+            for state in self._keys
+        }
@@ -0,0 +1,198 @@
+import hashlib
+import mmap
+import numpy as np
+import os
+import struct
+
+from typing import Dict, Iterator, Mapping
+
+# magic, version, entries, width of the codes, hash slots, size of the names
+HEADER = struct.Struct("<8sIIIII")
+MAGIC = b"LOWEFIPS"
+VERSION = 1
+
+
+def _hash(name: bytes) -> int:
+    """Stable 64-bit hash of a name (Python's hash() changes between processes)"""
+    return int.from_bytes(hashlib.blake2b(name, digest_size=8).digest(), "little")
+
+
+def _pad(n: int) -> int:
+    """Bytes of padding that keep the next section 8-byte aligned"""
+    return -n % 8
+
+
+def save_compact(table: Dict[str, str], path: str):
+    """Writes a decoder table (FIPS code -> name) in the compact binary format CompactTable reads:
+
+    - a header (see HEADER)
+    - the FIPS codes, sorted, as fixed-width ASCII strings, so a code is found with a binary search
+    - the offset of each name in the names section (uint32, one extra at the end)
+    - an open-addressing hash table of name -> position + 1 (uint32, 0 for empty slots),
+      at most half full, so a name is found with a probe or two
+    - the names, UTF-8 encoded, one per line
+
+    Parameters
+    ----------
+    table : Dict[str, str]
+        FIPS code -> name. Names must be unique. Codes must be ASCII
+    path : str
+        File to write to. It is replaced atomically
+    """
+    # Entries without a name (NaN in the source data) are left out
+    codes = sorted(code for code, name in table.items() if isinstance(name, str))
+    names = [table[code].encode("utf-8") for code in codes]
+    width = max((len(code) for code in codes), default=1)
+
+    offsets = np.zeros(len(names) + 1, dtype="<u4")
+    offsets[1:] = np.cumsum([len(name) + 1 for name in names])
+    blob = b"".join(name + b"\n" for name in names)
+
+    n_slots = 1 << max(3, (2 * len(names)).bit_length())
+    slots = np.zeros(n_slots, dtype="<u4")
+    for i, name in enumerate(names):
+        slot = _hash(name) & (n_slots - 1)
+        while slots[slot] != 0:
+            slot = (slot + 1) & (n_slots - 1)
+        slots[slot] = i + 1
+
+    sections = [
+        HEADER.pack(MAGIC, VERSION, len(codes), width, n_slots, len(blob)),
+        np.array(codes, dtype=f"S{width}").tobytes(),
+        offsets.tobytes(),
+        slots.tobytes(),
+        blob,
+    ]
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        for section in sections:
+            f.write(section)
+            f.write(b"\0" * _pad(len(section)))
+    os.replace(tmp, path)
+
+
+class CompactTable(Mapping):
+    def __init__(self, path: str):
+        """CompactTable is a read-only decoder table (FIPS code -> name) backed by a memory-mapped file
+        in the format save_compact writes. Nothing is parsed up front: codes are found with a binary
+        search over the sorted code array, names with a probe into the hash table, and only the pages
+        that are looked at are read from disk. The operating system shares those pages between every
+        process that maps the file. Works like a read-only dictionary, and like a bidict, .inverse
+        maps names to codes.
+
+        Parameters
+        ----------
+        path : str
+            File written by save_compact
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n, width, n_slots, blob_size = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(
+                f"{path} is not a compact lookup table (version {VERSION})"
+            )
+
+        offset = HEADER.size + _pad(HEADER.size)
+        self._codes = np.frombuffer(
+            self._mmap, dtype=f"S{width}", count=n, offset=offset
+        )
+        offset += n * width + _pad(n * width)
+        self._offsets = np.frombuffer(
+            self._mmap, dtype="<u4", count=n + 1, offset=offset
+        )
+        offset += 4 * (n + 1) + _pad(4 * (n + 1))
+        self._slots = np.frombuffer(
+            self._mmap, dtype="<u4", count=n_slots, offset=offset
+        )
+        offset += 4 * n_slots + _pad(4 * n_slots)
+        self._blob = memoryview(self._mmap)[offset : offset + blob_size]
+
+        self.width = width
+        self.inverse = _CompactInverse(self)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the mapped file"""
+        return len(self._mmap)
+
+    def _name(self, i: int) -> bytes:
+        # Names end with a newline
+        return bytes(self._blob[self._offsets[i] : self._offsets[i + 1] - 1])
+
+    def _find_code(self, code: str) -> int:
+        """Position of a code, or -1 if it isn't in the table"""
+        key = code.encode("ascii", errors="replace")
+        if len(key) > self.width:
+            return -1
+        i = int(np.searchsorted(self._codes, key))
+        return i if i < len(self._codes) and self._codes[i] == key else -1
+
+    def _find_name(self, name: str) -> int:
+        """Position of a name, or -1 if it isn't in the table"""
+        key = name.encode("utf-8")
+        mask = len(self._slots) - 1
+        slot = _hash(key) & mask
+        while self._slots[slot] != 0:
+            i = int(self._slots[slot]) - 1
+            if self._name(i) == key:
+                return i
+            slot = (slot + 1) & mask
+        return -1
+
+    def __getitem__(self, code: str) -> str:
+        i = self._find_code(code) if isinstance(code, str) else -1
+        if i < 0:
+            raise KeyError(code)
+        return self._name(i).decode("utf-8")
+
+    def __contains__(self, code) -> bool:
+        return isinstance(code, str) and self._find_code(code) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.codes())
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def codes(self) -> list:
+        """Every code, in sorted order"""
+        return self._codes.astype(str).tolist()
+
+    def names(self) -> list:
+        """Every name, in the same order as codes()"""
+        if len(self) == 0:
+            return []
+        return bytes(self._blob[:-1]).decode("utf-8").split("\n")
+
+    def keys(self):
+        return self.codes()
+
+    def values(self):
+        return self.names()
+
+    def items(self):
+        return list(zip(self.codes(), self.names()))
+
+
+class _CompactInverse(Mapping):
+    def __init__(self, table: CompactTable):
+        """Name -> code view of a CompactTable"""
+        self._table = table
+
+    def __getitem__(self, name: str) -> str:
+        i = self._table._find_name(name) if isinstance(name, str) else -1
+        if i < 0:
+            raise KeyError(name)
+        return self._table._codes[i].decode("ascii")
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and self._table._find_name(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.names())
+
+    def __len__(self) -> int:
+        return len(self._table)
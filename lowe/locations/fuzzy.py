@@ -0,0 +1,250 @@
+import numpy as np
+import pandas as pd
+
+from typing import Container, Dict, List, Mapping, Tuple, Union
+
+from .searchindex import tokenize
+
+# Most misspelled words whose close spellings are kept around (see FuzzyResolver.candidates)
+CACHE_SIZE = 65536
+
+
+def max_distance(word: str, limit: int = 2) -> int:
+    """Most edits allowed for a word: none for 1-2 letter words (like state abbreviations),
+    one for 3-4 letter words, and limit for longer ones"""
+    if len(word) <= 2:
+        return 0
+    if len(word) <= 4:
+        return min(1, limit)
+    return limit
+
+
+def deletes(word: str, distance: int) -> set:
+    """Every string that is up to distance deletions away from word (including word)"""
+    res = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+        res |= frontier
+    return res
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment) distance between a and b, where a swap
+    of two neighbouring letters counts as one edit. Returns limit + 1 once it's over limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            d = previous[j - 1] + (x != y)
+            if previous[j] + 1 < d:
+                d = previous[j] + 1
+            if current[j - 1] + 1 < d:
+                d = current[j - 1] + 1
+            if previous2 is not None and j > 1 and x == b[j - 2] and a[i - 2] == y:
+                d = min(d, previous2[j - 2] + 1)
+            current.append(d)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+def split_state(name: str, states: Container = ()) -> Tuple[str, Union[str, None]]:
+    """Splits the state off of a name like "palm springs, ca" -- or "palm springs ca", if
+    the last word is one of states. Returns (name, state), with None as the state if there
+    isn't one"""
+    if "," not in name:
+        base, _, last = name.strip().rpartition(" ")
+        if base.strip() and last in states:
+            return base.strip(), last
+        return name.strip(), None
+    base, state = name.rsplit(",", 1)
+    return base.strip(), state.strip() or None
+
+
+class FuzzyResolver(object):
+    def __init__(self, table: Mapping[str, str], limit: int = 2):
+        """FuzzyResolver resolves location names that are misspelled or written a little differently
+        (e.g. "Palm Sprngs" or "CATHEDRAL CITY") to FIPS codes, using a symmetric delete (SymSpell)
+        index over the words of the names in a decoder table.
+
+        Every word of every name is indexed under the strings it turns into with up to limit deletions.
+        Two words are within limit edits of each other only if they share one of those strings, so
+        the close spellings of a query word are found with a handful of lookups instead of comparing
+        it with every word, and only those few are checked with an exact edit distance.
+
+        Parameters
+        ----------
+        table : Mapping[str, str]
+            Decoder table, FIPS code -> name (e.g. "palm springs, ca")
+        limit : int, optional
+            Most edits allowed per word, by default 2. Short words allow fewer (see max_distance)
+        """
+        self.limit = limit
+        entries = sorted(
+            (code, name) for code, name in table.items() if isinstance(name, str)
+        )
+        self.codes = np.array([code for code, _ in entries], dtype=object)
+        self.names = np.array([name for _, name in entries], dtype=object)
+
+        split = [split_state(name) for _, name in entries]
+        words = [tokenize(base) for base, _ in split]
+        self.state_ids = {
+            state: i for i, state in enumerate(sorted({s for _, s in split if s}))
+        }
+        self.states = np.array(
+            [self.state_ids.get(state, -1) for _, state in split], dtype=np.int64
+        )
+        self.lengths = np.array([len(" ".join(w)) for w in words], dtype=np.int64)
+
+        # Inverted index, word -> entries that have it, stored back to back (like a CSR matrix)
+        self.vocab = sorted({word for entry_words in words for word in entry_words})
+        self.word_ids = {word: i for i, word in enumerate(self.vocab)}
+        pairs = sorted(
+            {
+                (self.word_ids[word], i)
+                for i, entry_words in enumerate(words)
+                for word in entry_words
+            }
+        )
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        self.offsets = np.searchsorted(pairs[:, 0], np.arange(len(self.vocab) + 1))
+        self.postings = pairs[:, 1]
+
+        # Symmetric delete index: hash of each delete -> the words it comes from
+        hashes, ids = [], []
+        for i, word in enumerate(self.vocab):
+            for delete in deletes(word, max_distance(word, limit)):
+                hashes.append(hash(delete))
+                ids.append(i)
+        hashes = np.array(hashes, dtype=np.int64)
+        order = np.argsort(hashes, kind="stable")
+        self.delete_hashes = hashes[order]
+        self.delete_words = np.array(ids, dtype=np.int64)[order]
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def candidates(self, word: str) -> Dict[int, int]:
+        """Words in the index within max_distance(word) edits of word -> their distance.
+        A word that is in the index only matches itself. Results are cached, since the same
+        misspellings tend to come up again and again in bulk resolution"""
+        if word in self.word_ids:
+            return {self.word_ids[word]: 0}
+        res = self._cache.get(word, None)
+        if res is None:
+            res = self._candidates(word)
+            if len(self._cache) >= CACHE_SIZE:
+                self._cache.clear()
+            self._cache[word] = res
+        return res
+
+    def _candidates(self, word: str) -> Dict[int, int]:
+        distance = max_distance(word, self.limit)
+        hashes = np.array([hash(d) for d in deletes(word, distance)], dtype=np.int64)
+        lo = np.searchsorted(self.delete_hashes, hashes, side="left")
+        hi = np.searchsorted(self.delete_hashes, hashes, side="right")
+        found = np.unique(
+            np.concatenate([self.delete_words[a:b] for a, b in zip(lo, hi)])
+        )
+
+        res = {}
+        for i in found:
+            d = edit_distance(word, self.vocab[i], distance)
+            if d <= distance:
+                res[int(i)] = d
+        return res
+
+    def resolve(self, name: str, state: str = None) -> Tuple[int, float, int]:
+        """Finds the entry that best matches a name
+
+        Parameters
+        ----------
+        name : str
+            Name to resolve, e.g. "palm sprngs, ca" or "palm sprngs ca". Case and punctuation
+            are ignored
+        state : str, optional
+            Only match entries in this state (abbreviation, e.g. "ca"). By default the state
+            at the end of the name, if there is one, or any state
+
+        Returns
+        -------
+        Tuple[int, float, int]
+            Position of the best entry (-1 if nothing matched), its confidence (between 0 and 1),
+            and the number of entries that match equally well
+        """
+        base, suffix = split_state(name.casefold(), self.state_ids)
+        state = state.casefold() if state is not None else suffix
+        words = tokenize(base)
+        if len(words) == 0:
+            return -1, 0.0, 0
+
+        # Every word of the query must match a word of the entry. An entry's distance is the
+        # sum of the distances between each query word and its closest word in the entry
+        missing = self.limit * len(words) + 1
+        total = np.zeros(len(self), dtype=np.int64)
+        for word in words:
+            closest = np.full(len(self), missing, dtype=np.int64)
+            for i, distance in self.candidates(word).items():
+                entries = self.postings[self.offsets[i] : self.offsets[i + 1]]
+                closest[entries] = np.minimum(closest[entries], distance)
+            total += closest
+
+        matched = total < missing
+        if state is not None:
+            matched &= self.states == self.state_ids.get(state, -2)
+        entries = np.flatnonzero(matched)
+        if len(entries) == 0:
+            return -1, 0.0, 0
+
+        # Words of the entry that the query doesn't have count against it too
+        length = len(" ".join(words))
+        lengths = self.lengths[entries]
+        edits = np.maximum(total[entries], np.abs(lengths - length))
+        confidence = 1 - edits / np.maximum(lengths, length)
+
+        best = confidence.max()
+        ties = entries[confidence == best]
+        return int(ties[0]), float(best), len(ties)
+
+    def resolve_many(
+        self,
+        names: Union[pd.Series, List[str]],
+        state: str = None,
+        min_confidence: float = 0.0,
+    ) -> pd.DataFrame:
+        """Resolves a list of names (see resolve). Each distinct name is only resolved once
+
+        Returns
+        -------
+        pd.DataFrame
+            Dataframe with one row per name and the columns query, fips, name, confidence, and
+            matches (number of entries that match equally well). fips and name are None for the
+            names that didn't match with at least min_confidence, and for ambiguous ones (matches > 1)
+        """
+        queries = pd.Series(names, dtype=object)
+        results = {}
+        for query in queries.dropna().unique():
+            i, confidence, matches = self.resolve(str(query), state=state)
+            if i < 0 or confidence < min_confidence or matches > 1:
+                results[query] = (None, None, confidence, matches)
+            else:
+                results[query] = (self.codes[i], self.names[i], confidence, matches)
+
+        rows = [results.get(q, (None, None, 0.0, 0)) for q in queries]
+        fips, names, confidence, matches = zip(*rows) if rows else ([], [], [], [])
+        # object columns, so unresolved names stay None instead of becoming NaN
+        return pd.DataFrame(
+            {
+                "query": queries.to_numpy(),
+                "fips": pd.Series(fips, dtype=object),
+                "name": pd.Series(names, dtype=object),
+                "confidence": np.array(confidence, dtype=np.float64),
+                "matches": np.array(matches, dtype=np.int64),
+            }
+        )
@@ -0,0 +1,164 @@
+import functools
+
+from typing import Dict, Tuple, Union
+
+# Geography levels a GeoKey can have, from the least to the most specific
+LEVELS = ("us", "state", "msa", "county", "city")
+
+
+class GeoKey(object):
+    __slots__ = ("level", "state", "code")
+
+    def __init__(self, level: str, state: str = None, code: str = None):
+        """GeoKey is an immutable, hashable location: a geography level, the state it is in,
+        and its code at that level. Unlike location dictionaries, the same key can be shared
+        by several requests and used as a cache or index key without being changed under you.
+        Use GeoKey.parse to build one from a location dictionary or a FIPS code.
+
+        Parameters
+        ----------
+        level : str
+            One of "us", "state", "msa", "county", and "city"
+        state : str, optional
+            2-digit FIPS code of the state, None for the whole country (and for MSAs,
+            which can cross state lines)
+        code : str, optional
+            Code of the location at its level, e.g. "36448" for a city, "065" for a county,
+            or "*" for every city or county in the state. States have their own code
+            as their code, and the whole country is "1"
+        """
+        if level not in LEVELS:
+            raise ValueError(f"level must be one of {LEVELS}, not {level!r}")
+        object.__setattr__(self, "level", level)
+        object.__setattr__(self, "state", state)
+        object.__setattr__(self, "code", code)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GeoKey is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("GeoKey is immutable")
+
+    def __reduce__(self):
+        return (GeoKey, (self.level, self.state, self.code))
+
+    def _tuple(self) -> Tuple[str, str, str]:
+        return (self.level, self.state, self.code)
+
+    def __eq__(self, other):
+        if not isinstance(other, GeoKey):
+            return NotImplemented
+        return self._tuple() == other._tuple()
+
+    def __hash__(self):
+        return hash(self._tuple())
+
+    def __repr__(self):
+        return f"GeoKey({self.level!r}, {self.state!r}, {self.code!r})"
+
+    @property
+    def wildcard(self) -> bool:
+        """True for state-wide locations like every city in a state"""
+        return self.code == "*"
+
+    @property
+    def fips(self) -> str:
+        """FIPS code in the same format as lowe.locations.lookup uses, e.g. "0636448" for a city,
+        "06_065" for a county, "06" for a state, and "us" for the whole country"""
+        if self.level == "us":
+            return "us"
+        if self.level == "city":
+            return self.state + self.code
+        if self.level == "county":
+            return self.state + "_" + self.code
+        return self.code
+
+    def as_dict(self) -> Dict[str, str]:
+        """A new location dictionary, with the state under the "state" key
+        (e.g. {"state": "06", "city": "36448"}). The whole country is {}"""
+        if self.level == "us":
+            return {}
+        if self.level == "state":
+            return {"state": self.state}
+        if self.state is None:
+            return {self.level: self.code}
+        return {"state": self.state, self.level: self.code}
+
+    @classmethod
+    def parse(cls, location: Union["GeoKey", Dict[str, str], str]) -> "GeoKey":
+        """Builds a GeoKey from any of the ways lowe takes locations. The location is never modified.
+
+        Parameters
+        ----------
+        location : Union[GeoKey, Dict[str, str], str]
+            A location dictionary like {"city": "0636448"}, {"state": "06", "city": "36448"},
+            {"county": "06_065"}, {"state": "06", "county": "*"}, {"state": "06"}, or {} for the
+            whole country, or a FIPS code like "0636448", "06_065", "40140" (MSA), "06", or "us".
+            GeoKeys are returned as they are
+
+        Returns
+        -------
+        GeoKey
+        """
+        if isinstance(location, GeoKey):
+            return location
+        if isinstance(location, str):
+            return _parse_fips(location.strip())
+        return _parse_items(
+            tuple(
+                (str(k).lower(), str(v).strip())
+                for k, v in location.items()
+                if v is not None
+            )
+        )
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_fips(fips: str) -> GeoKey:
+    if fips.lower() == "us":
+        return GeoKey("us", None, "1")
+    if "_" in fips:
+        state, county = fips.split("_", 1)
+        return GeoKey("county", state.zfill(2), county)
+    if not fips.isdigit():
+        raise ValueError(f"Can't tell what kind of FIPS code {fips!r} is")
+    if len(fips) <= 2:
+        return GeoKey("state", fips.zfill(2), fips.zfill(2))
+    if len(fips) == 5:
+        return GeoKey("msa", None, fips)
+    if len(fips) == 7:
+        return GeoKey("city", fips[:2], fips[2:])
+    raise ValueError(f"Can't tell what kind of FIPS code {fips!r} is")
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_items(items: Tuple[Tuple[str, str], ...]) -> GeoKey:
+    location = dict(items)
+    state = location.pop("state", None)
+    if state is not None:
+        state = state.zfill(2)
+
+    if len(location) == 0:
+        if state is None:
+            return GeoKey("us", None, "1")
+        return GeoKey("state", state, state)
+    if len(location) > 1:
+        raise ValueError(
+            f"A location can only have one geography besides its state, got {sorted(location)}"
+        )
+
+    ((level, code),) = location.items()
+    if level not in LEVELS:
+        raise ValueError(f"Unknown geography {level!r}, must be one of {LEVELS}")
+
+    # 7-digit city codes and [state]_[county] county codes carry their state
+    if level == "city" and len(code) == 7:
+        state, code = state or code[:2], code[2:]
+    elif level == "county" and "_" in code:
+        prefix, code = code.split("_", 1)
+        state = state or prefix.zfill(2)
+    if level in ("city", "county") and state is None:
+        raise ValueError(
+            f"Pass the state of {level} {code}, either under 'state' or in the FIPS code"
+        )
+    return GeoKey(level, state, code)
@@ -1,8 +1,17 @@
 import json
+import numpy as np
 import pandas as pd
+import re
+import sys
+import threading
+import time
 
-from bidict import bidict
-from typing import Dict
+from bidict import frozenbidict
+from typing import Dict, List, Mapping, Tuple, Union
+
+from .compact import CompactTable, save_compact
+from .fuzzy import FuzzyResolver
+from .searchindex import LocationIndex
 
 try:
     import importlib.resources as pkg_resources
@@ -97,27 +106,214 @@ def generate_lookup_tables() -> dict:
     with open("lookuptables/states.json", "w", encoding="utf-8") as f:
         json.dump(decoder_states, f, ensure_ascii=False, indent=4)
 
+    # Compact binary copies, which load much faster (see DecoderRegistry)
+    save_compact(decoder_cities, "lookuptables/cities.bin")
+    save_compact(decoder_counties, "lookuptables/counties.bin")
+    save_compact(decoder_msas, "lookuptables/msas.bin")
+    save_compact(decoder_states, "lookuptables/states.bin")
+
+    # Name index for search()
+    LocationIndex.build(
+        {
+            "city": decoder_cities,
+            "county": decoder_counties,
+            "msa": decoder_msas,
+            "state": decoder_states,
+        }
+    ).save(f"lookuptables/{SEARCH_INDEX}")
+
+    registry.reload()
     return decoder_cities, decoder_counties, decoder_msas, decoder_states
 
 
-def load_decoder_tables(convert_to_bidict: bool = True):
-    # Load the files
-    with pkg_resources.open_text("lowe.locations.lookuptables", "cities.json") as f:
-        cities = json.load(f)
-    with pkg_resources.open_text("lowe.locations.lookuptables", "counties.json") as f:
-        counties = json.load(f)
-    with pkg_resources.open_text("lowe.locations.lookuptables", "msas.json") as f:
-        msas = json.load(f)
-    with pkg_resources.open_text("lowe.locations.lookuptables", "states.json") as f:
-        states = json.load(f)
+# File the location name index (see lowe.locations.searchindex) is saved to
+SEARCH_INDEX = "search_index.npz"
+
+# Queries search treats as FIPS codes: digits, and county codes like "06_065"
+FIPS_QUERY = re.compile(r"[0-9_]+")
+
+# Lowest confidence resolve accepts a misspelled name at, by default
+RESOLVE_CONFIDENCE = 0.75
+
+# Decoder tables, in the order load_decoder_tables returns them
+TABLE_NAMES = ("cities", "counties", "msas", "states")
+
+# Geography types (as used in location dictionaries) -> decoder table
+TABLE_ALIASES = {
+    "city": "cities",
+    "cities": "cities",
+    "county": "counties",
+    "counties": "counties",
+    "msa": "msas",
+    "msas": "msas",
+    "state": "states",
+    "states": "states",
+}
+
+
+def _table_size(table: Mapping) -> int:
+    """Approximate number of bytes a decoder table takes up in memory: its codes and
+    names, plus the hash tables of both directions (or the size of the mapped file)"""
+    if isinstance(table, CompactTable):
+        return table.nbytes
+    strings = sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in table.items())
+    return strings + 2 * sys.getsizeof(dict(table))
+
+
+class DecoderRegistry(object):
+    def __init__(self, package: str = "lowe.locations.lookuptables"):
+        """DecoderRegistry keeps one copy of each decoder table (FIPS code <-> name) for the whole process.
+        A table is loaded the first time it is asked for, and every later lookup reuses it, so translating
+        many locations doesn't re-read the files. Tables are memory-mapped from their compact binary files
+        (see lowe.locations.compact) when there are any, and read from their JSON files into frozenbidicts
+        otherwise. Either way they are read-only, since they are shared, and both map codes to names, with
+        .inverse mapping names to codes. Loading is thread safe: threads asking for a table while it is
+        being loaded wait for it instead of loading their own copy.
+
+        Parameters
+        ----------
+        package : str, optional
+            Package the table files are in, by default "lowe.locations.lookuptables"
+        """
+        self.package = package
+        self._tables = {}
+        self._indexes = {}
+        self._search_index = None
+        self._resolvers = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _name(self, codetype: str) -> str:
+        name = TABLE_ALIASES.get(codetype.lower(), None)
+        if name is None:
+            raise ValueError(
+                f"codetype must be one of state, msa, county, or city, not {codetype!r}"
+            )
+        return name
+
+    def get(self, codetype: str) -> Mapping:
+        """Returns a decoder table, loading it if it hasn't been loaded yet
+
+        Parameters
+        ----------
+        codetype : str
+            "state", "msa", "county", or "city" (or the name of the table, e.g. "cities")
+        """
+        name = self._name(codetype)
+        table = self._tables.get(name, None)
+        if table is not None:
+            return table
+        with self._lock:
+            if name not in self._tables:
+                self._load(name)
+            return self._tables[name]
+
+    def _load(self, name: str):
+        """Maps a table's compact binary file (see lowe.locations.compact), or reads its JSON file
+        if there is no binary file. Must be called with the lock held"""
+        start = time.perf_counter()
+        path = pkg_resources.files(self.package).joinpath(f"{name}.bin")
+        if path.is_file():
+            table = CompactTable(str(path))
+        else:
+            with pkg_resources.open_text(self.package, f"{name}.json") as f:
+                table = frozenbidict(json.load(f))
+        self._stats[name] = {
+            "entries": len(table),
+            "load_seconds": time.perf_counter() - start,
+            "bytes": _table_size(table),
+        }
+        self._tables[name] = table
+
+    def index(self, codetype: str) -> Tuple[pd.Index, pd.Index]:
+        """Returns the FIPS codes and the names of a decoder table as two aligned pandas indexes,
+        so whole arrays of codes or names can be looked up at once with get_indexer"""
+        name = self._name(codetype)
+        index = self._indexes.get(name, None)
+        if index is not None:
+            return index
+        table = self.get(name)
+        with self._lock:
+            if name not in self._indexes:
+                self._indexes[name] = (
+                    pd.Index(list(table.keys()), dtype=object),
+                    pd.Index(list(table.values()), dtype=object),
+                )
+            return self._indexes[name]
+
+    def search_index(self) -> LocationIndex:
+        """Returns the location name index used by search(), loading the one saved by
+        generate_lookup_tables, or building it from the tables if there isn't one"""
+        if self._search_index is not None:
+            return self._search_index
+        tables = {
+            level: self.get(level) for level in ("state", "msa", "county", "city")
+        }
+        with self._lock:
+            if self._search_index is None:
+                path = pkg_resources.files(self.package).joinpath(SEARCH_INDEX)
+                if path.is_file():
+                    self._search_index = LocationIndex.load(str(path))
+                else:
+                    self._search_index = LocationIndex.build(tables)
+            return self._search_index
+
+    def resolver(self, codetype: str, build: bool = True) -> FuzzyResolver:
+        """Returns the fuzzy name resolver of a decoder table, building it the first time it's needed.
+        Building one takes up to a second, so pass build=False to get None instead if it isn't built yet
+        """
+        name = self._name(codetype)
+        resolver = self._resolvers.get(name, None)
+        if resolver is not None or not build:
+            return resolver
+        table = self.get(name)
+        with self._lock:
+            if name not in self._resolvers:
+                self._resolvers[name] = FuzzyResolver(table)
+            return self._resolvers[name]
+
+    def tables(self) -> Tuple[Mapping, Mapping, Mapping, Mapping]:
+        """Returns every table, in the order (cities, counties, msas, states)"""
+        return tuple(self.get(name) for name in TABLE_NAMES)
+
+    def reload(self, codetype: str = None):
+        """Throws away a loaded table (or every table, by default) so it is read from its file
+        again the next time it is needed, e.g. after regenerating the files with generate_lookup_tables
+        """
+        with self._lock:
+            if codetype is None:
+                self._tables.clear()
+                self._indexes.clear()
+                self._search_index = None
+                self._resolvers.clear()
+            else:
+                self._tables.pop(self._name(codetype), None)
+                self._indexes.pop(self._name(codetype), None)
+                self._resolvers.pop(self._name(codetype), None)
+
+    def stats(self) -> Dict[str, Dict[str, Union[int, float, bool]]]:
+        """Number of entries, seconds it took to load, and approximate size in bytes of each table
+        that has been loaded, and whether it's currently loaded"""
+        return {
+            name: {**stats, "loaded": name in self._tables}
+            for name, stats in self._stats.items()
+        }
+
+
+# Decoder tables shared by every lookup in the process
+registry = DecoderRegistry()
 
-    if convert_to_bidict:
-        cities = bidict(cities)
-        counties = bidict(counties)
-        msas = bidict(msas)
-        states = bidict(states)
 
-    return cities, counties, msas, states
+def load_decoder_tables(convert_to_bidict: bool = True):
+    """Returns the decoder tables (cities, counties, msas, states), FIPS code -> name.
+    The tables are only read once per process (see DecoderRegistry), and are shared,
+    so they are returned read-only (with .inverse mapping names to codes, like a bidict),
+    or as new dictionaries if convert_to_bidict is False
+    """
+    tables = registry.tables()
+    if convert_to_bidict:
+        return tables
+    return tuple(dict(table) for table in tables)
 
 
 # -------------------------------
@@ -165,24 +361,22 @@ def fips2name(loc: Dict[str, str]) -> Dict[str, str]:
                     "ERROR: Make sure to either pass in county FIPS as [state]_[county] or include state as well"
                 )
 
-    cities, counties, msas, states = load_decoder_tables()
-
     res = dict({})
 
     if loc_city is not None:
         if len(loc_city) < 7:
             loc_city = loc_state + loc_city
-        res["city"] = cities[loc_city]
+        res["city"] = registry.get("cities")[loc_city]
     if loc_county is not None:
         if "_" not in loc_county:
             print(
                 "Warning: county FIPS codes should be in the format [statecode]_[countycode]"
             )
-        res["county"] = counties[loc_county]
+        res["county"] = registry.get("counties")[loc_county]
     if loc_msa is not None:
-        res["msa"] = msas[loc_msa]
+        res["msa"] = registry.get("msas")[loc_msa]
     if loc_state is not None:
-        res["state"] = states[loc_state]
+        res["state"] = registry.get("states")[loc_state]
 
     # If only the city is passed in and not the state, infer it
 
@@ -193,7 +387,9 @@ def fips2name(loc: Dict[str, str]) -> Dict[str, str]:
     return res
 
 
-def _name2fips_helper(name: str, codetype: str = None) -> Dict[str, str]:
+def _name2fips_helper(
+    name: str, codetype: str = None, fuzzy: bool = False
+) -> Dict[str, str]:
     """_name2fips_helper converts the name of one region to its corresponding FIPS code
 
     Parameters
@@ -204,6 +400,8 @@ def _name2fips_helper(name: str, codetype: str = None) -> Dict[str, str]:
         The type of region to pass, by default None
         Example: if I pass in "ca", I should set codetype="state".
         Possible values are "state", "msa", "county", and "city"
+    fuzzy : bool, optional
+        If the name isn't found, use the closest match (see resolve), by default False
 
     Returns
     -------
@@ -212,23 +410,45 @@ def _name2fips_helper(name: str, codetype: str = None) -> Dict[str, str]:
     """
     name = name.lower()
     codetype = codetype.lower()
-    cities, counties, msas, states = load_decoder_tables()
-
-    if codetype == "state" or codetype == "states":
-        return states.inverse[name]
-    elif codetype == "msa" or codetype == "msas":
-        return msas.inverse[name]
-    elif codetype == "county" or codetype == "counties":
-        if "_" not in name:
-            print("Warning: Pass in county FIPS codes as [state]_[county]")
-        return counties.inverse[name]
-    elif codetype == "city" or codetype == "cities":
-        return cities.inverse[name]
-
-    return None
+    if codetype not in TABLE_ALIASES:
+        return None
+
+    if TABLE_ALIASES[codetype] == "counties" and "_" not in name:
+        print("Warning: Pass in county FIPS codes as [state]_[county]")
+    table = registry.get(codetype)
+    if name in table.inverse:
+        return table.inverse[name]
+
+    # Only build the resolver (up to a second) when we're going to use the match, or
+    # when it's already built and a suggestion is free
+    resolver = registry.resolver(codetype, build=fuzzy)
+    if resolver is None:
+        raise KeyError(
+            f"Couldn't find the {codetype} {name!r}. Pass fuzzy=True to use the closest "
+            "match, or see resolve"
+        )
+    i, confidence, matches = resolver.resolve(name)
+    if i < 0 or confidence < RESOLVE_CONFIDENCE:
+        raise KeyError(f"Couldn't find the {codetype} {name!r}")
+    if matches > 1:
+        # Never guess between equally good matches, e.g. the dozens of Springfields
+        raise KeyError(
+            f"Couldn't find the {codetype} {name!r}, and {matches} locations match it "
+            'equally well. Add the state to the name (e.g. ", ca")'
+        )
+    fips = resolver.codes[i]
+    if not fuzzy:
+        raise KeyError(
+            f"Couldn't find the {codetype} {name!r}. Did you mean {table[fips]!r}? "
+            "Pass fuzzy=True to use the closest match"
+        )
+    print(
+        f"Warning: {name!r} isn't a {codetype}, using {table[fips]!r} (confidence {confidence:.2f})"
+    )
+    return fips
 
 
-def name2fips(loc: Dict[str, str]) -> Dict[str, str]:
+def name2fips(loc: Dict[str, str], fuzzy: bool = False) -> Dict[str, str]:
     """name2fips converts a dictionary with keys corresponding to geography types ("state", "msa", "county", "city").
     Values are english names of locations. Note that the state must be included in each geography.
     It's annoying, but necessary to guarantee uniqueness (msas, counties, and cities in different states can and do have the same name)
@@ -244,13 +464,159 @@ def name2fips(loc: Dict[str, str]) -> Dict[str, str]:
     ----------
     loc : dict
         A dictionary with the same keys, but values corresponding to FIPS codes
+    fuzzy : bool, optional
+        Translate names that are misspelled or written a little differently (e.g. "palm sprngs, ca")
+        to the closest match instead of raising a KeyError, by default False. Names that match
+        several locations equally well still raise. See resolve
     """
     res = dict({})
     for key, value in loc.items():
-        res[key] = _name2fips_helper(name=value, codetype=key)
+        res[key] = _name2fips_helper(name=value, codetype=key, fuzzy=fuzzy)
     return res
 
 
+def resolve(
+    name: str,
+    codetype: str,
+    state: str = None,
+    min_confidence: float = RESOLVE_CONFIDENCE,
+) -> Tuple[Union[str, None], float]:
+    """resolve finds the FIPS code of a location whose name may be misspelled or written a little
+    differently than in the decoder tables, e.g. "Palm Sprngs" or "CATHEDRAL CITY, CA"
+    (see lowe.locations.fuzzy.FuzzyResolver)
+
+    Parameters
+    ----------
+    name : str
+        Name of the location. Case and punctuation are ignored, and the state at the end
+        (", ca") can be left out
+    codetype : str
+        Type of the location. Possible values are "state", "msa", "county", and "city"
+    state : str, optional
+        Only match locations in this state (abbreviation, e.g. "ca"), by default the state
+        at the end of the name, if there is one
+    min_confidence : float, optional
+        Lowest confidence (between 0 and 1) to accept a match at, by default 0.75
+
+    Returns
+    -------
+    Tuple[Union[str, None], float]
+        FIPS code of the best match and its confidence. The code is None if nothing matched with
+        min_confidence, or if several locations match equally well (e.g. "springfield" without a state)
+    """
+    resolver = registry.resolver(codetype)
+    i, confidence, matches = resolver.resolve(name, state=state)
+    if i < 0 or confidence < min_confidence or matches > 1:
+        return None, confidence
+    return resolver.codes[i], confidence
+
+
+def resolve_many(
+    names: Union[pd.Series, List[str]],
+    codetype: str,
+    state: str = None,
+    min_confidence: float = RESOLVE_CONFIDENCE,
+) -> pd.DataFrame:
+    """resolve_many is the bulk version of resolve, for joining datasets whose location names are
+    spelled differently (e.g. DOF or CDTFA city names) to FIPS codes. Each distinct name is only
+    resolved once
+
+    Parameters
+    ----------
+    names : Union[pd.Series, List[str]]
+        Names of the locations
+    codetype : str
+        Type of the locations. Possible values are "state", "msa", "county", and "city"
+    state : str, optional
+        Only match locations in this state (abbreviation, e.g. "ca"), by default the state
+        at the end of each name, if there is one
+    min_confidence : float, optional
+        Lowest confidence (between 0 and 1) to accept a match at, by default 0.75
+
+    Returns
+    -------
+    pd.DataFrame
+        Dataframe with one row per name (in the same order as names) and the columns query, fips,
+        name, confidence, and matches (the number of locations that match equally well, more than
+        1 if the name is ambiguous). fips and name are None for the names that weren't resolved,
+        including ambiguous ones
+    """
+    return registry.resolver(codetype).resolve_many(
+        names, state=state, min_confidence=min_confidence
+    )
+
+
+# Number of digits of each kind of FIPS code, to left-pad codes that lost their leading zeros
+FIPS_WIDTHS = {"cities": 7, "msas": 5, "states": 2}
+
+
+def _lookup_many(
+    values: Union[pd.Series, List[str]], source: pd.Index, target: pd.Index
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Looks up every value in source (with one hash join) and returns the matching
+    entries of target, with None and a True in the mask for the values that aren't there
+    """
+    positions = source.get_indexer(pd.Index(values, dtype=object))
+    unresolved = positions < 0
+    res = target.to_numpy(dtype=object)[positions]
+    res[unresolved] = None
+    return res, unresolved
+
+
+def name2fips_many(
+    names: Union[pd.Series, List[str]], codetype: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """name2fips_many is the vectorized version of name2fips for a single geography type:
+    it translates a whole list (or Series) of names to FIPS codes at once.
+
+    Parameters
+    ----------
+    names : Union[pd.Series, List[str]]
+        Names of the locations, e.g. ["palm springs, ca", "indio, ca"]. Case and leading or
+        trailing spaces are ignored. MSA, county, and city names need the state at the end
+    codetype : str
+        Type of the locations. Possible values are "state", "msa", "county", and "city"
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        FIPS code of each name (None for the names that couldn't be found, in the same order
+        as names), and a boolean mask that is True for the names that couldn't be found
+    """
+    codes, labels = registry.index(codetype)
+    names = pd.Series(names, dtype=object).str.strip().str.lower()
+    return _lookup_many(names, labels, codes)
+
+
+def fips2name_many(
+    codes: Union[pd.Series, List[str]], codetype: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """fips2name_many is the vectorized version of fips2name for a single geography type:
+    it translates a whole list (or Series) of FIPS codes to names at once.
+
+    Parameters
+    ----------
+    codes : Union[pd.Series, List[str]]
+        FIPS codes of the locations, in the same format as fips2name takes them (7-digit
+        city codes and [state]_[county] county codes). Codes stored as numbers are left-padded
+        with zeros
+    codetype : str
+        Type of the locations. Possible values are "state", "msa", "county", and "city"
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Name of each location (None for the codes that couldn't be found, in the same order
+        as codes), and a boolean mask that is True for the codes that couldn't be found
+    """
+    fips, labels = registry.index(codetype)
+    codes = pd.Series(codes, dtype=object).astype(str).str.strip()
+    width = FIPS_WIDTHS.get(TABLE_ALIASES.get(codetype.lower(), None), None)
+    if width is not None:
+        codes = codes.str.zfill(width)
+    return _lookup_many(codes, fips, labels)
+
+
 # -------------------------------
 # Search Functions
 # -------------------------------
@@ -267,57 +633,55 @@ def generate_df_json(codetype: str):
     codetype : str
         Type of file to read. Possible values are "city", "county", "msa", "states"
     """
-    cities, counties, msas, states = load_decoder_tables(convert_to_bidict=False)
-
-    if codetype.lower() in ["state", "states"]:
-        df = pd.DataFrame.from_dict(states, orient="index", columns=["name"])
-        df["fips"] = df.index
-        df.reset_index(inplace=True, drop=True)
-        return df
-
-    if codetype.lower() in ["msa", "msas"]:
-        df = pd.DataFrame.from_dict(msas, orient="index", columns=["name"])
-        df["fips"] = df.index
-        df.reset_index(inplace=True, drop=True)
-        return df
-
-    if codetype.lower() in ["county", "counties"]:
-        df = pd.DataFrame.from_dict(counties, orient="index", columns=["name"])
-        df["fips"] = df.index
-        df.reset_index(inplace=True, drop=True)
-        return df
+    if codetype.lower() not in TABLE_ALIASES:
+        return None
 
-    if codetype.lower() in ["city", "cities"]:
-        df = pd.DataFrame.from_dict(cities, orient="index", columns=["name"])
-        df["fips"] = df.index
-        df.reset_index(inplace=True, drop=True)
-        return df
-
-    return None
+    table = registry.get(codetype)
+    df = pd.DataFrame({"name": list(table.values()), "fips": list(table.keys())})
+    return df
 
 
-def search(query: str, codetype: str, search_on: str = None) -> pd.DataFrame:
-    """search searches the relevant dataset specified by codetype for all entries matching the fips code or name provided
+def search(
+    query: str, codetype: str = None, search_on: str = None, limit: int = None
+) -> pd.DataFrame:
+    """search searches the relevant dataset specified by codetype for all entries matching the fips code or name provided.
+    Names are looked up in a prebuilt index (see lowe.locations.searchindex), so every query is fast enough to search
+    as you type, and matches are ranked: exact names first, then names with words that start with the words of
+    the query, then names that are spelled a little differently
 
     Parameters
     ----------
     query : str
         Search query to run on the dataset
-    codetype : str
-        Dataset to look into. Possible values are "state", "msa", "county", "city"
+    codetype : str, optional
+        Dataset to look into. Possible values are "state", "msa", "county", "city", by default every dataset
     search_on : str, optional
-        Search by "fips" or by "name", by default "name"
+        Search by "fips" or by "name", by default "name" (or "fips" if the query looks like a FIPS code,
+        e.g. "0655254" or "06_065")
         If "name", pass in the name of the geography you want to find the FIPS code for
+    limit : int, optional
+        Maximum number of matches to return, by default all of them
 
     Returns
     -------
-    None. Prints the first 25 search results in dataframe format
+    pd.DataFrame
+        Dataframe with the name, fips, level, and score (between 0 and 1) of each match, best matches first
     """
     if search_on is None:
-        search_on = "fips" if query.isdigit() else "name"
-    df = generate_df_json(codetype=codetype)
-    df = df.astype(str)  # Convert all cols to string
-    df = df[df[search_on].str.contains(query)]
+        search_on = "fips" if FIPS_QUERY.fullmatch(query.strip()) else "name"
+    if codetype is not None:
+        codetype = {
+            "cities": "city",
+            "counties": "county",
+            "msas": "msa",
+            "states": "state",
+        }.get(codetype.lower(), codetype.lower())
+
+    index = registry.search_index()
+    if search_on == "fips":
+        df = index.search_fips(query.strip(), codetype=codetype, limit=limit)
+    else:
+        df = index.search(query, codetype=codetype, limit=limit)
     pd.options.display.max_rows = len(df) if len(df) < 25 else 25
     return df
 
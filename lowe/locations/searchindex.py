@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+import re
+
+from typing import Dict, List, Mapping, Tuple
+
+# Unicode letters and digits, so names like "española, nm" tokenize properly
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Lowest score search returns by default. Names whose words don't start with the query words
+# need to share at least 60% of their trigrams with it, which keeps close misspellings
+# ("cathedrl city") and drops names that only look alike ("cathedral, co")
+MIN_SCORE = 0.3
+
+# Geography levels in the index, in the order their entries are stored
+LEVELS = ("state", "msa", "county", "city")
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits a query or location name into lowercase words"""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def trigrams(text: str) -> set:
+    """Trigrams of a query or location name, padded so short words and word boundaries count too"""
+    padded = "  " + " ".join(tokenize(text)) + " "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _postings(keys: List[List[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Inverted index from the keys of each entry: the sorted (UTF-8 encoded) keys, and the entries of
+    each key stored back to back (like a CSR matrix), so key i has entries postings[offsets[i] : offsets[i + 1]]
+    """
+    flat = np.array(
+        [key.encode("utf-8") for entry_keys in keys for key in entry_keys], dtype=bytes
+    )
+    entries = np.repeat(np.arange(len(keys)), [len(entry_keys) for entry_keys in keys])
+    # Entries are already in order, so a stable sort keeps each key's entries sorted
+    order = np.argsort(flat, kind="stable")
+    vocab, starts = np.unique(flat[order], return_index=True)
+    offsets = np.append(starts, len(flat)).astype(np.int64)
+    return vocab, offsets, entries[order].astype(np.int32)
+
+
+class LocationIndex(object):
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """LocationIndex finds locations by name across states, MSAs, counties, and cities, ranked by how
+        well they match. Build it with LocationIndex.build (generate_lookup_tables saves one with the
+        decoder tables) and load it with LocationIndex.load.
+
+        Every name is indexed two ways: under its words, kept sorted so every word that starts with a query
+        word sits in one contiguous range (prefix matches, for searching as you type), and under its
+        trigrams, so names that are spelled a little differently still match. A match's score is half
+        the trigram (Jaccard) similarity between the query and the name, plus half if every query word is
+        the start of a word in the name, so an exact match scores 1.
+
+        Parameters
+        ----------
+        arrays : Dict[str, np.ndarray]
+            Arrays of the index, as built by LocationIndex.build
+        """
+        self.arrays = arrays
+        self.levels = arrays["levels"]
+        self.level_offsets = arrays["level_offsets"]
+        self.codes = arrays["codes"]
+        self.name_offsets = arrays["name_offsets"]
+        self.names = arrays["names"].tobytes()
+        self.sizes = arrays["trigram_sizes"]
+
+        self.tokens = arrays["tokens"]
+        self.token_offsets = arrays["token_offsets"]
+        self.token_postings = arrays["token_postings"]
+        self.trigrams = arrays["trigrams"]
+        self.trigram_offsets = arrays["trigram_offsets"]
+        self.trigram_postings = arrays["trigram_postings"]
+
+    @classmethod
+    def build(cls, tables: Mapping[str, Mapping[str, str]]) -> "LocationIndex":
+        """Builds the index of the decoder tables
+
+        Parameters
+        ----------
+        tables : Mapping[str, Mapping[str, str]]
+            Geography level ("state", "msa", "county", or "city") -> decoder table (FIPS code -> name)
+        """
+        codes, names, levels = [], [], []
+        level_offsets = [0]
+        for i, level in enumerate(LEVELS):
+            table = tables.get(level, {})
+            entries = sorted(
+                (code, name) for code, name in table.items() if isinstance(name, str)
+            )
+            codes += [code for code, _ in entries]
+            names += [name for _, name in entries]
+            levels += [i] * len(entries)
+            level_offsets.append(len(codes))
+
+        encoded = [name.encode("utf-8") for name in names]
+        grams = [trigrams(name) for name in names]
+        tokens, token_offsets, token_postings = _postings(
+            [set(tokenize(name)) for name in names]
+        )
+        vocab, trigram_offsets, trigram_postings = _postings(grams)
+
+        return cls(
+            dict(
+                levels=np.array(levels, dtype=np.uint8),
+                level_offsets=np.array(level_offsets, dtype=np.int64),
+                codes=np.array(codes, dtype=bytes),
+                name_offsets=np.cumsum([0] + [len(name) for name in encoded]),
+                names=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+                trigram_sizes=np.array([len(g) for g in grams], dtype=np.int32),
+                tokens=tokens,
+                token_offsets=token_offsets,
+                token_postings=token_postings,
+                trigrams=vocab,
+                trigram_offsets=trigram_offsets,
+                trigram_postings=trigram_postings,
+            )
+        )
+
+    def save(self, path: str):
+        """Saves the index to a .npz file"""
+        np.savez(path, **self.arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "LocationIndex":
+        """Loads an index saved with save"""
+        with np.load(path) as arrays:
+            return cls({k: arrays[k] for k in arrays.files})
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _name(self, i: int) -> str:
+        return self.names[self.name_offsets[i] : self.name_offsets[i + 1]].decode(
+            "utf-8"
+        )
+
+    def _prefix(self, word: str) -> np.ndarray:
+        """Entries with a word that starts with word"""
+        key = word.encode("utf-8")
+        lo = np.searchsorted(self.tokens, key, side="left")
+        hi = np.searchsorted(self.tokens, key + b"\xff", side="left")
+        return np.unique(
+            self.token_postings[self.token_offsets[lo] : self.token_offsets[hi]]
+        )
+
+    def _similarity(self, query: str) -> np.ndarray:
+        """Trigram (Jaccard) similarity between the query and every entry"""
+        grams = np.array([g.encode("utf-8") for g in trigrams(query)], dtype=bytes)
+        positions = np.searchsorted(self.trigrams, grams)
+        found = positions < len(self.trigrams)
+        found[found] = self.trigrams[positions[found]] == grams[found]
+        positions = positions[found]
+        postings = [
+            self.trigram_postings[self.trigram_offsets[p] : self.trigram_offsets[p + 1]]
+            for p in positions
+        ]
+        shared = np.bincount(
+            np.concatenate(postings) if postings else np.empty(0, np.int32),
+            minlength=len(self),
+        )
+        return shared / (len(grams) + self.sizes - shared)
+
+    def _level_range(self, codetype: str = None) -> Tuple[int, int]:
+        if codetype is None:
+            return 0, len(self)
+        level = LEVELS.index(codetype)
+        return self.level_offsets[level], self.level_offsets[level + 1]
+
+    def search(
+        self,
+        query: str,
+        codetype: str = None,
+        limit: int = 25,
+        min_score: float = MIN_SCORE,
+    ) -> pd.DataFrame:
+        """Finds the locations whose names best match a query
+
+        Parameters
+        ----------
+        query : str
+            Name (or the start of a name) to look for, e.g. "palm spr"
+        codetype : str, optional
+            Only return locations of this level ("state", "msa", "county", or "city"),
+            by default every level
+        limit : int, optional
+            Maximum number of matches to return, by default 25. Pass None for every match
+        min_score : float, optional
+            Lowest score to return, by default MIN_SCORE
+
+        Returns
+        -------
+        pd.DataFrame
+            Dataframe with the name, fips, level, and score (between 0 and 1) of each match,
+            best matches first
+        """
+        lo, hi = self._level_range(codetype)
+        if len(tokenize(query)) == 0:
+            return self._frame(np.empty(0, dtype=np.int64), np.empty(0))
+
+        prefix = None
+        for word in tokenize(query):
+            found = self._prefix(word)
+            prefix = found if prefix is None else np.intersect1d(prefix, found)
+
+        scores = self._similarity(query) / 2
+        scores[prefix] += 0.5
+        candidates = lo + np.flatnonzero(scores[lo:hi] >= min_score)
+        order = np.lexsort((candidates, -scores[candidates]))[:limit]
+        return self._frame(candidates[order], scores[candidates[order]])
+
+    def search_fips(self, query: str, codetype: str = None, limit: int = None):
+        """Finds the locations whose FIPS codes contain query, e.g. "55254" matches
+        Palm Springs ("0655254"). Scores are the share of the code the query covers"""
+        lo, hi = self._level_range(codetype)
+        codes = self.codes[lo:hi]
+        candidates = lo + np.flatnonzero(np.char.find(codes, query.encode()) >= 0)
+        scores = len(query) / np.char.str_len(self.codes[candidates])
+        order = np.lexsort((candidates, -scores))[:limit]
+        return self._frame(candidates[order], scores[order])
+
+    def _frame(self, entries: np.ndarray, scores: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "name": [self._name(i) for i in entries],
+                "fips": self.codes[entries].astype(str),
+                "level": np.asarray(LEVELS, dtype=object)[self.levels[entries]],
+                "score": scores,
+            }
+        )
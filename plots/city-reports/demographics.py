@@ -261,10 +261,7 @@ def pop_growth_rates(
     # Get a column for CV excluding the target city
     colname_cv_excl = f"CV Excl. {target_city}"
 
-    df[colname_cv_excl] = 0
-    for city in cities:
-        if city != target_city:
-            df[colname_cv_excl] += df[city]
+    df[colname_cv_excl] = df[cities].sum(axis=1) - df[target_city]
 
     # Calculate growth rates
 
@@ -420,6 +417,7 @@ async def age_distribution(
         end_year=year,
         location=loc_fips + county,
         estimate="5",
+        label_filter="AGE AND SEX Estimate (Percent|Total Total)",
         debug=False,
     )
 
@@ -446,36 +444,28 @@ async def age_distribution(
 
     # Consolidating the age groups
     resp["0-14 years perc"] = (
-        resp["Under 5 years"].astype(float)
-        + resp["5 to 9 years"].astype(float)
-        + resp["10 to 14 years"].astype(float)
+        resp["Under 5 years"] + resp["5 to 9 years"] + resp["10 to 14 years"]
     )
 
-    resp["15-24 years perc"] = resp["15 to 19 years"].astype(float) + resp[
-        "20 to 24 years"
-    ].astype(float)
+    resp["15-24 years perc"] = resp["15 to 19 years"] + resp["20 to 24 years"]
 
-    resp["25-34 years perc"] = resp["25 to 29 years"].astype(float) + resp[
-        "30 to 34 years"
-    ].astype(float)
+    resp["25-34 years perc"] = resp["25 to 29 years"] + resp["30 to 34 years"]
 
-    resp["35-44 years perc"] = resp["35 to 39 years"].astype(float) + resp[
-        "40 to 44 years"
-    ].astype(float)
+    resp["35-44 years perc"] = resp["35 to 39 years"] + resp["40 to 44 years"]
 
     resp["45-64 years perc"] = (
-        resp["45 to 49 years"].astype(float)
-        + resp["50 to 54 years"].astype(float)
-        + resp["55 to 59 years"].astype(float)
-        + resp["60 to 64 years"].astype(float)
+        resp["45 to 49 years"]
+        + resp["50 to 54 years"]
+        + resp["55 to 59 years"]
+        + resp["60 to 64 years"]
     )
 
     resp["65+ years perc"] = (
-        resp["65 to 69 years"].astype(float)
-        + resp["70 to 74 years"].astype(float)
-        + resp["75 to 79 years"].astype(float)
-        + resp["80 to 84 years"].astype(float)
-        + resp["85 years and over"].astype(float)
+        resp["65 to 69 years"]
+        + resp["70 to 74 years"]
+        + resp["75 to 79 years"]
+        + resp["80 to 84 years"]
+        + resp["85 years and over"]
     )
 
     perc_cols = [
@@ -497,11 +487,7 @@ async def age_distribution(
     ]
 
     for i, colname in enumerate(raw_cols):
-        resp[colname] = (
-            resp[perc_cols[i]].astype(float)
-            * resp["Total population"].astype(float)
-            * 0.01
-        )
+        resp[colname] = resp[perc_cols[i]] * resp["Total population"] * 0.01
 
     cols = ["location_key"] + perc_cols + raw_cols + ["Total population"]
 
@@ -712,7 +698,12 @@ async def race_group_distribution(
     loc_fips = [*map(name2fips, loc_dicts)]
 
     resp = await client.get_acs(
-        vars=["DP05"], start_year=year, end_year=year, estimate="5", location=loc_fips
+        vars=["DP05"],
+        start_year=year,
+        end_year=year,
+        estimate="5",
+        location=loc_fips,
+        label_filter=list(cols.keys()),
     )
 
     col_sub = [*list(cols.keys()), "state", "city"]
@@ -722,7 +713,7 @@ async def race_group_distribution(
     # Following is unique to each section
 
     categ = resp.columns[0:8]
-    value = resp.iloc[0][0:8].astype(str).astype(float)
+    value = resp.iloc[0, 0:8].astype(float)
 
     categ = _axis_line_breaks(categ, 10)
 
@@ -800,7 +791,12 @@ async def households_with_internet(
     loc_fips = [*map(name2fips, loc_dicts)]
 
     resp = await client.get_acs(
-        vars=["S2801"], start_year=year, end_year=year, estimate="5", location=loc_fips
+        vars=["S2801"],
+        start_year=year,
+        end_year=year,
+        estimate="5",
+        location=loc_fips,
+        label_filter=[target_cols],
     )
 
     col_sub = [target_cols, "state", "city"]
@@ -810,7 +806,7 @@ async def households_with_internet(
     # Following is unique to each section
 
     categ = resp["city"]
-    value = resp["Percent of Total Households with Broadband"].astype(str).astype(float)
+    value = resp["Percent of Total Households with Broadband"]
 
     plot_df = pd.DataFrame({"Type": categ, "Value": value})
     plot_df["Type"] = plot_df["Type"].str.title()
@@ -892,7 +888,12 @@ async def residence_and_work_loc(
     loc_fips = [*map(name2fips, loc_dicts)]
 
     resp = await client.get_acs(
-        vars=["S0801"], start_year=year, end_year=year, estimate="5", location=loc_fips
+        vars=["S0801"],
+        start_year=year,
+        end_year=year,
+        estimate="5",
+        location=loc_fips,
+        label_filter=list(cols.keys()),
     )
 
     col_sub = [*list(cols.keys()), "state", "city"]
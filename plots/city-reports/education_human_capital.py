@@ -1,7 +1,6 @@
 # Code written by Aaron Onate, slight modifications for production made by Abhi Uppal
 
 import asyncio
-import pandas as pd
 import plotly.graph_objects as go
 
 from lowe.acs.ACSClient import ACSClient
@@ -70,7 +69,12 @@ async def human_capital_index_cv(
     locs = [*map(name2fips, loc_dicts)]
 
     resp = await client.get_acs(
-        vars=["S1501"], start_year=year, end_year=year, estimate="5", location=locs
+        vars=["S1501"],
+        start_year=year,
+        end_year=year,
+        estimate="5",
+        location=locs,
+        label_filter="EDUCATIONAL ATTAINMENT Estimate Percent AGE BY EDUCATIONAL ATTAINMENT Population 25 years and over",
     )
 
     target_cols = [
@@ -97,7 +101,6 @@ async def human_capital_index_cv(
     renamed_colsDict = dict(zip(target_cols, renamed_colsList))
 
     df_resp = resp[target_cols]
-    df_resp = df_resp.apply(pd.to_numeric, errors="ignore")
     df_resp = df_resp.rename(columns=renamed_colsDict)
     df_resp["city"] = df_resp["city"].apply(lambda x: x.title())
 
@@ -191,7 +194,12 @@ async def educational_attainment_cv(
     locs = [*map(name2fips, loc_dicts)]
 
     resp = await client.get_acs(
-        vars=["S1501"], start_year=year, end_year=year, estimate="5", location=locs
+        vars=["S1501"],
+        start_year=year,
+        end_year=year,
+        estimate="5",
+        location=locs,
+        label_filter="EDUCATIONAL ATTAINMENT Estimate Percent AGE BY EDUCATIONAL ATTAINMENT Population 25 years and over",
     )
 
     # important columns and dictionaries below:
@@ -213,7 +221,6 @@ async def educational_attainment_cv(
     df_final = resp[target_cols]
     df_final = df_final.rename(columns=renamed_cols)
 
-    df_final = df_final.apply(pd.to_numeric, errors="ignore")
     df_final = df_final.sort_values("High School Ed. Attainment", ascending=False)
     df_final = df_final.sort_values("College Ed. Attainment", ascending=False)
     df_final["city"] = df_final["city"].apply(lambda x: x.title())
@@ -53,10 +53,20 @@ async def health_insurance(
         Scale to generate the image at
     """
 
+    target_cols = [
+        "SELECTED CHARACTERISTICS OF HEALTH INSURANCE COVERAGE IN THE UNITED STATES Estimate Percent Insured Civilian noninstitutionalized population",
+        "location_key",
+    ]
+
     # Pull data for city
     loc = name2fips({"city": city})
     resp = await client.get_acs(
-        vars=["S2701"], start_year="2015", end_year=year, estimate="5", location=loc
+        vars=["S2701"],
+        start_year="2015",
+        end_year=year,
+        estimate="5",
+        location=loc,
+        label_filter=target_cols[:1],
     )
 
     # pull data for united states
@@ -66,6 +76,7 @@ async def health_insurance(
         end_year=year,
         location={},  # united states
         estimate="5",
+        label_filter=target_cols[:1],
     )
 
     # pull data for california
@@ -75,13 +86,9 @@ async def health_insurance(
         end_year=year,
         location={"state": "06"},  # california
         estimate="5",
+        label_filter=target_cols[:1],
     )
 
-    target_cols = [
-        "SELECTED CHARACTERISTICS OF HEALTH INSURANCE COVERAGE IN THE UNITED STATES Estimate Percent Insured Civilian noninstitutionalized population",
-        "location_key",
-    ]
-
     cityname = (
         city.title()[:-1] + city[-1].upper()
     )  # Ensures the state is fully capitalized
@@ -92,17 +99,14 @@ async def health_insurance(
 
     # format city dataframe
     df_resp = resp[target_cols]
-    df_resp = df_resp.apply(pd.to_numeric, errors="ignore")
     df_resp = df_resp.rename(columns=renamed_colCity)
 
     # format us dataframe
     df_resp1 = resp1[target_cols]
-    df_resp1 = df_resp1.apply(pd.to_numeric, errors="ignore")
     df_resp1 = df_resp1.rename(columns=renamed_colUS)
 
     # format california dataframe
     df_resp2 = resp2[target_cols]
-    df_resp2 = df_resp2.apply(pd.to_numeric, errors="ignore")
     df_resp2 = df_resp2.rename(columns=renamed_colCalifornia)
 
     # combine all three dataframes
@@ -49,6 +49,11 @@ def _axis_line_breaks(elems: list, max_chars: int = 15):
     return [*map(lambda x: _axis_line_breaks_elem(x, max_chars), elems)]
 
 
+def _income_label(year: str):
+    """Start of the income column names, which are in dollars of the year of the data"""
+    return f"INCOME IN THE PAST 12 MONTHS (IN {year} INFLATION-ADJUSTED DOLLARS)"
+
+
 # ------------------------------
 # Plot Generation
 # ------------------------------
@@ -94,25 +99,29 @@ async def total_household_income(
 
     #     INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Families Total * INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Families Mean income (dollars)
 
+    income = _income_label(year)
     cols = {
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Families Total": "Families Total",
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Families Mean income (dollars)": "Income Per",
+        f"{income} Estimate Families Total": "Families Total",
+        f"{income} Estimate Families Mean income (dollars)": "Income Per",
     }
 
     loc_dicts = [{"city": city} for city in cities]
     loc_fips = [*map(name2fips, loc_dicts)]
 
     resp = await client.get_acs(
-        vars=["S1901"], start_year=year, end_year=year, estimate="5", location=loc_fips
+        vars=["S1901"],
+        start_year=year,
+        end_year=year,
+        estimate="5",
+        location=loc_fips,
+        label_filter=list(cols.keys()),
     )
 
     col_sub = [*list(cols.keys()), "state", "city"]
     resp = resp[col_sub]
     resp = resp.rename(columns=cols)
 
-    resp["Total Income"] = resp["Families Total"].astype(str).astype(int) * resp[
-        "Income Per"
-    ].astype(str).astype(int)
+    resp["Total Income"] = resp["Families Total"] * resp["Income Per"]
 
     # Following is unique to each section
 
@@ -196,14 +205,20 @@ async def median_household_income(
     save_path: str
     Path to save the file to
     """
-    target_col = "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Families Median income (dollars)"
+    income = _income_label(year)
+    target_col = f"{income} Estimate Families Median income (dollars)"
     new_col_name = "Median Income"
 
     loc_dicts = [{"city": city} for city in cities]
     loc_fips = [*map(name2fips, loc_dicts)]
 
     resp = await client.get_acs(
-        vars=["S1901"], start_year=year, end_year=year, estimate="5", location=loc_fips
+        vars=["S1901"],
+        start_year=year,
+        end_year=year,
+        estimate="5",
+        location=loc_fips,
+        label_filter=[target_col],
     )
 
     col_sub = [target_col, "state", "city"]
@@ -213,7 +228,7 @@ async def median_household_income(
     # Following is unique to each section
 
     categ = resp["city"]
-    value = resp["Median Income"].astype(str).astype(int)
+    value = resp["Median Income"]
 
     plot_df = pd.DataFrame({"Type": categ, "Value": value})
     plot_df.Type = plot_df.Type.str.title()  # Capitalize first letter in each city
@@ -294,19 +309,20 @@ async def household_income_by_class(
     Path to save the file to
     """
     # NOTE: &#36; is a $ -- needed in any label with 2 dollar signs. Without this, plotly tries to render it as LaTeX (math)
+    income = _income_label(year)
     cols = {
         # old col name: new name
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Households Total": "Total Households",
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Nonfamily households Total Less than $10,000": "Less than $10,000",
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Nonfamily households Total $10,000 to $14,999": "&#36;10,000-<br>&#36;14,999",
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Nonfamily households Total $15,000 to $24,999": "&#36;15,000-<br>&#36;24,999",
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Nonfamily households Total $25,000 to $34,999": "&#36;25,000-<br>&#36;34,999",
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Nonfamily households Total $35,000 to $49,999": "&#36;35,000-<br>&#36;49,999",
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Nonfamily households Total $50,000 to $74,999": "&#36;50,000-<br>&#36;74,999",
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Nonfamily households Total $75,000 to $99,999": "&#36;75,000-<br>&#36;99,999",
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Nonfamily households Total $100,000 to $149,999": "&#36;100,000-<br>&#36;149,999",
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Nonfamily households Total $150,000 to $199,999": "&#36;150,000-<br>&#36;199,999",
-        "INCOME IN THE PAST 12 MONTHS (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Nonfamily households Total $200,000 or more": "$200,000+",
+        f"{income} Estimate Households Total": "Total Households",
+        f"{income} Estimate Nonfamily households Total Less than $10,000": "Less than $10,000",
+        f"{income} Estimate Nonfamily households Total $10,000 to $14,999": "&#36;10,000-<br>&#36;14,999",
+        f"{income} Estimate Nonfamily households Total $15,000 to $24,999": "&#36;15,000-<br>&#36;24,999",
+        f"{income} Estimate Nonfamily households Total $25,000 to $34,999": "&#36;25,000-<br>&#36;34,999",
+        f"{income} Estimate Nonfamily households Total $35,000 to $49,999": "&#36;35,000-<br>&#36;49,999",
+        f"{income} Estimate Nonfamily households Total $50,000 to $74,999": "&#36;50,000-<br>&#36;74,999",
+        f"{income} Estimate Nonfamily households Total $75,000 to $99,999": "&#36;75,000-<br>&#36;99,999",
+        f"{income} Estimate Nonfamily households Total $100,000 to $149,999": "&#36;100,000-<br>&#36;149,999",
+        f"{income} Estimate Nonfamily households Total $150,000 to $199,999": "&#36;150,000-<br>&#36;199,999",
+        f"{income} Estimate Nonfamily households Total $200,000 or more": "$200,000+",
     }
 
     loc_dicts_cv = [{"city": city} for city in cities]
@@ -318,6 +334,7 @@ async def household_income_by_class(
         end_year=year,
         estimate="5",
         location=loc_fips_cv,
+        label_filter=list(cols.keys()),
     )
 
     col_sub = [*list(cols.keys()), "state", "city", "location_key"]
@@ -333,12 +350,11 @@ async def household_income_by_class(
 
     for col in class_cols:
         colname = f"{col}_num"
-        cv[colname] = cv[col].astype(float) * cv["Total Households"].astype(int) / 100
+        cv[colname] = cv[col] * cv["Total Households"] / 100
         class_cols_num.append(colname)
 
     # Sum together the number columns
     cv = cv[class_cols_num + ["Total Households"]]
-    cv["Total Households"] = cv["Total Households"].astype(int)
     cv = cv.sum(axis=0)
 
     for col in class_cols_num:
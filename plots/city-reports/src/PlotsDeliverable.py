@@ -1,4 +1,4 @@
-from lowe.locations.lookup import generate_df_json
+from lowe.locations.lookup import name2fips
 from lowe.acs.ACSClient import ACSClient
 import pandas as pd
 import plotly.graph_objects as go
@@ -37,11 +37,7 @@ async def humanCapitalIndexCV(
     all_loc = []
 
     for city in cities:
-        df = generate_df_json(codetype="city")
-        df = df.astype(str)  # Convert all cols to string
-        # df[df['A'].str.contains("hello")]
-        df = df[df["name"].str.contains(city)]
-        fips = df.iloc[0]["fips"]
+        fips = name2fips({"city": city})["city"]
 
         loc = {"state": fips[0:2], "city": fips[2:]}
         all_loc.append(loc)
@@ -173,11 +169,7 @@ async def educationalAttainmentCV(
     all_loc = []
 
     for city in cities:
-        df = generate_df_json(codetype="city")
-        df = df.astype(str)  # Convert all cols to string
-        # df[df['A'].str.contains("hello")]
-        df = df[df["name"].str.contains(city)]
-        fips = df.iloc[0]["fips"]
+        fips = name2fips({"city": city})["city"]
 
         loc = {"state": fips[0:2], "city": fips[2:]}
         all_loc.append(loc)
@@ -303,11 +295,7 @@ async def healthInsuranceCity(
     all_loc = []
 
     for city in cities:
-        df = generate_df_json(codetype="city")
-        df = df.astype(str)  # Convert all cols to string
-        # df[df['A'].str.contains("hello")]
-        df = df[df["name"].str.contains(city)]
-        fips = df.iloc[0]["fips"]
+        fips = name2fips({"city": city})["city"]
 
         loc = {"state": fips[0:2], "city": fips[2:]}
 
@@ -30,10 +30,10 @@ setup(
         "lowe.dof.clean-data",
         "lowe.dof.scraped-data",
     ],
-    package_data={"": ["*.csv", "*.xls*"]},
+    package_data={"": ["*.csv", "*.xls*", "*.bin", "*.npz"]},
     include_package_data=True,
     entry_points={
-        "console_scripts": ["search=lowe.cli:search"],
+        "console_scripts": ["search=lowe.cli:search", "lowe=lowe.cli:main"],
     },
     install_requires=[
         "aiohttp",
@@ -58,6 +58,7 @@ setup(
         "pandas",
         "pandasql",
         "plotly==5.10.0",
+        "pyarrow",
         "pytest",
         "pytest-asyncio",
         "python-dotenv",
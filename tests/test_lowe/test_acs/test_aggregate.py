@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from lowe.acs.aggregate import aggregate, aggregate_except
+
+FRAME = pd.DataFrame(
+    {
+        "variable_code": pd.Categorical(["B01001_001", "B01001_002"] * 3),
+        "year": [2019] * 6,
+        "geo_fips": pd.Categorical(["a", "a", "b", "b", "c", "c"]),
+        "estimate": [100.0, 50.0, 200.0, np.nan, 300.0, 150.0],
+        "moe": [3.0, 1.0, 4.0, 2.0, np.nan, 2.0],
+    }
+)
+
+
+class TestAggregate:
+    """
+    tests:
+    - estimates are summed over groups and margins of error are propagated
+    - "every member except X" for every X in one call
+    """
+
+    def test_aggregate(self):
+        res = aggregate(FRAME, {"ab": ["a", "b"], "ac": ["a", "c"]})
+        res = res.set_index(["group", "variable_code"])
+
+        assert res.loc[("ab", "B01001_001"), "estimate"] == 300
+        assert res.loc[("ab", "B01001_001"), "moe"] == 5  # sqrt(3^2 + 4^2)
+        assert np.isnan(res.loc[("ab", "B01001_002"), "estimate"])
+        assert res.loc[("ac", "B01001_001"), "moe"] == 3  # Missing MOEs count as 0
+
+        with pytest.raises(KeyError):
+            aggregate(FRAME, {"ad": ["a", "d"]})
+
+    def test_aggregate_except(self):
+        res = aggregate_except(FRAME)
+        expected = aggregate(FRAME, {"a": ["b", "c"], "b": ["a", "c"], "c": ["a", "b"]})
+
+        pd.testing.assert_frame_equal(res, expected)
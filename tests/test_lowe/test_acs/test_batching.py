@@ -0,0 +1,108 @@
+from lowe.acs.ACSClient import ACSClient
+from lowe.acs.cache import ResponseCache
+
+CITIES = [
+    {"city": "0636448"},  # indio, ca
+    {"city": "0612048"},  # cathedral city, ca
+    {"city": "0655254"},  # palm springs, ca
+]
+
+
+class TestBatching:
+    """
+    tests:
+    - ACSClient batches locations in the same state into one request
+    - batched responses are split back into one row per location
+    - state-wide wildcard requests
+    """
+
+    async def test_one_request_per_state_and_year(self, fake_session):
+        client = ACSClient(cache=False)
+        client.session = fake_session
+
+        resp = await client.get_acs(
+            vars=["DP05"],
+            start_year="2018",
+            end_year="2019",
+            location=[dict(loc) for loc in CITIES],
+            varfile="dprofile_vars_2019.json",
+        )
+
+        assert len(fake_session.requests) == 2  # One per year
+        params = fake_session.requests[0][1]
+        assert params["for"] == "place:36448,12048,55254"
+        assert params["in"] == "state:06"
+
+        assert len(resp) == 6
+        assert list(resp["city"].iloc[:3]) == [
+            "indio",
+            "cathedral city",
+            "palm springs",
+        ]
+
+    def test_plan_batches(self):
+        client = ACSClient(cache=False)
+        locs = [
+            {"city": "36448", "state": "06"},
+            {"state": "06"},
+            {"city": "55000", "state": "04"},
+            {"city": "55254", "state": "06"},
+            {"state": "04"},
+        ]
+        batches = client._plan_batches(client._clean_locations(locs))
+        assert [[i for i, _ in batch] for batch in batches] == [[0, 3], [1, 4], [2]]
+
+    async def test_locations_are_not_modified(self, fake_session):
+        client = ACSClient(cache=False)
+        client.session = fake_session
+
+        kwargs = dict(
+            vars=["DP05"],
+            start_year="2019",
+            end_year="2019",
+            varfile="dprofile_vars_2019.json",
+        )
+        # The same list can be passed to several calls
+        first = await client.get_acs(location=CITIES, **kwargs)
+        second = await client.get_acs(location=CITIES, **kwargs)
+
+        assert CITIES[0] == {"city": "0636448"}
+        assert list(first["city"]) == list(second["city"])
+
+    async def test_batches_are_cached_per_location(self, fake_session, tmp_path):
+        client = ACSClient(cache=ResponseCache(cache_dir=str(tmp_path)))
+        client.session = fake_session
+
+        kwargs = dict(
+            vars=["DP05"],
+            start_year="2019",
+            end_year="2019",
+            varfile="dprofile_vars_2019.json",
+        )
+        await client.get_acs(location=[dict(loc) for loc in CITIES], **kwargs)
+        assert len(fake_session.requests) == 1
+
+        # A later query for a subset of the cities never reaches the API
+        resp = await client.get_acs(location=[dict(CITIES[2])], **kwargs)
+        assert len(fake_session.requests) == 1
+        assert resp["city"].iloc[0] == "palm springs"
+
+    async def test_wildcard(self, fake_session, tmp_path):
+        client = ACSClient(cache=ResponseCache(cache_dir=str(tmp_path)))
+        client.session = fake_session
+
+        kwargs = dict(
+            vars=["DP05"],
+            start_year="2019",
+            end_year="2019",
+            varfile="dprofile_vars_2019.json",
+        )
+        resp = await client.get_acs(location={"state": "06", "city": "*"}, **kwargs)
+        assert fake_session.requests[0][1]["for"] == "place:*"
+        assert list(resp.index) == ["0636448", "0612048", "0655254"]
+        assert (resp["year"] == 2019).all()
+
+        # Single cities in the state are served from the state-wide response
+        resp = await client.get_acs(location={"city": "0612048"}, **kwargs)
+        assert len(fake_session.requests) == 1
+        assert resp["city"].iloc[0] == "cathedral city"
@@ -0,0 +1,75 @@
+import os
+import time
+
+from lowe.acs.cache import ResponseCache
+
+PAYLOAD = [
+    ["NAME", "S1901_C01_001E", "state", "place"],
+    ["Indio city", "30000", "06", "36448"],
+]
+
+
+class TestResponseCache:
+    """
+    tests:
+    - ResponseCache get/put round trip
+    - TTL expiry for recent vintages
+    - LRU eviction once the cache is full
+    """
+
+    def test_round_trip(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path))
+        key = dict(
+            year="2019",
+            survey="acs5",
+            tabletype="subject",
+            tableid="group(S1901)",
+            geography="place:36448 in state:06",
+        )
+        assert cache.get(**key) is None
+        cache.put(payload=PAYLOAD, **key)
+        assert cache.get(**key) == PAYLOAD
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+    def test_ttl_only_applies_to_recent_vintages(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path), ttl=0, ttl_from_year=2020)
+        old = dict(
+            year=2019, survey="acs5", tabletype="", tableid="B01001,", geography="us:1"
+        )
+        new = dict(old, year=2020)
+        cache.put(payload=PAYLOAD, **old)
+        cache.put(payload=PAYLOAD, **new)
+        time.sleep(0.01)
+
+        assert cache.get(**old) == PAYLOAD
+        assert cache.get(**new) is None
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path), max_bytes=10**9)
+        keys = [
+            dict(
+                year=2019,
+                survey="acs5",
+                tabletype="",
+                tableid="B01001,",
+                geography=f"state:{i:02d}",
+            )
+            for i in range(5)
+        ]
+        for i, key in enumerate(keys):
+            cache.put(payload=PAYLOAD, **key)
+            path = cache._path(cache._key(**key))
+            os.utime(path, (i, i))  # Make the access order deterministic
+
+        # Shrink the cache so that only a couple of entries fit
+        entry_size = cache.stats()["bytes"] // len(keys)
+        cache.max_bytes = entry_size * 3
+        cache.put(payload=PAYLOAD, **dict(keys[0], geography="state:99"))
+
+        assert cache.evictions > 0
+        assert cache.get(**keys[0]) is None  # Oldest entry went first
+        assert cache.get(**keys[-1]) == PAYLOAD
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from lowe.acs.frames import build_frame, get_layout
+
+VARFILE = "dprofile_vars_2019.json"
+LABEL = "ACS DEMOGRAPHIC AND HOUSING ESTIMATES Estimate SEX AND AGE Total population"
+PERCENT = (
+    "ACS DEMOGRAPHIC AND HOUSING ESTIMATES Percent SEX AND AGE Total population Male"
+)
+
+RESP = [
+    ["GEO_ID", "NAME", "DP05_0001E", "DP05_0001E", "NOT_A_VAR", "state", "place"],
+    ["1600000US0636448", "Indio", "89137", "89137", "x", "06", "36448"],
+    ["1600000US0655254", "Palm Springs", "47427", "47427", "x", "06", "55254"],
+]
+
+
+class TestFrames:
+    """
+    tests:
+    - build_frame decodes every row of a multi-row response at once
+    - numeric variables are decoded to Int64/float64, with sentinels as missing
+    - layouts drop GEO_ID, unknown ids, and duplicate labels, and are reused per header
+    """
+
+    def test_build_frame(self):
+        df = build_frame(RESP, 2019, VARFILE)
+        assert list(df.columns) == [LABEL]
+        assert df.index.name == "year"
+        assert list(df.index) == [2019, 2019]
+        assert df[LABEL].tolist() == [89137, 47427]
+
+    def test_typed_values(self):
+        resp = [
+            ["NAME", "DP05_0001E", "DP05_0002PE", "state", "place"],
+            ["Indio", "89137", "49.6", "06", "36448"],
+            ["Palm Springs", "-666666666", None, "06", "55254"],
+        ]
+        df = build_frame(resp, 2019, VARFILE)
+        assert str(df[LABEL].dtype) == "Int64"
+        assert df[PERCENT].dtype == "float64"
+        assert df[LABEL].iloc[0] == 89137 and pd.isna(df[LABEL].iloc[1])
+        assert df[PERCENT].iloc[0] == 49.6 and pd.isna(df[PERCENT].iloc[1])
+
+    def test_layout(self):
+        layout = get_layout(tuple(RESP[0]), VARFILE)
+        assert layout is get_layout(tuple(RESP[0]), VARFILE)
+        assert list(layout.fips(RESP[1:], "city")) == ["0636448", "0655254"]
@@ -0,0 +1,88 @@
+import json
+import pandas as pd
+import pytest
+
+from lowe.acs.ACSClient import ACSClient
+from lowe.acs.frames import get_layout
+from lowe.acs.harmonize import HarmonizationIndex, normalize_labels
+from lowe.acs.variables import load_decoder, save_compact
+
+try:
+    import importlib.resources as pkg_resources
+except ImportError:
+    import importlib_resources as pkg_resources
+
+LABEL = "ACS DEMOGRAPHIC AND HOUSING ESTIMATES Estimate SEX AND AGE Total population"
+
+
+@pytest.fixture
+def varfiles(tmp_path, monkeypatch):
+    """2018 variables where the first two DP05 variables swapped ids and the labels changed case"""
+    monkeypatch.setenv("LOWE_CACHE_DIR", str(tmp_path))
+    with pkg_resources.open_text("lowe.acs.tableids", "dprofile_vars_2019.json") as f:
+        variables = json.load(f)["variables"]
+    variables["DP05_0001E"], variables["DP05_0002E"] = (
+        variables["DP05_0002E"],
+        variables["DP05_0001E"],
+    )
+    variables["DP05_0002E"]["label"] = variables["DP05_0002E"]["label"].lower() + ":"
+
+    save_compact("dprofile_vars_2018.json", variables)
+    load_decoder.cache_clear()
+    get_layout.cache_clear()
+    yield {2018: "dprofile_vars_2018.json", 2019: "dprofile_vars_2019.json"}
+    load_decoder.cache_clear()
+    get_layout.cache_clear()
+
+
+class TestHarmonize:
+    """
+    tests:
+    - labels are normalized across vintages
+    - (year, id) pairs map to the id and label of the latest vintage
+    - multi-year pulls line up on the same columns
+    """
+
+    def test_normalize_labels(self):
+        labels = pd.Series(
+            [
+                "INCOME (IN 2019 INFLATION-ADJUSTED DOLLARS) Estimate Total:",
+                "Income (in 2015 inflation-adjusted dollars)  Estimate Total",
+            ]
+        )
+        normalized = normalize_labels(labels)
+        assert normalized[0] == normalized[1]
+
+    def test_index(self, varfiles):
+        index = HarmonizationIndex(varfiles)
+
+        assert list(index.keys(2018, ["DP05_0001E", "DP05_0002E", "NAME"])) == [
+            "DP05_0002E",
+            "DP05_0001E",
+            "NAME",
+        ]
+        assert index.labels(2019) == {}
+        old = "ACS DEMOGRAPHIC AND HOUSING ESTIMATES estimate sex and age total population:"
+        assert index.labels(2018) == {old: LABEL}
+
+    async def test_get_acs(self, fake_session, varfiles):
+        client = ACSClient(cache=False)
+        client.session = fake_session
+
+        resp = await client.get_acs(
+            vars=["DP05"],
+            start_year="2018",
+            end_year="2019",
+            location={"city": "0636448"},
+            varfile=None,
+        )
+        single = await client.get_acs(
+            vars=["DP05"],
+            start_year="2019",
+            end_year="2019",
+            location={"city": "0636448"},
+            varfile="dprofile_vars_2019.json",
+        )
+
+        assert set(resp.columns) == set(single.columns)  # No sparse columns
+        assert resp[LABEL].tolist() == [502, 501]  # DP05_0002E in 2018
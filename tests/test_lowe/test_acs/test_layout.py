@@ -0,0 +1,48 @@
+import numpy as np
+
+from lowe.acs.ACSClient import ACSClient
+
+CITIES = [{"city": "0636448"}, {"city": "0655254"}]
+
+
+class TestLongLayout:
+    """
+    tests:
+    - get_acs(layout="long") returns one row per variable, year, and location
+    - variable_code and geo_fips stay categorical across years
+    - labels live in attrs["variables"]
+    """
+
+    async def test_long_layout(self, fake_session):
+        client = ACSClient(cache=False)
+        client.session = fake_session
+
+        resp = await client.get_acs(
+            vars=["DP05"],
+            start_year="2018",
+            end_year="2019",
+            location=[dict(loc) for loc in CITIES],
+            varfile="dprofile_vars_2019.json",
+            layout="long",
+        )
+
+        assert list(resp.columns) == [
+            "variable_code",
+            "year",
+            "geo_fips",
+            "estimate",
+            "moe",
+        ]
+        # 5 ids -> 5 variable codes, for 2 cities and 2 years
+        assert len(resp) == 5 * 2 * 2
+        assert resp["variable_code"].dtype == "category"
+        assert resp["geo_fips"].dtype == "category"
+        assert list(resp["geo_fips"].cat.categories) == ["0636448", "0655254"]
+        assert list(resp["year"].unique()) == [2018, 2019]
+
+        first = resp.iloc[0]
+        assert (first["variable_code"], first["geo_fips"]) == ("DP05_0001", "0636448")
+        assert first["estimate"] == 501 and np.isnan(first["moe"])
+
+        labels = resp.attrs["variables"]
+        assert labels.loc["DP05_0001", "label"].endswith("SEX AND AGE Total population")
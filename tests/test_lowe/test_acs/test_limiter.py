@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+
+from lowe.acs.ACSClient import ACSClient
+from lowe.acs.limiter import AdaptiveLimiter, parse_retry_after
+from lowe.keypool import KeyPool
+
+
+class TestAdaptiveLimiter:
+    """
+    tests:
+    - AdaptiveLimiter bounds concurrency
+    - rate adapts to throttling
+    - Retry-After parsing
+    - keys the API rejects are dropped and the request is retried with the next key
+    """
+
+    async def test_bounded_concurrency(self):
+        limiter = AdaptiveLimiter(max_concurrency=2, rate=1000, max_rate=1000)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with limiter:
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[request() for _ in range(10)])
+        assert peak == 2
+        assert limiter.stats()["in_flight"] == 0
+        assert limiter.stats()["queued"] == 0
+
+    def test_rate_adapts(self):
+        limiter = AdaptiveLimiter(rate=10, min_rate=1, increase=1, decrease=0.5)
+        limiter.throttled()
+        assert limiter.rate == 5
+        limiter.succeeded()
+        assert limiter.rate == 6
+        for _ in range(5):
+            limiter.throttled()
+        assert limiter.rate == 1
+        assert limiter.throttles == 6
+
+    async def test_retry_after_pauses_requests(self):
+        limiter = AdaptiveLimiter(rate=1000, max_rate=1000)
+        limiter.throttled(retry_after=0.05)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        async with limiter:
+            pass
+        assert loop.time() - start >= 0.04
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("not a date") is None
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    async def test_rejected_key_is_benched(self, fake_session):
+        client = ACSClient(cache=False, memo_ttl=0, keys=KeyPool(["bad1", "good"]))
+        client.session = fake_session
+        fake_session.statuses["bad1"] = 403
+
+        resp = await client.get_acs(
+            vars=["DP05"],
+            start_year="2019",
+            end_year="2019",
+            location={"city": "0636448"},
+            varfile="dprofile_vars_2019.json",
+            tabletype="dprofile",
+            infer_type=False,
+        )
+        assert len(resp) == 1
+        assert [params["key"] for _, params in fake_session.requests] == [
+            "bad1",
+            "good",
+        ]
+        assert client.keys.stats()["...bad1"]["benched_for"] > 0
+        assert client.keys.stats()["...good"]["benched_for"] == 0
+
+        # Once the API has rejected every key, requests fail instead of waiting
+        fake_session.statuses["good"] = 403
+        with pytest.raises(RuntimeError, match="rejected every API key"):
+            await client.get_acs(
+                vars=["DP05"],
+                start_year="2018",
+                end_year="2018",
+                location={"city": "0636448"},
+                varfile="dprofile_vars_2019.json",
+                tabletype="dprofile",
+                infer_type=False,
+            )
@@ -0,0 +1,49 @@
+import lowe.acs.ACSClient as acsclient
+
+from lowe.acs.ACSClient import ACSClient
+
+LABEL = "ACS DEMOGRAPHIC AND HOUSING ESTIMATES Estimate SEX AND AGE Total population"
+
+
+class TestProjection:
+    """
+    tests:
+    - get_acs(variables=...) and get_acs(label_filter=...) only request the variables we need
+    - long variable lists are split across several requests
+    """
+
+    async def test_label_filter(self, fake_session):
+        client = ACSClient(cache=False)
+        client.session = fake_session
+
+        resp = await client.get_acs(
+            vars=["DP05"],
+            start_year="2019",
+            end_year="2019",
+            location={"city": "0636448"},
+            varfile="dprofile_vars_2019.json",
+            label_filter=[LABEL],
+        )
+
+        assert fake_session.requests[0][1]["get"] == "DP05_0001E"
+        assert list(resp.columns) == [LABEL, "city", "state", "location_key"]
+        assert resp[LABEL].iloc[0] == 501
+
+    async def test_long_variable_lists_are_chunked(self, fake_session, monkeypatch):
+        monkeypatch.setattr(acsclient, "MAX_GET_VARIABLES", 2)
+        client = ACSClient(cache=False)
+        client.session = fake_session
+        variables = ["DP05_0001E", "DP05_0002E", "DP05_0003E", "DP05_0004E"]
+
+        resp = await client.get_acs(
+            vars=["DP05"],
+            start_year="2019",
+            end_year="2019",
+            location=[{"city": "0636448"}, {"city": "0655254"}],
+            varfile="dprofile_vars_2019.json",
+            variables=variables,
+        )
+
+        assert len(fake_session.requests) == 2
+        assert resp.shape == (2, 4 + 3)
+        assert resp[LABEL].tolist() == [501, 501]
@@ -0,0 +1,64 @@
+from lowe.acs.ACSClient import ACSClient
+
+LOCATIONS = [
+    {"city": "0636448"},  # indio, ca
+    {"city": "0699999"},  # not a real place
+    {"city": "0655254"},  # palm springs, ca
+]
+
+KWARGS = dict(
+    vars=["DP05"],
+    start_year="2018",
+    end_year="2019",
+    varfile="dprofile_vars_2019.json",
+    retry_delay=0,
+)
+
+
+class TestResilient:
+    """
+    tests:
+    - get_acs_resilient keeps the locations that succeeded when a batch fails
+    - failed batches are retried one location at a time
+    - the failure manifest has a row per (table, year, location) that failed
+    """
+
+    async def test_partial_failure(self, fake_session):
+        fake_session.missing.add("99999")
+        client = ACSClient(cache=False)
+        client.session = fake_session
+
+        result = await client.get_acs_resilient(
+            location=[dict(loc) for loc in LOCATIONS], **KWARGS
+        )
+
+        assert not result.ok
+        df = result["DP05"]
+        assert list(df["city"]) == ["indio", "palm springs"] * 2
+        assert list(df.index) == [2018, 2018, 2019, 2019]
+
+        failures = result.failures
+        assert len(failures) == 2
+        assert list(failures["year"]) == [2018, 2019]
+        assert (failures["location"].map(lambda loc: loc["city"]) == "99999").all()
+        assert failures["reason"].str.startswith("missing geography").all()
+
+        # 2 batched requests and one request per location and year in the first round of
+        # retries. The second round gets the same (successful, but empty) responses from the memo
+        assert len(fake_session.requests) == 2 + 3 * 2
+
+    async def test_everything_succeeds(self, fake_session):
+        client = ACSClient(cache=False)
+        client.session = fake_session
+
+        locations = [LOCATIONS[0], LOCATIONS[2]]
+        result = await client.get_acs_resilient(
+            location=[dict(loc) for loc in locations], **KWARGS
+        )
+        expected = await client.get_acs(
+            location=[dict(loc) for loc in locations],
+            **{k: v for k, v in KWARGS.items() if k != "retry_delay"},
+        )
+
+        assert result.ok
+        assert result.frames["DP05"].equals(expected)
@@ -0,0 +1,35 @@
+from lowe.acs.ACSClient import ACSClient
+from lowe.acs.search import get_index, tokenize
+
+
+class TestSearch:
+    """
+    tests:
+    - VariableIndex.search() with exact, prefix, and misspelled words
+    - ACSClient.find_variables()
+    """
+
+    def test_search(self):
+        index = get_index("dprofile_vars_2019.json")
+        assert tokenize("Total population!!Male") == ["total", "population", "male"]
+
+        exact = index.search("median household income", table="DP03")
+        assert exact.index[0] == "DP03_0062E"  # Shortest label first
+        assert exact["label"].str.contains("households Median").all()
+
+        assert list(index.search("median househ inc", table="DP03").index) == list(
+            exact.index
+        )
+        typo = index.search("median houshold income", table="DP03")
+        assert typo.index[0] == "DP03_0062E"
+        assert len(index.search("zzzzqqqq")) == 0
+
+    async def test_find_variables(self, fake_session):
+        client = ACSClient(cache=False)
+        client.session = fake_session
+
+        res = await client.find_variables(
+            "sex and age total population", year=2019, tabletype="dprofile", limit=2
+        )
+        assert list(res.index) == ["DP05_0001E", "DP05_0001PE"]
+        assert len(fake_session.requests) == 0  # Packaged with lowe
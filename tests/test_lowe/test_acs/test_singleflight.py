@@ -0,0 +1,61 @@
+import asyncio
+
+from lowe.acs.ACSClient import ACSClient
+from lowe.acs.singleflight import SingleFlight
+
+KWARGS = dict(
+    vars=["DP05"],
+    start_year="2019",
+    end_year="2019",
+    varfile="dprofile_vars_2019.json",
+)
+
+
+class TestSingleFlight:
+    """
+    tests:
+    - concurrent identical get_acs calls share one API request
+    - repeated calls are served from the in-memory memo
+    - failures aren't memoized
+    """
+
+    async def test_concurrent_requests_are_coalesced(self, slow_session):
+        client = ACSClient(cache=False)
+        client.session = slow_session
+
+        resps = await asyncio.gather(
+            *[client.get_acs(location={"city": "0655254"}, **KWARGS) for _ in range(3)]
+        )
+
+        assert len(client.session.requests) == 1
+        assert all(resp.equals(resps[0]) for resp in resps)
+        assert client.singleflight.stats()["coalesced"] == 2
+
+        # Back to back requests come from the memo
+        await client.get_acs(location={"city": "0655254"}, **KWARGS)
+        assert len(client.session.requests) == 1
+        assert client.singleflight.memo_hits == 1
+
+    async def test_memo_can_be_turned_off(self, fake_session):
+        client = ACSClient(cache=False, memo_ttl=0)
+        client.session = fake_session
+
+        await client.get_acs(location={"city": "0655254"}, **KWARGS)
+        await client.get_acs(location={"city": "0655254"}, **KWARGS)
+        assert len(fake_session.requests) == 2
+
+    async def test_failures_are_not_memoized(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fail():
+            calls.append(1)
+            raise ValueError("nope")
+
+        for _ in range(2):
+            try:
+                await flight.run("key", fail)
+            except ValueError:
+                pass
+        assert len(calls) == 2
+        assert flight.stats()["memoized"] == 0
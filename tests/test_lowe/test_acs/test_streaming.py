@@ -0,0 +1,86 @@
+import asyncio
+
+from contextlib import aclosing
+from lowe.acs.ACSClient import ACSClient
+from lowe.acs.limiter import AdaptiveLimiter
+
+CITIES = [
+    {"city": "0636448"},  # indio, ca
+    {"city": "0655254"},  # palm springs, ca
+    {"state": "04"},  # arizona
+]
+
+KWARGS = dict(
+    vars=["DP05"],
+    start_year="2018",
+    end_year="2019",
+    varfile="dprofile_vars_2019.json",
+)
+
+
+class TestIterACS:
+    """
+    tests:
+    - iter_acs yields one frame per table, year, and location
+    - the frames are the same rows get_acs returns
+    - stopping early doesn't leave requests running
+    - only max_pending requests get ahead of a slow consumer
+    """
+
+    async def test_yields_every_location(self, fake_session):
+        client = ACSClient(cache=False)
+        client.session = fake_session
+
+        results = [
+            res
+            async for res in client.iter_acs(
+                location=[dict(loc) for loc in CITIES], **KWARGS
+            )
+        ]
+        assert len(results) == 2 * len(CITIES)
+        assert {(table, year) for table, year, _, _ in results} == {
+            ("DP05", 2018),
+            ("DP05", 2019),
+        }
+
+        expected = await client.get_acs(
+            location=[dict(loc) for loc in CITIES], **KWARGS
+        )
+        for _, year, loc, df in results:
+            assert len(df) == 1
+            match = expected[expected["location_key"] == df["location_key"].iloc[0]]
+            assert df.equals(match.loc[[year], df.columns])
+
+    async def test_stop_early(self, slow_session):
+        client = ACSClient(cache=False, limiter=AdaptiveLimiter(max_concurrency=1))
+        client.session = slow_session
+
+        stream = client.iter_acs(
+            location=[dict(loc) for loc in CITIES], layout="long", **KWARGS
+        )
+        async with aclosing(stream) as results:
+            async for table, year, loc, df in results:
+                assert set(df["geo_fips"]) <= {"0636448", "0655254", "04"}
+                break
+
+        # The requests that were still queued never go out
+        await asyncio.sleep(0.3)
+        assert len(slow_session.requests) <= 2
+
+    async def test_bounded_pending(self, fake_session):
+        client = ACSClient(cache=False, memo_ttl=0)
+        client.session = fake_session
+
+        stream = client.iter_acs(
+            location={"state": "04"},
+            max_pending=2,
+            **{**KWARGS, "start_year": "2012"},
+        )
+        yielded = 0
+        async with aclosing(stream) as results:
+            async for _ in results:
+                # The consumer is slow, but at most 2 requests get ahead of it
+                await asyncio.sleep(0.05)
+                assert len(fake_session.requests) <= yielded + 2
+                yielded += 1
+        assert yielded == 8
@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+
+from lowe.acs.store import ACSStore
+from lowe.acs.summaryfile import SummaryFileClient, geoid_to_fips, ingest
+
+pytest.importorskip("pyarrow")
+
+SUMMARY_FILE = """GEO_ID|DP05_E0001|DP05_M0001|DP05_E0002|DP05_M0002
+0400000US06|39283497|-555555555|19526298|1234
+1600000US0636448|89137|45|44209|678
+1600000US0655254|47427|34|25511|567
+0500000US06065|2411439|-555555555|1201238|890
+"""
+
+LABEL = "ACS DEMOGRAPHIC AND HOUSING ESTIMATES Estimate SEX AND AGE Total population"
+
+KWARGS = dict(
+    vars=["DP05"],
+    start_year="2019",
+    end_year="2019",
+    varfile="dprofile_vars_2019.json",
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    source = tmp_path / "summary-files"
+    source.mkdir()
+    (source / "acsdp5y2019-dp05.dat").write_text(SUMMARY_FILE)
+    store = ACSStore(root=str(tmp_path / "store"))
+    assert ingest(str(source), store, chunksize=2) == [("DP05", 2019)]
+    return store
+
+
+class TestSummaryFile:
+    """
+    tests:
+    - GEO_IDs are translated to lowe.locations FIPS codes
+    - Summary Files are ingested into the store in chunks
+    - SummaryFileClient serves get_acs from the store
+    - SummaryFileClient infers the variables file, and says so when it isn't available
+    """
+
+    def test_geoid_to_fips(self):
+        geo_ids = pd.Series(
+            ["0100000US", "0400000US06", "0500000US06065", "1600000US0636448"]
+        )
+        assert list(geoid_to_fips(geo_ids)) == ["us", "06", "06_065", "0636448"]
+
+    def test_ingest(self, store):
+        df = store.read("DP05", 2019, geo_fips=["0636448"])
+        assert list(df["variable_code"]) == ["DP05_0001", "DP05_0002"]
+        assert list(df["estimate"]) == [89137, 44209]
+        assert len(store._parts("DP05", 2019)) == 1  # Chunks are compacted
+
+        state = store.read("DP05", 2019, geo_fips=["06"], variables=["DP05_0001"])
+        assert pd.isna(state["moe"].iloc[0])  # Sentinel values are missing
+
+    async def test_get_acs(self, store):
+        client = SummaryFileClient(store=store)
+
+        resp = await client.get_acs(
+            location=[{"city": "0636448"}, {"city": "0655254"}], **KWARGS
+        )
+        assert list(resp["city"]) == ["indio", "palm springs"]
+        assert list(resp[LABEL]) == [89137, 47427]
+
+        resp = await client.get_acs(
+            location={"state": "06", "city": "*"}, layout="long", **KWARGS
+        )
+        assert set(resp["geo_fips"]) == {"0636448", "0655254"}
+        assert len(resp) == 4
+
+        with pytest.raises(KeyError):
+            await client.get_acs(location={"city": "0612048"}, **KWARGS)
+
+    async def test_infer_varfile(self, store, tmp_path, monkeypatch):
+        monkeypatch.setenv("LOWE_CACHE_DIR", str(tmp_path))
+        client = SummaryFileClient(store=store)
+        kwargs = {**KWARGS, "varfile": None}
+
+        resp = await client.get_acs(location={"city": "0636448"}, **kwargs)
+        assert list(resp[LABEL]) == [89137]
+
+        kwargs.update(start_year="2022", end_year="2022")
+        with pytest.raises(FileNotFoundError, match="dprofile_vars_2022.json"):
+            await client.get_acs(location={"city": "0636448"}, **kwargs)
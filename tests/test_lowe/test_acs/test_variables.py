@@ -0,0 +1,63 @@
+import os
+
+from lowe.acs.ACSClient import ACSClient
+from lowe.acs.variables import compact_path, load_decoder
+
+LABEL = "ACS DEMOGRAPHIC AND HOUSING ESTIMATES Estimate SEX AND AGE Total population"
+
+
+class TestVariableDecoder:
+    """
+    tests:
+    - lowe.acs.variables load_decoder() caching
+    - VariableDecoder.decode()
+    - ACSClient.prefetch_variables() downloads the missing variables files once
+    """
+
+    def test_decoder_is_cached(self):
+        assert load_decoder("dprofile_vars_2019.json") is load_decoder(
+            "dprofile_vars_2019.json"
+        )
+
+    def test_decode(self):
+        decoder = load_decoder("dprofile_vars_2019.json")
+        labels = decoder.decode(["DP05_0001E", "NAME", "DP05_0005PE"])
+
+        assert (
+            labels[0]
+            == "ACS DEMOGRAPHIC AND HOUSING ESTIMATES Estimate SEX AND AGE Total population"
+        )
+        assert labels[1] != labels[1]  # NaN for ids that aren't in the file
+        assert (
+            labels[2]
+            == "ACS DEMOGRAPHIC AND HOUSING ESTIMATES Percent SEX AND AGE Total population Under 5 years"
+        )
+
+    async def test_prefetch_variables(self, fake_session, tmp_path, monkeypatch):
+        monkeypatch.setenv("LOWE_CACHE_DIR", str(tmp_path))
+        client = ACSClient(cache=False)
+        client.session = fake_session
+
+        varfiles = await client.prefetch_variables([2018, 2019], ["dprofile"])
+        assert varfiles == {
+            (2018, "dprofile"): "dprofile_vars_2018.json",
+            (2019, "dprofile"): "dprofile_vars_2019.json",  # Packaged with lowe
+        }
+        assert [base for base, _ in fake_session.requests] == [
+            "https://api.census.gov/data/2018/acs/acs5/profile/variables.json"
+        ]
+        assert os.path.exists(compact_path("dprofile_vars_2018.json"))
+
+        # Each year is decoded with its own variables, and nothing is downloaded twice
+        resp = await client.get_acs(
+            vars=["DP05"],
+            start_year="2018",
+            end_year="2019",
+            location={"city": "0636448"},
+            label_filter=[LABEL],
+        )
+        assert resp[LABEL].tolist() == [501, 501]
+        assert len(fake_session.requests) == 1 + 2
+        assert (
+            load_decoder("dprofile_vars_2018.json").decode(["DP05_0001E"])[0] == LABEL
+        )
@@ -0,0 +1,82 @@
+import pytest
+
+from lowe.acs.ACSClient import ACSClient
+from lowe.acs.store import ACSStore
+
+pytest.importorskip("pyarrow")
+
+LABEL = "ACS DEMOGRAPHIC AND HOUSING ESTIMATES Estimate SEX AND AGE Total population"
+
+KWARGS = dict(
+    vars=["DP05"],
+    varfile="dprofile_vars_2019.json",
+    tabletype="dprofile",
+    infer_type=False,
+)
+
+
+class TestWarehouse:
+    """
+    tests:
+    - only the (table, year, geography) cells the warehouse doesn't have are requested
+    - other variables of a stored table are served without the API
+    - a state-wide request isn't served from cities stored one at a time
+    """
+
+    async def test_incremental(self, fake_session, tmp_path):
+        warehouse = ACSStore(root=str(tmp_path))
+        client = ACSClient(cache=False, memo_ttl=0, warehouse=warehouse)
+        client.session = fake_session
+
+        first = await client.get_acs(
+            start_year="2019",
+            end_year="2019",
+            location=[{"city": "0636448"}, {"city": "0655254"}],
+            label_filter=[LABEL],
+            **KWARGS,
+        )
+        assert len(fake_session.requests) == 1
+        assert fake_session.requests[0][1]["get"] == "group(DP05)"
+        assert first[LABEL].tolist() == [501, 501]
+
+        # One new city and one new year: only those cells are requested
+        second = await client.get_acs(
+            start_year="2018",
+            end_year="2019",
+            location=[{"city": "0636448"}, {"city": "0655254"}, {"city": "0612048"}],
+            **KWARGS,
+        )
+        new = [params["for"] for _, params in fake_session.requests[1:]]
+        assert sorted(new) == ["place:12048", "place:36448,55254,12048"]
+        assert len(second) == 6
+        assert second[LABEL].tolist() == [501] * 6
+
+        assert set(warehouse.geographies("DP05", 2019)) == {
+            "0636448",
+            "0655254",
+            "0612048",
+        }
+
+    async def test_wildcard_after_single_city(self, fake_session, tmp_path):
+        warehouse = ACSStore(root=str(tmp_path))
+        client = ACSClient(cache=False, memo_ttl=0, warehouse=warehouse)
+        client.session = fake_session
+
+        await client.get_acs(
+            start_year="2019", end_year="2019", location={"city": "0636448"}, **KWARGS
+        )
+        assert not warehouse.is_complete("DP05", 2019, "city", "06")
+
+        wildcard = dict(
+            start_year="2019", end_year="2019", location={"state": "06", "city": "*"}
+        )
+        res = await client.get_acs(**wildcard, **KWARGS)
+        assert len(fake_session.requests) == 2
+        assert fake_session.requests[1][1]["for"] == "place:*"
+        assert len(res) == 3
+        assert warehouse.is_complete("DP05", 2019, "city", "06")
+
+        # Now the whole state is stored
+        again = await client.get_acs(**wildcard, **KWARGS)
+        assert len(fake_session.requests) == 2
+        assert len(again) == 3
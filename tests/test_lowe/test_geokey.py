@@ -0,0 +1,48 @@
+import pickle
+import pytest
+
+from lowe.locations.geokey import GeoKey
+
+
+class TestGeoKey:
+    """
+    tests:
+    - every location format parses to the same key
+    - keys are immutable and hashable
+    """
+
+    def test_parse(self):
+        city = GeoKey("city", "06", "36448")
+        for location in [
+            {"city": "0636448"},
+            {"state": "06", "city": "36448"},
+            {"State": "6", "city": "36448"},
+            "0636448",
+            city,
+        ]:
+            assert GeoKey.parse(location) == city
+
+        assert GeoKey.parse({"county": "06_065"}) == GeoKey.parse("06_065")
+        assert GeoKey.parse({"county": "06_065"}).fips == "06_065"
+        assert GeoKey.parse({"state": "06"}) == GeoKey("state", "06", "06")
+        assert GeoKey.parse({}) == GeoKey.parse("us") == GeoKey("us", None, "1")
+        assert GeoKey.parse({"state": "06", "city": "*"}).wildcard
+        assert GeoKey.parse({"county": "06_065"}).as_dict() == {
+            "state": "06",
+            "county": "065",
+        }
+
+        with pytest.raises(ValueError):
+            GeoKey.parse({"city": "36448"})  # No state
+        with pytest.raises(ValueError):
+            GeoKey.parse({"state": "06", "city": "36448", "county": "065"})
+
+    def test_immutable(self):
+        location = {"city": "0636448"}
+        key = GeoKey.parse(location)
+        assert location == {"city": "0636448"}
+
+        with pytest.raises(AttributeError):
+            key.code = "55254"
+        assert len({key, GeoKey.parse("0636448"), GeoKey.parse("0655254")}) == 2
+        assert pickle.loads(pickle.dumps(key)) == key
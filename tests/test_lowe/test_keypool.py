@@ -0,0 +1,49 @@
+import pytest
+import time
+
+from lowe.keypool import KeyPool
+
+
+class TestKeyPool:
+    """
+    tests:
+    - requests are spread across keys in turn
+    - keys that use up their quota (or are benched) sit out until their window resets
+    - asking for a key raises when every key is out for longer than max_wait
+    - per-key token buckets, so throughput grows with the number of keys
+    """
+
+    def test_rotation_and_quota(self, monkeypatch):
+        monkeypatch.setenv("API_KEY_TEST", "key1, key2,key3")
+        pool = KeyPool.from_env("API_KEY_TEST", daily_quota=2, window=0.2)
+        assert pool.keys == ["key1", "key2", "key3"]
+
+        pool.bench("key3")
+        keys = [pool.acquire_blocking() for _ in range(4)]
+        assert keys == ["key1", "key2", "key1", "key2"]
+        assert pool.stats()["...key1"]["used"] == 2
+
+        # Every key is out of quota or benched, so the next request waits for a window to reset
+        start = time.monotonic()
+        assert pool.acquire_blocking() in ("key1", "key2", "key3")
+        assert time.monotonic() - start >= 0.1
+
+        assert KeyPool.from_env("API_KEY_MISSING").acquire_blocking() is None
+
+        # Keys that are out for longer than max_wait raise instead of waiting
+        pool = KeyPool(["key1"], daily_quota=1, max_wait=60)
+        pool.acquire_blocking()
+        with pytest.raises(RuntimeError, match="frees up in"):
+            pool.acquire_blocking()
+
+    async def test_rate(self):
+        one, two = KeyPool(["a"], rate=20.0), KeyPool(["a", "b"], rate=20.0)
+        elapsed = []
+        for pool in (one, two):
+            start = time.monotonic()
+            for _ in range(11):
+                await pool.acquire()
+            elapsed.append(time.monotonic() - start)
+
+        assert elapsed[0] >= 0.4  # 10 requests after the first at 20 per second
+        assert elapsed[1] < elapsed[0] * 0.75
@@ -0,0 +1,156 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import threading
+
+from pathlib import Path
+
+from lowe.locations import lookuptables
+from lowe.locations.compact import CompactTable, save_compact
+from lowe.locations.lookup import (
+    DecoderRegistry,
+    fips2name,
+    fips2name_many,
+    name2fips,
+    name2fips_many,
+    registry,
+    resolve,
+    resolve_many,
+    search,
+)
+from lowe.locations.searchindex import LocationIndex
+
+
+class TestDecoderRegistry:
+    """
+    tests:
+    - each decoder table is only loaded once, even by several threads at once
+    - reload() throws the tables away so they are read again
+    - fips2name and name2fips still translate locations
+    - whole lists of names or codes are translated at once, with a mask of the ones that weren't found
+    - the compact binary tables have the same entries as the JSON tables
+    - search() ranks exact names first and matches the start of words as you type
+    - misspelled names resolve to the closest location, with a confidence
+    """
+
+    def test_loaded_once(self):
+        registry = DecoderRegistry()
+        tables = []
+        threads = [
+            threading.Thread(target=lambda: tables.append(registry.get("city")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(table is tables[0] for table in tables)
+        assert registry.get("cities") is tables[0]
+        assert list(registry.stats()) == ["cities"]
+        assert registry.stats()["cities"]["entries"] == len(tables[0])
+
+        registry.reload()
+        assert not registry.stats()["cities"]["loaded"]
+        assert registry.get("city") is not tables[0]
+
+    def test_translate(self):
+        assert fips2name({"city": "0655254"})["city"] == "palm springs, ca"
+        assert name2fips({"city": "palm springs, ca", "state": "ca"}) == {
+            "city": "0655254",
+            "state": "06",
+        }
+
+    def test_translate_many(self):
+        names = pd.Series(["palm springs, ca", "Indio, CA", "nowhere, ca", None])
+        codes, unresolved = name2fips_many(names, "city")
+        assert list(codes) == ["0655254", "0636448", None, None]
+        assert list(unresolved) == [False, False, True, True]
+
+        names, unresolved = fips2name_many(["06_065", "99_999"], "county")
+        assert list(names) == ["riverside county, ca", None]
+        assert list(unresolved) == [False, True]
+
+        names, unresolved = fips2name_many(np.array([6, 4]), "state")
+        assert list(names) == ["ca", "az"]
+
+    def test_compact(self, tmp_path):
+        table = {"0655254": "palm springs, ca", "3525170": "española, nm", "06": np.nan}
+        save_compact(table, str(tmp_path / "cities.bin"))
+        compact = CompactTable(str(tmp_path / "cities.bin"))
+
+        assert len(compact) == 2  # Entries without a name are left out
+        assert compact["3525170"] == "española, nm"
+        assert compact.inverse["palm springs, ca"] == "0655254"
+        assert "0636448" not in compact and "indio, ca" not in compact.inverse
+        assert dict(compact) == {k: v for k, v in table.items() if k != "06"}
+
+        # The packaged binary tables match the JSON ones
+        registry = DecoderRegistry()
+        with open(Path(lookuptables.__file__).parent / "msas.json") as f:
+            assert dict(registry.get("msa")) == json.load(f)
+        assert isinstance(registry.get("msa"), CompactTable)
+
+    def test_search(self):
+        res = search("palm springs, ca", codetype="city")
+        assert res.iloc[0]["fips"] == "0655254"
+        assert res.iloc[0]["score"] == 1
+        assert res["score"].is_monotonic_decreasing
+
+        # Words that start with the query words match, in every level by default
+        res = search("river", limit=None)
+        assert {"riverside county, ca", "riverside, ca"} <= set(res["name"])
+        assert set(res["level"]) >= {"city", "county"}
+
+        res = search("55254", codetype="city")
+        assert res.iloc[0]["name"] == "palm springs, ca"
+        assert list(search("06_065")["name"]) == ["riverside county, ca"]
+
+        # Names that only look alike aren't returned
+        assert list(search("cathedral city, ca", codetype="city")["name"]) == [
+            "cathedral city, ca"
+        ]
+        assert len(search("Atlantis city", codetype="city")) == 0
+
+        # The index saved with the tables is up to date with them
+        built = LocationIndex.build(
+            {level: registry.get(level) for level in ("state", "msa", "county", "city")}
+        )
+        saved = registry.search_index()
+        assert built.arrays.keys() == saved.arrays.keys()
+        assert all(
+            np.array_equal(built.arrays[k], saved.arrays[k]) for k in built.arrays
+        )
+
+    def test_resolve(self):
+        assert resolve("palm sprngs, ca", "city")[0] == "0655254"
+        assert resolve("PALM SPRINGS", "city", state="ca") == ("0655254", 1.0)
+        assert resolve("desert hot springs ca", "city") == ("0618996", 1.0)
+        # Only locations in the state match
+        assert resolve("palm sprngs", "city", state="az")[0] != "0655254"
+
+        res = resolve_many(["Cathedral Cty", "Balance Of County", None], "city", "ca")
+        assert list(res["fips"]) == ["0612048", None, None]
+        assert 0.75 <= res["confidence"][0] < 1
+
+        assert name2fips({"city": "palm sprngs, ca"}, fuzzy=True) == {"city": "0655254"}
+
+        # Names that match several locations equally well aren't guessed
+        assert resolve("springfield", "city") == (None, 1.0)
+        assert resolve("springfield", "city", state="il")[0] is not None
+        res = resolve_many(["springfeld"], "city")
+        assert res["fips"][0] is None and res["matches"][0] > 1
+        with pytest.raises(KeyError, match="equally well"):
+            name2fips({"city": "springfeld"}, fuzzy=True)
+
+        # Without fuzzy=True, a miss doesn't build a resolver just for the error message
+        with pytest.raises(KeyError):
+            name2fips({"county": "nowhere county, ca"})
+        assert registry.resolver("county", build=False) is None
+
+        try:
+            name2fips({"city": "palm sprngs, ca"})
+            assert False
+        except KeyError as e:
+            assert "palm springs, ca" in str(e)